@@ -3,6 +3,7 @@ from __future__ import absolute_import, unicode_literals
 import os
 
 from celery import Celery
+from celery.schedules import crontab
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gaggamagga.settings')
 
@@ -12,6 +13,50 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 app.autodiscover_tasks()
 
+# 주기 작업
+app.conf.beat_schedule = {
+    # 유저별 맛집 추천 결과 갱신(6시간마다)
+    "update-place-recommendation": {
+        "task": "places.tasks.update_place_recommendation",
+        "schedule": crontab(minute=0, hour="*/6"),
+    },
+    # 리뷰 변경 기록을 별점 행렬에 합침(10분마다)
+    "compact-place-rating-matrix": {
+        "task": "places.tasks.compact_place_rating_matrix",
+        "schedule": crontab(minute="*/10"),
+    },
+    # 행렬 분해 추천 모델 학습(매일 새벽 4시)
+    "train-factor-model": {
+        "task": "places.tasks.train_place_factor_model",
+        "schedule": crontab(minute=0, hour=4),
+    },
+    # 취향 선택 후보 맛집 id 목록 갱신(1시간마다)
+    "refresh-place-select-pools": {
+        "task": "places.tasks.refresh_place_select_pools",
+        "schedule": crontab(minute=30),
+    },
+    # 맛집 조회수 DB 반영(1분마다)
+    "flush-place-hits": {
+        "task": "places.tasks.flush_place_hits",
+        "schedule": crontab(),
+    },
+    # 맛집별 일일 고유 방문자 수 집계(매일 0시 10분)
+    "rollup-place-visitors": {
+        "task": "places.tasks.rollup_place_visitors",
+        "schedule": crontab(minute=10, hour=0),
+    },
+    # 인기 급상승 맛집 갱신(1시간마다)
+    "update-place-trending": {
+        "task": "places.tasks.update_place_trending",
+        "schedule": crontab(minute=20),
+    },
+    # 맛집 변경 사항 검색 엔진 반영(1분마다)
+    "sync-place-search-index": {
+        "task": "places.tasks.sync_place_search_index",
+        "schedule": crontab(),
+    },
+}
+
 
 @app.task(bind=True)
 def debug_task(self):
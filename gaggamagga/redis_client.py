@@ -0,0 +1,14 @@
+from django.conf import settings
+
+import redis
+
+_clients = {}
+
+
+# REDIS_URL의 Redis 클라이언트(설정이 없는 로컬 환경에서는 None, 연결 풀은 프로세스별로 재사용)
+def get_redis():
+    if not settings.REDIS_URL:
+        return None
+    if settings.REDIS_URL not in _clients:
+        _clients[settings.REDIS_URL] = redis.Redis.from_url(settings.REDIS_URL)
+    return _clients[settings.REDIS_URL]
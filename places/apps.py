@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class PlacesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "places"
\ No newline at end of file
+    name = "places"
+
+    # 맛집 변경 사항을 자동완성 목록, 위치 격자 번호, 영업시간, 북마크 수에 반영하는 signal 등록
+    def ready(self):
+        from . import autocomplete, nearby, opening_hours, bookmarks
@@ -0,0 +1,84 @@
+from django.conf import settings
+
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+
+# 추천 데이터(별점 행렬, factor, id 배열) 버전 저장소
+# RECOMMEND_DIR/<name>/<version>/<array>.npy 형태로 저장하고 RECOMMEND_DIR/<name>/current 링크가 사용 중인 버전을 가리킨다.
+# 새 버전은 디렉터리를 모두 쓴 뒤 링크만 교체하므로(os.replace) 읽는 쪽은 항상 완성된 버전을 보고,
+# 각 워커는 np.load(mmap_mode="r")로 열어서 gunicorn 워커 전체가 OS 페이지 캐시의 한 벌을 같이 사용한다.
+CURRENT = "current"
+
+
+def get_artifact_dir(name):
+    path = os.path.join(settings.RECOMMEND_DIR, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# 현재 사용 중인 버전(저장 전이면 None)
+def current_version(name):
+    try:
+        return os.readlink(os.path.join(get_artifact_dir(name), CURRENT))
+    except FileNotFoundError:
+        return None
+
+
+# 새 버전 디렉터리에 배열 저장 후 current 링크 교체
+# base_version이 있으면 arrays에 없는 배열은 그 버전의 파일을 하드 링크로 공유(바뀐 배열만 새로 저장)
+def save_arrays(name, arrays, base_version=None):
+    base = get_artifact_dir(name)
+    version_path = tempfile.mkdtemp(prefix=f"{time.time_ns()}-", dir=base)
+    for array_name, array in arrays.items():
+        np.save(os.path.join(version_path, f"{array_name}.npy"), array)
+    if base_version:
+        for entry in os.listdir(os.path.join(base, base_version)):
+            if os.path.splitext(entry)[0] not in arrays:
+                os.link(os.path.join(base, base_version, entry), os.path.join(version_path, entry))
+
+    link_path = os.path.join(base, f".{CURRENT}-{os.path.basename(version_path)}")
+    os.symlink(os.path.basename(version_path), link_path)
+    os.replace(link_path, os.path.join(base, CURRENT))
+
+    # 다음 버전으로 교체된 지 RECOMMEND_ARTIFACT_RETENTION초가 지난 버전 삭제(저장이 잦아도 교체 직전에 버전을 확인한 워커가 읽을 수 있게 함)
+    # 이미 열려있는 memmap은 파일이 삭제되어도 계속 읽을 수 있음
+    versions = sorted(entry for entry in os.listdir(base) if not entry.startswith(".") and entry != CURRENT)
+    expired_at = time.time_ns() - settings.RECOMMEND_ARTIFACT_RETENTION * 10**9
+    for version, next_version in zip(versions, versions[1:]):
+        if get_version_time(next_version) < expired_at:
+            shutil.rmtree(os.path.join(base, version), ignore_errors=True)
+    return os.path.basename(version_path)
+
+
+# 버전을 저장한 시간(ns, 버전 이름 앞부분)
+def get_version_time(version):
+    return int(version.split("-", 1)[0])
+
+
+# 버전(기본은 현재 버전)의 배열 조회(mmap_mode=None이면 메모리로 읽음)
+def load_arrays(name, array_names, version=None, mmap_mode="r"):
+    version = version or current_version(name)
+    if version is None:
+        return None
+    version_path = os.path.join(get_artifact_dir(name), version)
+    return {array_name: np.load(os.path.join(version_path, f"{array_name}.npy"), mmap_mode=mmap_mode) for array_name in array_names}
+
+
+_loaded = {}
+
+
+# 워커별로 현재 버전 객체를 캐시하고 버전이 바뀐 경우에만 다시 연다(워커 재시작 없이 새 버전으로 교체)
+def get_artifact(name, load):
+    version = current_version(name)
+    if version is None:
+        return None
+
+    key = (settings.RECOMMEND_DIR, name)
+    cached = _loaded.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, load(name, version))
+        _loaded[key] = cached
+    return cached[1]
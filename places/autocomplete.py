@@ -0,0 +1,243 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Place
+
+import time
+import bisect
+import threading
+import unicodedata
+import collections
+import numpy as np
+
+CHANGE_SEQ_KEY = "place_autocomplete:seq"
+CHANGE_KEY = "place_autocomplete:change:{seq}"
+CHANGE_TIMEOUT = 60 * 60 * 2
+MAX_CHANGES = 1000   # 밀린 변경 사항이 이보다 많으면 하나씩 반영하지 않고 새로 생성
+PLACE_FIELDS = ["place_name", "category", "place_address", "hit", "rating"]
+TERM_KINDS = ["category", "address"]
+
+
+# 한글은 자모 단위로 분리해서 입력 중인 글자("흑ㄷ")도 "흑돼지"의 앞부분으로 찾을 수 있게 함
+def normalize_key(text):
+    return unicodedata.normalize("NFKD", " ".join(text.lower().split()))
+
+
+class PrefixIndex:
+    """
+    (정렬 키, 값) 정렬 목록과 점수 배열로 앞부분이 같은 값 중 점수가 높은 순으로 조회
+    """
+
+    def __init__(self, items=()):
+        items = sorted(items)
+        self.keys = [(key, value) for key, value, _ in items]
+        self.scores = np.array([score for _, _, score in items], dtype=np.float64)
+
+    def find(self, key, value):
+        position = bisect.bisect_left(self.keys, (key, value))
+        if position < len(self.keys) and self.keys[position] == (key, value):
+            return position
+        return None
+
+    def add(self, key, value, score):
+        position = bisect.bisect_left(self.keys, (key, value))
+        self.keys.insert(position, (key, value))
+        self.scores = np.insert(self.scores, position, score)
+
+    def remove(self, key, value):
+        position = self.find(key, value)
+        if position is not None:
+            del self.keys[position]
+            self.scores = np.delete(self.scores, position)
+
+    def set_score(self, key, value, score):
+        self.scores[self.find(key, value)] = score
+
+    # prefix로 시작하는 값 중 점수 상위 size개(같은 값은 한 번만)
+    def search(self, prefix, size):
+        start = bisect.bisect_left(self.keys, (prefix,))
+        end = bisect.bisect_left(self.keys, (prefix + "\U0010ffff",))
+        scores = -self.scores[start:end]
+        order = np.arange(end - start)
+        if len(order) > size * 4:   # 같은 값이 여러 키에 있을 수 있어서 여유 있게 고른 뒤 정렬
+            order = np.argpartition(scores, size * 4)[: size * 4]
+        order = order[np.lexsort((order, scores[order]))] + start
+        values = []
+        for position in order:
+            value = self.keys[position][1]
+            if value not in values:
+                values.append(value)
+                if len(values) == size:
+                    break
+        return values
+
+
+class Autocomplete:
+    """
+    맛집 이름(단어별 뒷부분 포함), 카테고리, 주소 단어 자동완성 목록
+    맛집은 조회수, 별점 순이고 카테고리, 주소 단어는 해당 맛집 조회수 합 순
+    """
+
+    def __init__(self, places):
+        self.places = {}
+        self.terms = collections.defaultdict(lambda: [0, 0])   # (종류, 단어): [맛집 수, 조회수 합]
+        self.term_indexes = {}
+        place_items = []
+        for place_id, values in places.items():
+            self.places[place_id] = values
+            place_items += [(key, place_id, get_place_score(values)) for key in get_place_keys(values)]
+            for term in get_terms(values):
+                self.terms[term][0] += 1
+                self.terms[term][1] += values["hit"]
+
+        self.place_index = PrefixIndex(place_items)
+        for kind in TERM_KINDS:
+            self.term_indexes[kind] = PrefixIndex((normalize_key(text), text, hit) for (term_kind, text), (_, hit) in self.terms.items() if term_kind == kind)
+
+    def add_place(self, place_id, values):
+        self.remove_place(place_id)
+        self.places[place_id] = values
+        for key in get_place_keys(values):
+            self.place_index.add(key, place_id, get_place_score(values))
+
+        for kind, text in get_terms(values):
+            if (kind, text) not in self.terms:
+                self.term_indexes[kind].add(normalize_key(text), text, 0)
+            self.terms[kind, text][0] += 1
+            self.terms[kind, text][1] += values["hit"]
+            self.term_indexes[kind].set_score(normalize_key(text), text, self.terms[kind, text][1])
+
+    def remove_place(self, place_id):
+        values = self.places.pop(place_id, None)
+        if values is None:
+            return
+        for key in get_place_keys(values):
+            self.place_index.remove(key, place_id)
+
+        for kind, text in get_terms(values):
+            self.terms[kind, text][0] -= 1
+            self.terms[kind, text][1] -= values["hit"]
+            if self.terms[kind, text][0] == 0:
+                del self.terms[kind, text]
+                self.term_indexes[kind].remove(normalize_key(text), text)
+            else:
+                self.term_indexes[kind].set_score(normalize_key(text), text, self.terms[kind, text][1])
+
+    def suggest(self, query, size=10):
+        prefix = normalize_key(query)
+        return {
+            "places": [
+                {"id": place_id, **{field: self.places[place_id][field] for field in ["place_name", "category", "place_address"]}}
+                for place_id in self.place_index.search(prefix, size)
+            ],
+            "categories": self.term_indexes["category"].search(prefix, size),
+            "addresses": self.term_indexes["address"].search(prefix, size),
+        }
+
+
+# 맛집 이름 전체와 두 번째 단어부터의 뒷부분("제주 흑돼지"는 "흑돼지"로도 검색)
+def get_place_keys(values):
+    words = values["place_name"].split()
+    return {normalize_key(" ".join(words[start:])) for start in range(len(words))}
+
+
+# 조회수 순, 조회수가 같으면 별점 순
+def get_place_score(values):
+    return values["hit"] + float(values["rating"]) / 10
+
+
+# 카테고리와 주소 단어(번지 등 숫자가 들어간 단어 제외)
+def get_terms(values):
+    terms = {("category", values["category"])} if values["category"] else set()
+    return terms | {("address", word) for word in values["place_address"].split() if not any(char.isdigit() for char in word)}
+
+
+def get_place_values(place):
+    return {field: getattr(place, field) for field in PLACE_FIELDS}
+
+
+##### 워커별 자동완성 목록 #####
+# 맛집이 저장, 삭제되면 변경 사항을 공유 캐시에 순번과 함께 기록하고
+# 각 워커는 요청 때 순번만 확인해서 밀린 변경 사항을 목록에 반영(요청 중에는 DB 조회 없음)
+# 목록을 새로 만들어야 하면 백그라운드 스레드에서 만들어서 교체하고 그동안은 이전 목록(첫 요청이면 빈 목록) 사용
+_autocomplete = None
+_position = 0
+_built_at = 0
+_building = False
+_lock = threading.Lock()
+EMPTY_AUTOCOMPLETE = Autocomplete({})
+
+
+def publish_change(place_id, values=None):
+    try:
+        seq = cache.incr(CHANGE_SEQ_KEY)
+    except ValueError:
+        cache.add(CHANGE_SEQ_KEY, 0, None)
+        seq = cache.incr(CHANGE_SEQ_KEY)
+    cache.set(CHANGE_KEY.format(seq=seq), (place_id, values), CHANGE_TIMEOUT)
+
+
+@receiver(post_save, sender=Place)
+def publish_place_update(sender, instance, **kwargs):
+    values = get_place_values(instance)
+    transaction.on_commit(lambda: publish_change(instance.id, values))
+
+
+@receiver(post_delete, sender=Place)
+def publish_place_delete(sender, instance, **kwargs):
+    place_id = instance.id
+    transaction.on_commit(lambda: publish_change(place_id))
+
+
+# DB에서 목록 새로 생성
+def build_autocomplete():
+    return Autocomplete({values.pop("id"): values for values in Place.objects.values("id", *PLACE_FIELDS).iterator(chunk_size=2000)})
+
+
+# 목록을 새로 만들어서 교체(만드는 동안 들어온 변경 사항은 다음 요청 때 다시 반영해도 결과가 같음)
+def refresh_autocomplete():
+    global _autocomplete, _position, _built_at, _building
+    try:
+        seq = cache.get(CHANGE_SEQ_KEY, 0)
+        autocomplete = build_autocomplete()
+        with _lock:
+            _autocomplete, _position, _built_at = autocomplete, seq, time.monotonic()
+    finally:
+        _building = False
+
+
+def refresh_autocomplete_in_background():
+    try:
+        refresh_autocomplete()
+    finally:
+        connection.close()
+
+
+# 워커의 자동완성 목록(처음 생성, 조회수 순위 갱신 주기, 변경 사항이 만료되거나 너무 많이 밀린 경우에는 백그라운드에서 새로 생성)
+def get_autocomplete():
+    global _position, _building
+    seq = cache.get(CHANGE_SEQ_KEY, 0)
+
+    with _lock:
+        expired = time.monotonic() - _built_at > settings.PLACE_AUTOCOMPLETE_TIMEOUT
+        rebuild = _autocomplete is None or expired or seq < _position or seq - _position > MAX_CHANGES
+        if not rebuild and seq > _position:
+            changes = cache.get_many([CHANGE_KEY.format(seq=n) for n in range(_position + 1, seq + 1)])
+            if len(changes) < seq - _position:
+                rebuild = True
+            else:
+                for n in range(_position + 1, seq + 1):
+                    place_id, values = changes[CHANGE_KEY.format(seq=n)]
+                    if values is None:
+                        _autocomplete.remove_place(place_id)
+                    else:
+                        _autocomplete.add_place(place_id, values)
+                _position = seq
+
+        if rebuild and not _building:
+            _building = True
+            threading.Thread(target=refresh_autocomplete_in_background, daemon=True).start()
+        return _autocomplete or EMPTY_AUTOCOMPLETE
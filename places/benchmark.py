@@ -0,0 +1,102 @@
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from django.urls import reverse
+
+from users.models import User
+from reviews.models import Review
+from .models import Place, CHOICE_CATEGORY
+from .views import UserPlaceListView, NewUserPlaceListView
+from .rcm_places import rcm_place_user, rcm_place_new_user
+from .rating_matrix import get_rating_matrix
+
+import time
+import resource
+import numpy as np
+
+factory = APIRequestFactory(SERVER_NAME="backend")  # ALLOWED_HOSTS에 있는 호스트
+
+
+# 소수의 유저, 맛집에 리뷰가 몰리도록 Zipf 분포 가중치를 섞어서 생성
+def zipf_weights(count, rng, exponent=1.1):
+    weights = 1 / np.arange(1, count + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+# DB의 유저, 맛집으로 가짜 리뷰 생성
+def generate_reviews(review_count, seed=0, batch_size=10000):
+    rng = np.random.default_rng(seed)
+    user_ids = np.array(User.objects.values_list("id", flat=True))
+    place_ids = np.array(Place.objects.values_list("id", flat=True))
+    user_weights, place_weights = zipf_weights(len(user_ids), rng), zipf_weights(len(place_ids), rng)
+
+    for start in range(0, review_count, batch_size):
+        size = min(batch_size, review_count - start)
+        authors = rng.choice(user_ids, size, p=user_weights)
+        places = rng.choice(place_ids, size, p=place_weights)
+        ratings = rng.integers(1, 6, size)
+        Review.objects.bulk_create(
+            [
+                Review(content="benchmark", rating_cnt=int(rating), author_id=int(author), place_id=int(place))
+                for author, place, rating in zip(authors, places, ratings)
+            ]
+        )
+
+
+# 함수 실행 시간(ms) 측정
+def measure(func, args_list):
+    latencies = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.array(latencies)
+
+
+def summarize(latencies):
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if len(latencies) else (0, 0, 0)
+    return {"count": len(latencies), "p50": p50, "p90": p90, "p99": p99, "max": latencies.max() if len(latencies) else 0}
+
+
+# 프로세스 최대 메모리 사용량(MB)
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+##### 측정 대상 #####
+def bench_rcm_place_user(user_id, cate_id):
+    rating_matrix = get_rating_matrix(cate_id)
+    return rcm_place_user(rating_matrix.matrix, rating_matrix.user_ids, rating_matrix.place_ids, user_id)
+
+
+def bench_rcm_place_new_user(place_id, cate_id):
+    rating_matrix = get_rating_matrix(cate_id)
+    return rcm_place_new_user(rating_matrix.matrix, rating_matrix.place_ids, place_id)
+
+
+# 요청 생성부터 응답 렌더링까지(인증은 로그인 과정 없이 강제 인증)
+def bench_user_place_list_view(user, cate_id):
+    request = factory.get(reverse("user_place_list_view", kwargs={"cate_id": cate_id}))
+    force_authenticate(request, user=user)
+    return UserPlaceListView.as_view()(request, cate_id=cate_id).render()
+
+
+def bench_new_user_place_list_view(place_id, cate_id):
+    category = CHOICE_CATEGORY[cate_id - 1]
+    request = factory.get(reverse("new_user_place_list_view", kwargs={"place_id": place_id, "category": category}))
+    return NewUserPlaceListView.as_view()(request, place_id=place_id, category=category).render()
+
+
+# 카테고리별 행렬에 있는 유저, 맛집 중에서 측정 대상 인자 추출
+def sample_args(request_count, seed=0):
+    rng = np.random.default_rng(seed)
+    user_args, place_args = [], []
+    cate_ids = [cate_id for cate_id in range(1, len(CHOICE_CATEGORY) + 1) if get_rating_matrix(cate_id).matrix.nnz]
+    if not cate_ids:
+        return user_args, place_args
+
+    for cate_id in rng.choice(cate_ids, request_count):
+        rating_matrix = get_rating_matrix(int(cate_id))
+        user_args.append((int(rng.choice(rating_matrix.user_ids)), int(cate_id)))
+        place_args.append((int(rng.choice(rating_matrix.place_ids)), int(cate_id)))
+    return user_args, place_args
@@ -0,0 +1,85 @@
+from django.db import connection, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from .models import Place
+
+PlaceBookmark = Place.place_bookmark.through
+
+
+# PostgreSQL에서는 삭제, 추가(ON CONFLICT DO NOTHING), 북마크 수 변경을 CTE 쿼리 한 번으로 실행
+# 삭제된 행이 있으면 추가하지 않고, 없는 맛집이면 추가, 변경되는 행이 없음
+TOGGLE_BOOKMARK_SQL = """
+WITH deleted AS (
+    DELETE FROM {bookmark} WHERE place_id = %(place_id)s AND user_id = %(user_id)s RETURNING place_id
+), inserted AS (
+    INSERT INTO {bookmark} (place_id, user_id)
+    SELECT id, %(user_id)s FROM {place} WHERE id = %(place_id)s AND NOT EXISTS (SELECT 1 FROM deleted)
+    ON CONFLICT (place_id, user_id) DO NOTHING RETURNING place_id
+), updated AS (
+    UPDATE {place} SET bookmark_count = bookmark_count + (SELECT COUNT(*) FROM inserted) - (SELECT COUNT(*) FROM deleted)
+    WHERE id = %(place_id)s RETURNING id
+)
+SELECT (SELECT COUNT(*) FROM deleted), (SELECT COUNT(*) FROM updated)
+"""
+
+
+# 북마크 토글(북마크 테이블의 (맛집, 유저) 행만 삭제 또는 추가하고 북마크 수를 같이 변경)
+# 북마크를 했으면 True, 취소했으면 False, 없는 맛집이면 Place.DoesNotExist
+def toggle_bookmark(place_id, user_id):
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                TOGGLE_BOOKMARK_SQL.format(bookmark=connection.ops.quote_name(PlaceBookmark._meta.db_table), place=connection.ops.quote_name(Place._meta.db_table)),
+                {"place_id": place_id, "user_id": user_id},
+            )
+            deleted, updated = cursor.fetchone()
+        if not updated:
+            raise Place.DoesNotExist
+        return not deleted
+
+    # SQLite(로컬 환경)는 CTE 안에서 DELETE, INSERT를 쓸 수 없어서 쿼리를 나눠서 실행
+    with transaction.atomic():
+        if PlaceBookmark.objects.filter(place_id=place_id, user_id=user_id).delete()[0]:
+            Place.objects.filter(id=place_id).update(bookmark_count=F("bookmark_count") - 1)
+            return False
+
+        if not Place.objects.filter(id=place_id).update(bookmark_count=F("bookmark_count") + 1):
+            raise Place.DoesNotExist
+        try:
+            with transaction.atomic():
+                PlaceBookmark.objects.create(place_id=place_id, user_id=user_id)
+        except IntegrityError:
+            # 동시에 들어온 요청이 먼저 북마크한 경우
+            Place.objects.filter(id=place_id).update(bookmark_count=F("bookmark_count") - 1)
+        return True
+
+
+# 유저의 북마크를 place_ids(없는 맛집 제외)와 같게 맞추고 북마크한 맛집 id 목록 반환
+# 추가, 삭제는 각각 쿼리 한 번이고 바뀐 맛집의 북마크 수는 북마크 테이블에서 다시 셈
+def sync_bookmarks(user_id, place_ids):
+    with transaction.atomic():
+        wanted = set(Place.objects.filter(id__in=set(place_ids)).values_list("id", flat=True))
+        current = set(PlaceBookmark.objects.filter(user_id=user_id).values_list("place_id", flat=True))
+        added, removed = wanted - current, current - wanted
+
+        PlaceBookmark.objects.filter(user_id=user_id, place_id__in=removed).delete()
+        PlaceBookmark.objects.bulk_create([PlaceBookmark(place_id=place_id, user_id=user_id) for place_id in added], ignore_conflicts=True)
+        Place.objects.filter(id__in=added | removed).count_bookmarks()
+    return sorted(wanted)
+
+
+# place_bookmark.add(), remove(), clear()(관리자 페이지 등)로 바뀐 북마크 수 반영
+@receiver(m2m_changed, sender=PlaceBookmark)
+def update_bookmark_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        instance._cleared_place_ids = list(instance.bookmark_place.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if not reverse:
+            place_ids = [instance.pk]
+        elif action == "post_clear":
+            place_ids = instance.__dict__.pop("_cleared_place_ids", [])
+        else:
+            place_ids = pk_set
+        Place.objects.filter(id__in=place_ids).count_bookmarks()
@@ -1,5 +1,10 @@
+from django.conf import settings
+
 from algoliasearch_django import algolia_engine
 
+from .search_engine import get_search_index
+from .search_cache import cached_search
+
 
 def get_client():
     return algolia_engine.client
@@ -11,11 +16,16 @@ def get_index(index_name="cfe_Place"):
     return index
 
 
+# SEARCH_BACKEND 설정에 따라 Algolia 또는 로컬 검색 색인 사용(검색 결과 형태는 같음), 같은 검색어는 캐시된 결과 반환
 def perform_search(qeury, **kwargs):
-    index = get_index()
     params = {"hitsPerPage": 100}
     index_filters = [f"{k}:{v}" for k, v in kwargs.items() if v]
     if len(index_filters) != 0:
         params["facetFilters"] = index_filters
-    results = index.search(qeury, params)
-    return results
\ No newline at end of file
+    results = cached_search(qeury, params, search)
+    return results
+
+
+def search(qeury, params):
+    index = get_search_index() if settings.SEARCH_BACKEND == "local" else get_index()
+    return index.search(qeury, params)
\ No newline at end of file
@@ -0,0 +1,222 @@
+from django.conf import settings
+from django.db import transaction
+
+from .models import Place
+from .index import INDEXED_FIELDS, enqueue_places
+from .nearby import get_geo_cell
+from .opening_hours import update_opening_hours
+from .autocomplete import publish_change, get_place_values
+
+import queue
+import random
+import asyncio
+import aiohttp
+import threading
+import unicodedata
+import collections
+
+# (검색어, 저장할 카테고리)
+KEYWORDS = [
+    ("제주시 한식", "한식"), ("제주시 분식", "분식"), ("제주시 고깃집", "한식"), ("제주시 삼겹살", "한식"),
+    ("서귀포시 삼겹살", "한식"), ("서귀포시 흑돼지", "한식"), ("제주시 흑돼지", "한식"), ("제주시 치킨", "치킨"),
+    ("제주시 햄버거", "햄버거"), ("제주시 피자", "피자"), ("제주시 중식집", "중식"), ("제주시 중국집", "중식"),
+    ("제주시 자장면", "중식"), ("서귀포시 자장면", "중식"), ("제주시 일식집", "일식"), ("제주시 초밥", "일식"),
+    ("제주시 회", "일식"), ("제주시 양식", "양식"), ("제주시 스테이크", "양식"), ("제주시 태국음식", "태국음식"),
+    ("제주시 인도음식", "인도음식"), ("제주시 베트남음식", "베트남음식"), ("서귀포시 한식", "한식"), ("서귀포시 분식", "분식"),
+    ("서귀포시 고깃집", "한식"), ("서귀포시 치킨", "치킨"), ("서귀포시 햄버거", "햄버거"), ("서귀포시 피자", "피자"),
+    ("서귀포시 중식집", "중식"), ("서귀포시 중국집", "중식"), ("서귀포시 일식집", "일식"), ("서귀포시 초밥", "일식"),
+    ("서귀포시 회", "일식"), ("서귀포시 양식", "양식"), ("서귀포시 스테이크", "양식"), ("서귀포시 태국음식", "태국음식"),
+    ("서귀포시 인도음식", "인도음식"), ("서귀포시 베트남음식", "베트남음식"),
+]
+PAGES = 6
+DISPLAY_COUNT = 40
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+UPDATE_FIELDS = ["place_number", "place_time", "place_img", "menu", "place_desc", "latitude", "longitude"]
+DONE = object()
+
+
+# 대소문자, 유니코드 표기, 공백만 다른 이름 + 주소는 같은 맛집으로 취급
+def get_place_key(place_name, place_address):
+    return "".join(unicodedata.normalize("NFKC", f"{place_name}|{place_address}").lower().split())
+
+
+# 검색 결과 값(빈 값은 [] 또는 None)을 공백을 정리하고 필드 길이에 맞춘 문자열로 변환
+def get_text(value, field):
+    if not value:
+        return ""
+    return " ".join(str(value).split())[: Place._meta.get_field(field).max_length]
+
+
+def get_coordinate(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# 검색 결과 한 건을 맛집 필드 값으로 변환
+def parse_place(item, category):
+    status = (item.get("businessStatus") or {}).get("status") or {}
+    return {
+        "place_name": get_text(item.get("name"), "place_name"),
+        "category": category,
+        "place_address": get_text(item.get("roadAddress"), "place_address"),
+        "place_number": get_text(item.get("tel"), "place_number"),
+        "place_time": get_text(status.get("detailInfo"), "place_time"),
+        "place_img": item.get("thumUrl") or "",
+        "menu": item.get("menuInfo") or "",
+        "place_desc": get_text((item.get("microReview") or [""])[0], "place_desc"),
+        "latitude": get_coordinate(item.get("y")),
+        "longitude": get_coordinate(item.get("x")),
+    }
+
+
+# 검색 결과 페이지의 맛집 목록
+def get_place_items(data):
+    return (((data or {}).get("result") or {}).get("place") or {}).get("list") or []
+
+
+# 요청 실패(연결 에러, 시간 초과, 429, 5xx)는 backoff * 2^n초(+ 무작위 지연) 후 재시도, 재시도해도 실패하거나 다른 4xx이면 None
+async def fetch_json(session, url, params, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status < 400:
+                    return await response.json(content_type=None)
+                if response.status not in RETRY_STATUS:
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            pass
+        if attempt < retries:
+            await asyncio.sleep(backoff * 2 ** attempt * (1 + random.random()))
+    return None
+
+
+# 검색어, 페이지를 최대 concurrency개씩 동시에 요청해서 받은 순서대로 results에 (카테고리, 맛집 목록 또는 None) 추가
+async def fetch_pages(requests, results, url, concurrency, retries, backoff, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_page(session, query, category, page):
+        params = {"caller": "pcweb", "query": query, "type": "all", "page": page, "displayCount": DISPLAY_COUNT, "lang": "ko"}
+        async with semaphore:
+            data = await fetch_json(session, url, params, retries, backoff)
+
+        # 저장이 밀려서 results가 가득 차면 요청도 같이 대기
+        await asyncio.to_thread(results.put, (category, None if data is None else get_place_items(data)))
+
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        await asyncio.gather(*(fetch_page(session, query, category, page) for query, category, page in requests))
+
+
+class PlacePipeline:
+    """
+    크롤링한 맛집을 정규화한 이름 + 주소로 중복 제거하고 batch_size개씩 새 맛집은 추가, 바뀐 맛집은 바뀐 경우에만 수정
+    이름, 주소, 카테고리는 처음 추가할 때만 저장(여러 검색어에 표기만 다르게 나오는 맛집이 실행마다 바뀌지 않게 함)
+    bulk_create, bulk_update는 signal이 발생하지 않아서 위치 격자 번호, 영업시간, 검색 엔진 outbox(검색 필드가 바뀐 경우만), 자동완성 변경 사항을 직접 반영
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.place_ids = {get_place_key(place_name, place_address): place_id for place_id, place_name, place_address in Place.objects.values_list("id", "place_name", "place_address")}
+        self.seen = set()
+        self.pending = []
+        self.stats = collections.Counter()
+
+    def add(self, values):
+        key = get_place_key(values["place_name"], values["place_address"])
+        if not values["place_name"]:
+            self.stats["skipped"] += 1
+            return
+        if key in self.seen:
+            self.stats["duplicated"] += 1
+            return
+        self.seen.add(key)
+        self.pending.append((key, values))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        pending, self.pending = self.pending, []
+        places = Place.objects.in_bulk([self.place_ids[key] for key, _ in pending if key in self.place_ids])
+
+        created, updated, opening_hours, reindexed = [], [], [], []
+        for key, values in pending:
+            place = places.get(self.place_ids.get(key))
+            if place is None:
+                place = Place(**values, geo_cell=get_geo_cell(values["latitude"], values["longitude"]))
+                created.append((key, place))
+                opening_hours.append(place)
+                continue
+
+            changed = [field for field in UPDATE_FIELDS if getattr(place, field) != values[field]]
+            if not changed:
+                self.stats["unchanged"] += 1
+                continue
+            for field in changed:
+                setattr(place, field, values[field])
+            place.geo_cell = get_geo_cell(place.latitude, place.longitude)
+            updated.append(place)
+            if "place_time" in changed:
+                opening_hours.append(place)
+            if set(changed) & set(INDEXED_FIELDS):
+                reindexed.append(place)
+
+        with transaction.atomic():
+            Place.objects.bulk_create([place for _, place in created], batch_size=self.batch_size)
+            Place.objects.bulk_update(updated, UPDATE_FIELDS + ["geo_cell"], batch_size=self.batch_size)
+            update_opening_hours(opening_hours)
+
+            places = [place for _, place in created] + updated
+            enqueue_places([place.id for _, place in created] + [place.id for place in reindexed])
+            changes = [(place.id, get_place_values(place)) for place in places]
+            transaction.on_commit(lambda: [publish_change(place_id, values) for place_id, values in changes])
+
+        for key, place in created:
+            self.place_ids[key] = place.id
+        self.stats["created"] += len(created)
+        self.stats["updated"] += len(updated)
+
+
+# 검색어별 페이지를 비동기로 동시에 받아서 저장(요청은 별도 스레드의 이벤트 루프, DB 저장은 호출한 스레드에서 batch_size개씩)
+def crawl_places(keywords=KEYWORDS, pages=PAGES, batch_size=500, concurrency=None, url=None, retries=None, backoff=None, timeout=None):
+    concurrency = concurrency or settings.PLACE_CRAWLER_CONCURRENCY
+    requests = [(query, category, page) for query, category in keywords for page in range(1, pages + 1)]
+    results = queue.Queue(maxsize=concurrency * 2)
+    errors = []
+
+    def fetch():
+        try:
+            asyncio.run(
+                fetch_pages(
+                    requests,
+                    results,
+                    url or settings.PLACE_CRAWLER_URL,
+                    concurrency,
+                    settings.PLACE_CRAWLER_RETRIES if retries is None else retries,
+                    settings.PLACE_CRAWLER_BACKOFF if backoff is None else backoff,
+                    timeout or settings.PLACE_CRAWLER_TIMEOUT,
+                )
+            )
+        except Exception as error:
+            errors.append(error)
+        finally:
+            results.put(DONE)
+
+    thread = threading.Thread(target=fetch, daemon=True)
+    thread.start()
+
+    pipeline = PlacePipeline(batch_size)
+    while (result := results.get()) is not DONE:
+        category, items = result
+        if items is None:
+            pipeline.stats["failed"] += 1
+            continue
+        for item in items:
+            pipeline.add(parse_place(item, category))
+    pipeline.flush()
+    thread.join()
+
+    if errors:
+        raise errors[0]
+    return pipeline.stats
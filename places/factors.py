@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.db.models import Avg
+
+from reviews.models import Review
+from .models import Place, CHOICE_CATEGORY
+from .rcm_places import train_als, rcm_place_factor
+from .artifacts import save_arrays, load_arrays, get_artifact
+
+from scipy import sparse
+
+import numpy as np
+
+# 유저 행동별 가중치(별점은 평균 별점 그대로 사용)
+BOOKMARK_WEIGHT = 3
+REVIEW_LIKE_WEIGHT = 1
+ALPHA = 10          # 관측값 -> 신뢰도 배율
+HIT_WEIGHT = 0.1    # 조회수 기반 인기도 가중치
+
+
+class FactorModel:
+    """
+    행렬 분해로 학습한 유저, 맛집 factor
+    user_ids, place_ids는 정렬된 id이며 factor의 마지막 열은 유저는 1, 맛집은 조회수 기반 인기도(내적 한 번으로 인기도까지 더함)
+    카테고리 c의 맛집 열 번호는 cate_cols[cate_indptr[c - 1] : cate_indptr[c]]
+    """
+
+    ARRAYS = ["user_ids", "place_ids", "user_factors", "item_factors", "cate_indptr", "cate_cols"]
+
+    def __init__(self, user_ids, place_ids, user_factors, item_factors, cate_indptr, cate_cols):
+        self.user_ids = user_ids
+        self.place_ids = place_ids
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.cate_indptr = cate_indptr
+        self.cate_cols = cate_cols
+
+    # 정렬된 id 배열에서 위치 조회(없으면 None)
+    @staticmethod
+    def find(ids, target_id):
+        pos = int(np.searchsorted(ids, target_id))
+        if pos < len(ids) and ids[pos] == target_id:
+            return pos
+        return None
+
+    def category_cols(self, cate_id):
+        return self.cate_cols[self.cate_indptr[cate_id - 1] : self.cate_indptr[cate_id]]
+
+    # 학습된 유저의 카테고리 맛집 추천(학습 이후 가입한 유저는 None)
+    def rcm_place_user(self, user_id, cate_id):
+        user_row = self.find(self.user_ids, user_id)
+        if user_row is None:
+            return None
+        cols = self.category_cols(cate_id)
+        return rcm_place_factor(self.item_factors[cols], self.place_ids[cols], self.user_factors[user_row])
+
+    # 선택한 맛집의 factor를 유저 factor로 사용(기존 사용이력이 없는 사용자)
+    def rcm_place_new_user(self, place_id, cate_id):
+        col = self.find(self.place_ids, place_id)
+        if col is None:
+            return None
+        user_vector = np.array(self.item_factors[col])
+        user_vector[-1] = 1
+        cols = self.category_cols(cate_id)
+        return rcm_place_factor(self.item_factors[cols], self.place_ids[cols], user_vector)
+
+    def save(self, name):
+        save_arrays(name, {array_name: getattr(self, array_name) for array_name in self.ARRAYS})
+
+    # 요청 시 memmap으로 열어서 필요한 부분만 읽음
+    @classmethod
+    def load(cls, name, version=None):
+        arrays = load_arrays(name, cls.ARRAYS, version)
+        return cls(*[arrays[array_name] for array_name in cls.ARRAYS])
+
+
+# 별점, 북마크, 리뷰 좋아요를 합친 유저 x 맛집 관측값 행렬
+def build_interactions(place_ids):
+    ratings = Review.objects.order_by().values_list("author_id", "place_id").annotate(rating=Avg("rating_cnt"))
+    bookmarks = Place.place_bookmark.through.objects.values_list("user_id", "place_id")
+    review_likes = Review.review_like.through.objects.values_list("user_id", "review__place_id")
+
+    rows = [np.array(list(ratings), dtype=np.float64).reshape(-1, 3)]
+    for weight, queryset in [(BOOKMARK_WEIGHT, bookmarks), (REVIEW_LIKE_WEIGHT, review_likes)]:
+        pairs = np.array(list(queryset), dtype=np.float64).reshape(-1, 2)
+        rows.append(np.column_stack([pairs, np.full(len(pairs), weight)]))
+    rows = np.vstack(rows)
+
+    user_ids, user_rows = np.unique(rows[:, 0].astype(np.int64), return_inverse=True)
+    place_cols = np.searchsorted(place_ids, rows[:, 1].astype(np.int64))
+    interactions = sparse.csr_matrix((rows[:, 2], (user_rows, place_cols)), shape=(len(user_ids), len(place_ids)))
+    return interactions, user_ids
+
+
+# DB의 유저 행동 데이터로 factor 학습 후 저장
+def train_factor_model():
+    places = list(Place.objects.order_by("id"))
+    place_ids = np.array([place.id for place in places], dtype=np.int64)
+    interactions, user_ids = build_interactions(place_ids)
+
+    user_factors, item_factors = train_als(
+        interactions * ALPHA,
+        factors=settings.RECOMMEND_FACTORS,
+        regularization=settings.RECOMMEND_ALS_REGULARIZATION,
+        iterations=settings.RECOMMEND_ALS_ITERATIONS,
+    )
+
+    # 조회수 기반 인기도 열 추가
+    popularity = np.log1p(np.array([place.hit for place in places], dtype=np.float64))
+    popularity = HIT_WEIGHT * popularity / popularity.max() if len(places) and popularity.max() > 0 else np.zeros(len(places))
+    user_factors = np.column_stack([user_factors, np.ones(len(user_ids))]).astype(np.float32)
+    item_factors = np.column_stack([item_factors, popularity]).astype(np.float32)
+
+    # 카테고리별 맛집 열 번호
+    cate_cols = [[] for _ in CHOICE_CATEGORY]
+    for col, place in enumerate(places):
+        for cate_id in place.cate_ids:
+            cate_cols[cate_id - 1].append(col)
+    cate_indptr = np.cumsum([0] + [len(cols) for cols in cate_cols]).astype(np.int64)
+    cate_cols = np.array(sum(cate_cols, []), dtype=np.int64)
+
+    factor_model = FactorModel(user_ids, place_ids, user_factors, item_factors, cate_indptr, cate_cols)
+    factor_model.save("factors")
+    return factor_model
+
+
+# 저장된 factor 조회(학습 전이면 None, 다시 학습된 경우에만 다시 읽음)
+def get_factor_model():
+    return get_artifact("factors", FactorModel.load)
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models import F, Case, When, Value, PositiveIntegerField
+
+from gaggamagga.redis_client import get_redis
+from .models import Place
+
+import uuid
+import redis
+
+HITS_KEY = "place_hits"
+FLUSH_KEY = "place_hits:flushing"
+FLUSH_LOCK_KEY = "place_hits:lock"
+TOKEN_FIELD = "token"
+
+# FLUSH_KEY가 아직 이번 반영의 버퍼(토큰이 같을 때)일 때만 삭제
+DELETE_IF_TOKEN = """
+if redis.call("HGET", KEYS[1], ARGV[1]) == ARGV[2] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+# 맛집 조회수 1 증가 후 응답에 더할 조회수 반환
+# Redis가 있으면 버퍼에만 기록하고 아직 DB에 반영되지 않은 조회수, 없는 로컬 환경에서는 UPDATE 한 번으로 바로 반영하고 이번 조회 1
+def record_hit(place_id):
+    client = get_redis()
+    if client is None:
+        Place.objects.filter(id=place_id).update(hit=F("hit") + 1)
+        return 1
+    return client.hincrby(HITS_KEY, place_id, 1)
+
+
+# Redis 버퍼에 쌓인 맛집별 조회수와 이번 반영의 토큰(반영이 끝날 때까지 FLUSH_KEY에 보관)
+def drain_hits(client):
+    # 이전 반영이 실패해서 남아있는 값이 없을 때만 새 버퍼를 가져옴(RENAME은 원자적이라 그 사이 증가분은 새 버퍼에 쌓임)
+    if not client.exists(FLUSH_KEY):
+        try:
+            client.rename(HITS_KEY, FLUSH_KEY)
+        except redis.ResponseError:  # 버퍼가 비어있을 경우
+            return {}, None
+
+    # 남아있던 버퍼도 새 토큰을 기록해서 이전 반영이 늦게 삭제하지 못하게 함
+    token = uuid.uuid4().hex
+    client.hset(FLUSH_KEY, TOKEN_FIELD, token)
+    hits = client.hgetall(FLUSH_KEY)
+    hits.pop(TOKEN_FIELD.encode(), None)
+    return {int(place_id): int(delta) for place_id, delta in hits.items()}, token
+
+
+# Redis 버퍼의 조회수를 batch_size개 맛집씩 UPDATE ... SET hit = hit + delta 한 번으로 반영
+# FLUSH_KEY는 DB 반영이 커밋된 뒤 토큰이 같을 때만 삭제(커밋이 실패하면 다음 반영에서 다시 시도)
+def flush_hits(batch_size=500):
+    client = get_redis()
+    if client is None:
+        return 0
+
+    with client.lock(FLUSH_LOCK_KEY, timeout=300):
+        hits, token = drain_hits(client)
+        hits = list(hits.items())
+        with transaction.atomic():
+            for start in range(0, len(hits), batch_size):
+                batch = hits[start : start + batch_size]
+                delta = Case(*[When(id=place_id, then=Value(hit)) for place_id, hit in batch], default=Value(0), output_field=PositiveIntegerField())
+                Place.objects.filter(id__in=[place_id for place_id, _ in batch]).update(hit=F("hit") + delta)
+            if token:
+                transaction.on_commit(lambda: client.eval(DELETE_IF_TOKEN, 1, FLUSH_KEY, TOKEN_FIELD, token))
+    return len(hits)
@@ -1,7 +1,12 @@
-from algoliasearch_django import AlgoliaIndex
+from algoliasearch_django import AlgoliaIndex, algolia_engine
 from algoliasearch_django.decorators import register
 
-from .models import Place
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Place, PlaceIndexOutbox
+from .search_cache import invalidate_search_cache
 
 
 @register(Place)
@@ -24,4 +29,90 @@ class PlaceIndex(AlgoliaIndex):
             "palce_address",
             "place_number",
         ]
-    }
\ No newline at end of file
+    }
+
+
+##### 검색 엔진 동기화(outbox) #####
+# 로컬 검색 색인(places.search_engine)은 메뉴도 검색하므로 메뉴 변경도 포함
+INDEXED_FIELDS = PlaceIndex.fields + ["menu"]
+
+
+def get_indexed_values(place):
+    return [place.__dict__.get(field) for field in INDEXED_FIELDS]
+
+
+def enqueue_place(place_id, deleted=False, rating_only=False):
+    enqueue_places([place_id], deleted, rating_only)
+
+
+# 별점만 바뀐 맛집은 검색 결과 캐시를 무효화하지 않음(이미 outbox에 있는 맛집은 다른 변경 사항을 유지하고 변경 시간만 갱신)
+def enqueue_places(place_ids, deleted=False, rating_only=False):
+    place_ids = list(place_ids)
+    if rating_only:
+        PlaceIndexOutbox.objects.bulk_create([PlaceIndexOutbox(place_id=place_id, rating_only=True) for place_id in place_ids], batch_size=1000, ignore_conflicts=True)
+        for start in range(0, len(place_ids), 1000):
+            PlaceIndexOutbox.objects.filter(place_id__in=place_ids[start : start + 1000]).update(updated_at=timezone.now())
+        return
+
+    PlaceIndexOutbox.objects.bulk_create(
+        [PlaceIndexOutbox(place_id=place_id, deleted=deleted) for place_id in place_ids],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["place_id"],
+        update_fields=["deleted", "rating_only", "updated_at"],
+    )
+
+
+# DB에서 읽어온 검색 필드 값 기록
+@receiver(post_init, sender=Place)
+def remember_indexed_values(sender, instance, **kwargs):
+    instance._indexed_values = get_indexed_values(instance)
+
+
+# 생성되었거나 검색 필드 값이 바뀐 경우에만 outbox에 추가(조회수 등 다른 필드만 바뀐 경우 제외)
+@receiver(post_save, sender=Place)
+def enqueue_place_update(sender, instance, created, **kwargs):
+    indexed_values = get_indexed_values(instance)
+    changed = [field for field, value, old_value in zip(INDEXED_FIELDS, indexed_values, instance._indexed_values) if value != old_value]
+    if created or changed:
+        enqueue_place(instance.id, rating_only=not created and changed == ["rating"])
+    instance._indexed_values = indexed_values
+
+
+@receiver(post_delete, sender=Place)
+def enqueue_place_delete(sender, instance, **kwargs):
+    enqueue_place(instance.id, deleted=True)
+
+
+# outbox의 맛집을 검색 엔진 레코드(수정)와 objectID(삭제)로 변환
+def build_index_records(outbox):
+    adapter = algolia_engine.get_adapter(Place)
+    places = Place.objects.in_bulk([row.place_id for row in outbox if not row.deleted])
+    records = [adapter.get_raw_record(places[row.place_id]) for row in outbox if row.place_id in places]
+    deleted_ids = [row.place_id for row in outbox if row.place_id not in places]
+    return records, deleted_ids
+
+
+# outbox의 변경 사항을 batch_size개씩 한 번에 전송(실패하면 outbox에 남아서 다음 실행 때 다시 전송)
+# 검색 엔진 반영이 끝난 뒤 검색 결과 캐시 무효화(별점만 바뀐 경우는 캐시 시간이 지나면 반영)
+def sync_place_index(batch_size=1000):
+    started_at = timezone.now()
+    outbox = list(PlaceIndexOutbox.objects.order_by("updated_at")[:batch_size])
+    if not outbox:
+        return 0
+
+    records, deleted_ids = build_index_records(outbox)
+    index = algolia_engine.client.init_index(algolia_engine.get_adapter(Place).index_name)
+    responses = []
+    if records:
+        responses.append(index.partial_update_objects(records, {"createIfNotExists": True}))
+    if deleted_ids:
+        responses.append(index.delete_objects(deleted_ids))
+    for response in responses:
+        response.wait()
+    if not all(row.rating_only for row in outbox):
+        invalidate_search_cache()
+
+    # 전송하는 동안 다시 변경된 맛집은 남겨둠
+    PlaceIndexOutbox.objects.filter(id__in=[row.id for row in outbox], updated_at__lte=started_at).delete()
+    return len(outbox)
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from users.models import User
+from places.benchmark import (
+    generate_reviews,
+    measure,
+    summarize,
+    peak_rss,
+    sample_args,
+    bench_rcm_place_user,
+    bench_rcm_place_new_user,
+    bench_user_place_list_view,
+    bench_new_user_place_list_view,
+)
+from places.rating_matrix import rebuild_rating_matrix
+from places.factors import train_factor_model
+from places.tasks import update_place_recommendation
+
+import os
+import time
+import tempfile
+
+FIXTURES = ["01_place.json", "02_user.json", "03_profile.json"]
+
+
+class Command(BaseCommand):
+    help = "data_json 데이터와 가짜 리뷰로 맛집 추천 성능 측정(SQLite)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", nargs="+", type=int, default=[10000, 100000, 1000000], help="생성할 리뷰 수(여러 개 입력 가능)")
+        parser.add_argument("--requests", type=int, default=200, help="측정 대상별 호출 횟수")
+        parser.add_argument("--engine", choices=["cosine", "als"], default=settings.RECOMMEND_ENGINE, help="추천 엔진")
+        parser.add_argument("--batch", action="store_true", help="배치 작업으로 추천 결과를 미리 계산한 뒤 측정")
+        parser.add_argument("--database", default=os.path.join(settings.BASE_DIR, "benchmark.sqlite3"), help="측정용 SQLite 파일 경로")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("SQLite 환경에서만 실행할 수 있습니다.")
+
+        # 개발용 DB를 건드리지 않도록 측정용 DB 파일로 교체
+        connection.close()
+        connection.settings_dict["NAME"] = options["database"]
+
+        for scale in options["scales"]:
+            with override_settings(RECOMMEND_DIR=tempfile.mkdtemp(), RECOMMEND_ENGINE=options["engine"]):
+                self.run_scale(scale, options)
+
+    def run_scale(self, scale, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"[리뷰 {scale:,}개, 엔진 {options['engine']}]"))
+        self.reset_database(options["database"])
+
+        self.timed("리뷰 생성", generate_reviews, scale, options["seed"])
+        self.timed("별점 행렬 생성", rebuild_rating_matrix)
+        if options["engine"] == "als":
+            self.timed("행렬 분해 학습", train_factor_model)
+        if options["batch"]:
+            self.timed("추천 결과 배치 계산", update_place_recommendation)
+
+        user_args, place_args = sample_args(options["requests"], options["seed"])
+        users = User.objects.in_bulk([user_id for user_id, _ in user_args])
+        targets = [
+            ("rcm_place_user", bench_rcm_place_user, user_args),
+            ("rcm_place_new_user", bench_rcm_place_new_user, place_args),
+            ("UserPlaceListView", bench_user_place_list_view, [(users[user_id], cate_id) for user_id, cate_id in user_args]),
+            ("NewUserPlaceListView", bench_new_user_place_list_view, place_args),
+        ]
+
+        self.stdout.write(f"{'대상':<24}{'횟수':>6}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+        for name, func, args_list in targets:
+            result = summarize(measure(func, args_list))
+            self.stdout.write(
+                f"{name:<24}{result['count']:>6}{result['p50']:>10.2f}{result['p90']:>10.2f}{result['p99']:>10.2f}{result['max']:>10.2f}"
+            )
+        self.stdout.write(f"peak RSS {peak_rss():.1f}MB\n")
+
+    # 측정용 DB를 새로 만들고 data_json의 맛집, 유저, 프로필 데이터 로드
+    def reset_database(self, path):
+        connection.close()
+        if os.path.exists(path):
+            os.remove(path)
+        call_command("migrate", verbosity=0, interactive=False)
+        call_command("loaddata", *[os.path.join(settings.BASE_DIR, "data_json", fixture) for fixture in FIXTURES], verbosity=0)
+
+    def timed(self, label, func, *args):
+        started = time.perf_counter()
+        func(*args)
+        self.stdout.write(f"{label}: {time.perf_counter() - started:.2f}s")
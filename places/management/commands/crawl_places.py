@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from places.crawler import crawl_places, PAGES
+
+
+class Command(BaseCommand):
+    help = "검색어별 맛집을 동시에 크롤링해서 새 맛집은 추가, 바뀐 맛집만 수정"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=PAGES)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--concurrency", type=int)
+
+    def handle(self, *args, **options):
+        stats = crawl_places(pages=options["pages"], batch_size=options["batch_size"], concurrency=options["concurrency"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"추가: {stats['created']}개, 수정: {stats['updated']}개, 변경 없음: {stats['unchanged']}개, "
+                f"중복: {stats['duplicated']}개, 실패한 페이지: {stats['failed']}개"
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from places.ratings import reconcile_place_ratings
+
+
+class Command(BaseCommand):
+    help = "리뷰 집계로 맛집별 별점 합계, 리뷰 수, 평균 별점 다시 계산"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = reconcile_place_ratings(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"별점이 수정된 맛집: {count}개"))
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.3 on 2026-10-17 22:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('places', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cate_id', models.PositiveSmallIntegerField(verbose_name='카테고리 번호')),
+                ('place_list', models.JSONField(default=list, verbose_name='추천 맛집 id 리스트')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='추천 갱신 시간')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='place_recommendation', to=settings.AUTH_USER_MODEL, verbose_name='회원')),
+            ],
+            options={
+                'db_table': 'place_recommendation',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='placerecommendation',
+            constraint=models.UniqueConstraint(fields=('user', 'cate_id'), name='unique_place_recommendation'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.1.3 on 2026-10-17 22:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0002_placerecommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceVisitor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('visitors', models.PositiveIntegerField(default=0, verbose_name='고유 방문자 수')),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='place_visitor', to='places.place', verbose_name='장소')),
+            ],
+            options={
+                'db_table': 'place_visitor',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='placevisitor',
+            constraint=models.UniqueConstraint(fields=('place', 'date'), name='unique_place_visitor'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.3 on 2026-10-17 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0003_placevisitor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceIndexOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('place_id', models.PositiveIntegerField(unique=True, verbose_name='장소 id')),
+                ('deleted', models.BooleanField(default=False, verbose_name='삭제 여부')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='변경 시간')),
+            ],
+            options={
+                'db_table': 'place_index_outbox',
+            },
+        ),
+    ]
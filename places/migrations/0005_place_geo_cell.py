@@ -0,0 +1,60 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:20
+
+from django.db import migrations, models
+
+import math
+
+GEO_CELL_SIZE = 0.01
+GEO_CELL_COLUMNS = 36000
+
+
+def is_number(value):
+    try:
+        return math.isfinite(float(value))
+    except (TypeError, ValueError):
+        return False
+
+
+# 숫자로 바꿀 수 없는 좌표(크롤링 결과가 빈 문자열 등)는 NULL로 정리
+def clean_coordinates(apps, schema_editor):
+    Place = apps.get_model("places", "Place")
+    for place in Place.objects.exclude(latitude=None, longitude=None).only("latitude", "longitude").iterator():
+        if not (is_number(place.latitude) and is_number(place.longitude)):
+            Place.objects.filter(id=place.id).update(latitude=None, longitude=None)
+
+
+def fill_geo_cell(apps, schema_editor):
+    Place = apps.get_model("places", "Place")
+    places = list(Place.objects.exclude(latitude=None).exclude(longitude=None).only("latitude", "longitude"))
+    for place in places:
+        row = math.floor((place.latitude + 90) / GEO_CELL_SIZE)
+        column = math.floor((place.longitude + 180) / GEO_CELL_SIZE)
+        place.geo_cell = row * GEO_CELL_COLUMNS + column
+    Place.objects.bulk_update(places, ["geo_cell"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0004_placeindexoutbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(clean_coordinates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='place',
+            name='latitude',
+            field=models.FloatField(null=True, verbose_name='위도'),
+        ),
+        migrations.AlterField(
+            model_name='place',
+            name='longitude',
+            field=models.FloatField(null=True, verbose_name='경도'),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='geo_cell',
+            field=models.PositiveIntegerField(db_index=True, null=True, verbose_name='위치 격자 번호'),
+        ),
+        migrations.RunPython(fill_geo_cell, migrations.RunPython.noop),
+    ]
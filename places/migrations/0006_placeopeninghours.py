@@ -0,0 +1,85 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+import re
+
+# 마이그레이션 시점의 place_time 파서(places.opening_hours가 바뀌어도 결과가 달라지지 않게 복사해 둠)
+DAY = 24 * 60
+WEEK = 7 * DAY
+WEEKDAYS = "월화수목금토일"
+RANGE_PATTERN = re.compile(r"^(?:매일 )?(\d{1,2}):(\d{2}) ?[~-] ?(?:새벽 )?(\d{1,2}):(\d{2})(?:,? 매주 ([월화수목금토일])요일 휴무)?$")
+CLOSED_DAY_PATTERN = re.compile(r"^매주 ([월화수목금토일])요일 휴무$")
+
+
+def parse_place_time(place_time):
+    place_time = (place_time or "").strip()
+    match = CLOSED_DAY_PATTERN.match(place_time)
+    if match:
+        start, end, closed_day = 0, DAY, match.group(1)
+    else:
+        match = RANGE_PATTERN.match(place_time)
+        if not match:
+            return []
+
+        start_hour, start_minute, end_hour, end_minute, closed_day = match.groups()
+        if not (int(start_hour) < 24 and int(end_hour) <= 24 and int(start_minute) < 60 and int(end_minute) < 60):
+            return []
+        start, end = int(start_hour) * 60 + int(start_minute), int(end_hour) * 60 + int(end_minute)
+        if start == end:
+            return []
+        if end < start:
+            end += DAY
+
+    intervals = []
+    for day in range(7):
+        if closed_day and day == WEEKDAYS.index(closed_day):
+            continue
+        day_start, day_end = day * DAY + start, day * DAY + end
+        if day_end > WEEK:
+            intervals += [(day_start, WEEK), (0, day_end - WEEK)]
+        else:
+            intervals.append((day_start, day_end))
+    return intervals
+
+
+# 기존 맛집의 place_time 파싱
+def fill_opening_hours(apps, schema_editor):
+    Place = apps.get_model("places", "Place")
+    PlaceOpeningHours = apps.get_model("places", "PlaceOpeningHours")
+    PlaceOpeningHours.objects.bulk_create(
+        [
+            PlaceOpeningHours(place_id=place_id, start=start, end=end)
+            for place_id, place_time in Place.objects.values_list("id", "place_time").iterator()
+            for start, end in parse_place_time(place_time)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0005_place_geo_cell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceOpeningHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.PositiveSmallIntegerField(verbose_name='영업 시작(분)')),
+                ('end', models.PositiveSmallIntegerField(verbose_name='영업 종료(분)')),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_hours', to='places.place', verbose_name='장소')),
+            ],
+            options={
+                'db_table': 'place_opening_hours',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='placeopeninghours',
+            index=models.Index(fields=['start', 'end'], name='place_opening_hours_range'),
+        ),
+        migrations.RunPython(fill_opening_hours, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:55
+
+from django.db import migrations, models
+from django.db.models import Sum, Count
+
+from decimal import Decimal, ROUND_HALF_UP
+
+
+# 기존 리뷰로 맛집별 별점 합계, 리뷰 수, 평균 별점 채우기(리뷰가 없는 맛집은 크롤링한 별점 유지)
+def fill_rating_sum(apps, schema_editor):
+    Place = apps.get_model("places", "Place")
+    Review = apps.get_model("reviews", "Review")
+    places = [
+        Place(
+            id=row["place_id"],
+            rating_sum=row["rating_sum"],
+            rating_count=row["rating_count"],
+            rating=(Decimal(row["rating_sum"]) / row["rating_count"]).quantize(Decimal("0.01"), ROUND_HALF_UP),
+        )
+        for row in Review.objects.values("place_id").annotate(rating_sum=Sum("rating_cnt"), rating_count=Count("id"))
+    ]
+    Place.objects.bulk_update(places, ["rating_sum", "rating_count", "rating"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0006_placeopeninghours'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='리뷰 수'),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='리뷰 별점 합계'),
+        ),
+        migrations.RunPython(fill_rating_sum, migrations.RunPython.noop),
+    ]
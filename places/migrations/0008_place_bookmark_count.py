@@ -0,0 +1,30 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# 기존 북마크로 맛집별 북마크 수 채우기
+def fill_bookmark_count(apps, schema_editor):
+    Place = apps.get_model("places", "Place")
+    places = [
+        Place(id=row["place_id"], bookmark_count=row["bookmark_count"])
+        for row in Place.place_bookmark.through.objects.values("place_id").annotate(bookmark_count=Count("id"))
+    ]
+    Place.objects.bulk_update(places, ["bookmark_count"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0007_place_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='bookmark_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='북마크 수'),
+        ),
+        migrations.RunPython(fill_bookmark_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0008_place_bookmark_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0, verbose_name='인기 점수')),
+                ('bookmark_count', models.PositiveIntegerField(default=0, verbose_name='계산 시점 북마크 수')),
+                ('bookmark_score', models.FloatField(default=0, verbose_name='북마크 증가 점수')),
+                ('updated_at', models.DateTimeField(verbose_name='계산 시간')),
+                ('place', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='place_trend', to='places.place', verbose_name='장소')),
+            ],
+            options={
+                'db_table': 'place_trend',
+            },
+        ),
+    ]
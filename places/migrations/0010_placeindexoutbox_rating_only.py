@@ -0,0 +1,18 @@
+# Generated by Django 4.1.3 on 2026-10-17 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0009_placetrend'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placeindexoutbox',
+            name='rating_only',
+            field=models.BooleanField(default=False, verbose_name='별점만 변경'),
+        ),
+    ]
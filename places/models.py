@@ -1,9 +1,45 @@
 from django.db import models
-from django.db.models import Q
+from django.db.models import Q, F, Case, When, Value, Count, Exists, OuterRef, Subquery, DecimalField, FloatField, BooleanField
+from django.db.models.functions import Cast, Round, Coalesce
 from django.core.validators import MaxValueValidator
 
 from users.models import User
 
+CHOICE_CATEGORY = [
+    "분식",
+    "한식",
+    "돼지고기구이",
+    "치킨,닭강정",
+    "햄버거",
+    "피자",
+    "중식",
+    "일식",
+    "양식",
+    "태국음식",
+    "인도음식",
+    "베트남음식",
+    "제주시",
+    "서귀포시",
+]
+
+
+# 카테고리 번호(CHOICE_CATEGORY 순서 + 1)로 검색할 필드와 검색어 리스트
+def category_lookup(cate_id):
+    if cate_id <= 12:  # Case1: 음식(한식, 분식, 양식 등)을 선택했을 경우
+
+        # 한식, 패스트푸드, 아시아 선택햇을 경우 앞의 두 카테고리까지 포함
+        if (cate_id == 3) | (cate_id == 6) | (cate_id == 12):
+            return "category", CHOICE_CATEGORY[cate_id - 3 : cate_id]
+        return "category", [CHOICE_CATEGORY[cate_id - 1]]
+
+    # Case2: 장소(제주시, 서귀포시)를 선택했을 경우
+    return "place_address", [CHOICE_CATEGORY[cate_id - 1]]
+
+
+# 월요일 0시부터 지난 분(0 ~ 10079)
+def get_week_minute(when):
+    return when.weekday() * 24 * 60 + when.hour * 60 + when.minute
+
 
 class PlaceQerySet(models.QuerySet):
     def search(self, query):
@@ -12,6 +48,47 @@ class PlaceQerySet(models.QuerySet):
         qs = self.filter(lookup)
         return qs
 
+    # 카테고리 번호에 해당하는 맛집
+    def category(self, cate_id):
+        field, words = category_lookup(cate_id)
+        lookup = Q()
+        for word in words:
+            lookup |= Q(**{f"{field}__contains": word})
+        return self.filter(lookup)
+
+    # 별점 합계, 개수를 UPDATE 한 번으로 변경하고 평균 별점도 같이 계산(리뷰가 모두 삭제되면 0)
+    def add_rating(self, rating_delta, count_delta):
+        rating_sum, rating_count = F("rating_sum") + rating_delta, F("rating_count") + count_delta
+        rating_field = DecimalField(max_digits=3, decimal_places=2)
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=Case(
+                When(Q(rating_count__lte=-count_delta), then=Value(0)),
+                default=Cast(Round(Cast(rating_sum, FloatField()) / rating_count, 2), rating_field),
+                output_field=rating_field,
+            ),
+        )
+
+    # 시간(datetime)에 영업 중인 맛집(영업시간을 알 수 없는 맛집은 거르지 않고 포함)
+    def open_at(self, when):
+        minute = get_week_minute(when)
+        opening_hours = PlaceOpeningHours.objects.filter(place=OuterRef("pk"))
+        return self.filter(~Exists(opening_hours) | Exists(opening_hours.filter(start__lte=minute, end__gt=minute)))
+
+    # 유저의 북마크 여부(is_bookmarked)를 쿼리 한 번에 같이 조회(북마크 수는 bookmark_count 필드)
+    def with_bookmarks(self, user=None):
+        if user is not None and user.is_authenticated:
+            is_bookmarked = Exists(Place.place_bookmark.through.objects.filter(place_id=OuterRef("pk"), user_id=user.id))
+        else:
+            is_bookmarked = Value(False, output_field=BooleanField())
+        return self.annotate(is_bookmarked=is_bookmarked)
+
+    # 북마크 테이블에서 북마크 수를 다시 세서 저장
+    def count_bookmarks(self):
+        bookmarks = Place.place_bookmark.through.objects.filter(place_id=OuterRef("pk")).order_by().values("place_id")
+        return self.update(bookmark_count=Coalesce(Subquery(bookmarks.annotate(count=Count("id")).values("count")), 0))
+
 
 class PlaceManager(models.Manager):
     def get_queryset(self, *args, **kwargs):
@@ -20,6 +97,15 @@ class PlaceManager(models.Manager):
     def search(self, query, user=None):
         return self.get_queryset().search(query)
 
+    def category(self, cate_id):
+        return self.get_queryset().category(cate_id)
+
+    def open_at(self, when):
+        return self.get_queryset().open_at(when)
+
+    def with_bookmarks(self, user=None):
+        return self.get_queryset().with_bookmarks(user)
+
 
 class Place(models.Model):
     place_name = models.CharField("장소명", max_length=50)
@@ -31,9 +117,13 @@ class Place(models.Model):
     place_number = models.CharField("장소 전화번호", max_length=20)
     place_time = models.CharField("영업 시간", max_length=30)
     place_img = models.TextField("장소 이미지", null=True)
-    latitude = models.CharField("위도", max_length=50, null=True)
-    longitude = models.CharField("경도", max_length=50, null=True)
+    latitude = models.FloatField("위도", null=True)
+    longitude = models.FloatField("경도", null=True)
+    geo_cell = models.PositiveIntegerField("위치 격자 번호", null=True, db_index=True)
     hit = models.PositiveIntegerField("조회수", default=0)
+    rating_sum = models.PositiveIntegerField("리뷰 별점 합계", default=0)
+    rating_count = models.PositiveIntegerField("리뷰 수", default=0)
+    bookmark_count = models.PositiveIntegerField("북마크 수", default=0)
 
     place_bookmark = models.ManyToManyField(User, verbose_name="장소 북마크", related_name="bookmark_place", blank=True)
 
@@ -45,7 +135,93 @@ class Place(models.Model):
     def __str__(self):
         return f"[장소명]{self.place_name}"
 
+    # 맛집이 속한 카테고리 번호 리스트
     @property
-    def hit_count(self):
-        self.hit += 1
-        self.save()
\ No newline at end of file
+    def cate_ids(self):
+        cate_ids = []
+        for cate_id in range(1, len(CHOICE_CATEGORY) + 1):
+            field, words = category_lookup(cate_id)
+            if any(word in getattr(self, field) for word in words):
+                cate_ids.append(cate_id)
+        return cate_ids
+
+
+# 유저별 맛집 추천 결과(배치 작업으로 미리 계산)
+class PlaceRecommendation(models.Model):
+    cate_id = models.PositiveSmallIntegerField("카테고리 번호")
+    place_list = models.JSONField("추천 맛집 id 리스트", default=list)
+    updated_at = models.DateTimeField("추천 갱신 시간", auto_now=True)
+
+    user = models.ForeignKey(User, verbose_name="회원", on_delete=models.CASCADE, related_name="place_recommendation")
+
+    class Meta:
+        db_table = "place_recommendation"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "cate_id"], name="unique_place_recommendation"),
+        ]
+
+    def __str__(self):
+        return f"[회원]{self.user_id}, [카테고리]{self.cate_id}"
+
+# 맛집별 일일 고유 방문자 수(HyperLogLog 추정값을 하루 단위로 집계)
+class PlaceVisitor(models.Model):
+    date = models.DateField("날짜")
+    visitors = models.PositiveIntegerField("고유 방문자 수", default=0)
+
+    place = models.ForeignKey(Place, verbose_name="장소", on_delete=models.CASCADE, related_name="place_visitor")
+
+    class Meta:
+        db_table = "place_visitor"
+        constraints = [
+            models.UniqueConstraint(fields=["place", "date"], name="unique_place_visitor"),
+        ]
+
+    def __str__(self):
+        return f"[장소]{self.place_id}, [날짜]{self.date}, [방문자]{self.visitors}"
+
+
+# 검색 엔진(Algolia)에 반영할 맛집 변경 목록(맛집별 한 행, 배치 작업으로 전송 후 삭제)
+class PlaceIndexOutbox(models.Model):
+    place_id = models.PositiveIntegerField("장소 id", unique=True)
+    deleted = models.BooleanField("삭제 여부", default=False)
+    rating_only = models.BooleanField("별점만 변경", default=False)
+    updated_at = models.DateTimeField("변경 시간", auto_now=True)
+
+    class Meta:
+        db_table = "place_index_outbox"
+
+    def __str__(self):
+        return f"[장소]{self.place_id}, [삭제]{self.deleted}"
+
+
+# 맛집 주간 영업시간(place_time을 파싱한 결과, 월요일 0시부터 지난 분 단위 [start, end) 구간, 행이 없으면 알 수 없음)
+class PlaceOpeningHours(models.Model):
+    start = models.PositiveSmallIntegerField("영업 시작(분)")
+    end = models.PositiveSmallIntegerField("영업 종료(분)")
+
+    place = models.ForeignKey(Place, verbose_name="장소", on_delete=models.CASCADE, related_name="opening_hours")
+
+    class Meta:
+        db_table = "place_opening_hours"
+        indexes = [
+            models.Index(fields=["start", "end"], name="place_opening_hours_range"),
+        ]
+
+    def __str__(self):
+        return f"[장소]{self.place_id}, [영업시간]{self.start}~{self.end}"
+
+
+# 맛집 인기 급상승 점수(배치 작업으로 계산, 북마크 수는 다음 계산 때 증가분을 구하기 위한 기록)
+class PlaceTrend(models.Model):
+    score = models.FloatField("인기 점수", default=0)
+    bookmark_count = models.PositiveIntegerField("계산 시점 북마크 수", default=0)
+    bookmark_score = models.FloatField("북마크 증가 점수", default=0)
+    updated_at = models.DateTimeField("계산 시간")
+
+    place = models.OneToOneField(Place, verbose_name="장소", on_delete=models.CASCADE, related_name="place_trend")
+
+    class Meta:
+        db_table = "place_trend"
+
+    def __str__(self):
+        return f"[장소]{self.place_id}, [점수]{self.score}"
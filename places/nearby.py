@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from .models import Place
+
+import math
+import numpy as np
+
+EARTH_RADIUS = 6371008.8   # 지구 평균 반지름(m)
+GEO_CELL_SIZE = 0.01       # 격자 한 칸의 크기(위도, 경도 0.01도, 제주에서 약 1.1km x 0.93km)
+GEO_CELL_COLUMNS = 36000   # 경도 방향 격자 수(360 / GEO_CELL_SIZE)
+NEARBY_FIELDS = ["id", "place_name", "category", "rating", "place_address", "place_img", "latitude", "longitude", "hit"]
+
+
+# 위도, 경도가 속한 격자 번호(위도 행 * 경도 방향 격자 수 + 경도 열)
+def get_geo_cell(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    return get_geo_row(float(latitude)) * GEO_CELL_COLUMNS + get_geo_column(float(longitude))
+
+
+def get_geo_row(latitude):
+    return math.floor((latitude + 90) / GEO_CELL_SIZE)
+
+
+def get_geo_column(longitude):
+    return math.floor((longitude + 180) / GEO_CELL_SIZE)
+
+
+# 저장할 때 좌표로 격자 번호 갱신(loaddata 포함)
+@receiver(pre_save, sender=Place)
+def update_geo_cell(sender, instance, **kwargs):
+    instance.geo_cell = get_geo_cell(instance.latitude, instance.longitude)
+
+
+# 요청 파라미터의 위도(lat), 경도(lng)(없으면 None, 숫자가 아니거나 범위를 벗어나면 ValueError)
+def get_location(params):
+    if params.get("lat") is None and params.get("lng") is None:
+        return None
+    latitude, longitude = float(params.get("lat")), float(params.get("lng"))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("위치 범위 에러")
+    return latitude, longitude
+
+
+# 한 지점에서 여러 지점까지의 거리(m, haversine)
+def haversine(latitude, longitude, latitudes, longitudes):
+    latitude, longitude = np.radians(latitude), np.radians(longitude)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((latitudes - latitude) / 2) ** 2 + np.cos(latitude) * np.cos(latitudes) * np.sin((longitudes - longitude) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+# 반경 radius(m) 원을 감싸는 격자들의 조회 조건(위도 행마다 경도 열 범위 하나)
+def get_cell_lookup(latitude, longitude, radius):
+    latitude_delta = math.degrees(radius / EARTH_RADIUS)
+    longitude_delta = latitude_delta / max(math.cos(math.radians(min(abs(latitude) + latitude_delta, 89.9))), 1e-6)
+    first_column, last_column = get_geo_column(longitude - longitude_delta), get_geo_column(longitude + longitude_delta)
+
+    lookup = Q()
+    for row in range(get_geo_row(latitude - latitude_delta), get_geo_row(latitude + latitude_delta) + 1):
+        lookup |= Q(geo_cell__range=(row * GEO_CELL_COLUMNS + first_column, row * GEO_CELL_COLUMNS + last_column))
+    return lookup
+
+
+# 반경 안의 맛집을 가까운 순으로 limit개(거리 m를 distance로 추가, open_at이 주어지면 그 시간에 영업 중인 맛집만)
+# 격자 안의 후보는 id와 좌표만 조회해서 거리를 계산하고 나머지 필드는 limit개만 조회
+def places_within(latitude, longitude, radius, limit, category=None, open_at=None):
+    queryset = Place.objects.filter(get_cell_lookup(latitude, longitude, radius))
+    if category:
+        queryset = queryset.filter(category=category)
+    if open_at:
+        queryset = queryset.open_at(open_at)
+    candidates = np.array(list(queryset.values_list("id", "latitude", "longitude")), dtype=np.float64).reshape(-1, 3)
+
+    distances = haversine(latitude, longitude, candidates[:, 1], candidates[:, 2])
+    order = np.argsort(distances, kind="stable")[: np.count_nonzero(distances <= radius)][:limit]
+    place_ids = candidates[order, 0].astype(np.int64).tolist()
+    places = {place["id"]: place for place in Place.objects.filter(id__in=place_ids).values(*NEARBY_FIELDS)}
+    return [dict(places[place_id], distance=round(float(distance), 1)) for place_id, distance in zip(place_ids, distances[order]) if place_id in places]
+
+
+# 가까운 맛집 k개(격자 한 칸 거리에서 시작해서 k개가 찰 때까지 반경을 두 배씩 넓힘)
+def nearest_places(latitude, longitude, k, category=None, max_radius=None, open_at=None):
+    max_radius = max_radius or settings.PLACE_NEARBY_MAX_RADIUS
+    radius = min(GEO_CELL_SIZE * math.pi / 180 * EARTH_RADIUS, max_radius)
+    while True:
+        places = places_within(latitude, longitude, radius, k, category, open_at)
+        if len(places) >= k or radius >= max_radius:
+            return places
+        radius = min(radius * 2, max_radius)
+
+
+# 추천 순위(앞에 있을수록 1에 가까움)와 거리(가까울수록 1에 가까움)를 섞어서 다시 정렬
+# 추천 엔진마다 점수 범위가 달라서 순위를 점수로 사용, 좌표가 없는 맛집은 거리 점수 0
+def rerank_by_distance(place_list, latitude, longitude):
+    if not place_list:
+        return [], {}
+    locations = {place_id: (lat, lng) for place_id, lat, lng in Place.objects.filter(id__in=place_list).values_list("id", "latitude", "longitude")}
+    coordinates = np.array([locations.get(place_id, (None, None)) for place_id in place_list], dtype=np.float64)
+    distances = haversine(latitude, longitude, coordinates[:, 0], coordinates[:, 1])
+
+    relevance = 1 - np.arange(len(place_list)) / len(place_list)
+    proximity = np.nan_to_num(np.exp(-distances / settings.RECOMMEND_DISTANCE_SCALE))
+    scores = (1 - settings.RECOMMEND_DISTANCE_WEIGHT) * relevance + settings.RECOMMEND_DISTANCE_WEIGHT * proximity
+    ranked = np.argsort(-scores, kind="stable")
+    return [place_list[index] for index in ranked], {place_list[index]: round(float(distances[index]), 1) for index in ranked if not np.isnan(distances[index])}
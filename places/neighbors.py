@@ -0,0 +1,119 @@
+from django.conf import settings
+
+from .rcm_places import user_similarity, top_k, similar_users
+
+import os
+import tempfile
+import numpy as np
+
+
+class NeighborIndex:
+    """
+    카테고리별 유저의 상위 k명 유사 유저
+    neighbor_ids[i], scores[i]는 user_ids[i] 유저의 유사 유저 id, 유사도(내림차순, 빈 자리는 -1, -inf)
+    """
+
+    def __init__(self, user_ids, neighbor_ids, scores):
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.neighbor_ids = np.asarray(neighbor_ids, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.user_index = {int(user_id): row for row, user_id in enumerate(self.user_ids)}
+
+    @property
+    def k(self):
+        return self.neighbor_ids.shape[1]
+
+    @classmethod
+    def empty(cls, k):
+        return cls(np.empty(0), np.empty((0, k)), np.empty((0, k)))
+
+    def get(self, user_id):
+        row = self.user_index[user_id]
+        valid = self.neighbor_ids[row] >= 0
+        return self.neighbor_ids[row][valid], self.scores[row][valid]
+
+    # 유저의 유사 유저 목록 저장(k개보다 적으면 빈 자리로 채움)
+    def set(self, user_id, neighbor_ids, scores):
+        if user_id not in self.user_index:
+            self.user_index[user_id] = len(self.user_ids)
+            self.user_ids = np.append(self.user_ids, user_id)
+            self.neighbor_ids = np.vstack([self.neighbor_ids, np.full((1, self.k), -1)])
+            self.scores = np.vstack([self.scores, np.full((1, self.k), -np.inf)])
+
+        row = self.user_index[user_id]
+        count = min(len(neighbor_ids), self.k)
+        self.neighbor_ids[row] = -1
+        self.scores[row] = -np.inf
+        self.neighbor_ids[row, :count] = neighbor_ids[:count]
+        self.scores[row, :count] = scores[:count]
+
+    def remove(self, user_id):
+        if user_id not in self.user_index:
+            return
+        keep = self.user_ids != user_id
+        self.__init__(self.user_ids[keep], self.neighbor_ids[keep], self.scores[keep])
+
+    def save(self, path):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, user_ids=self.user_ids, neighbor_ids=self.neighbor_ids, scores=self.scores)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["user_ids"], f["neighbor_ids"], f["scores"])
+
+
+def get_neighbor_path(cate_id):
+    os.makedirs(settings.RECOMMEND_DIR, exist_ok=True)
+    return os.path.join(settings.RECOMMEND_DIR, f"neighbors_{cate_id}.npz")
+
+
+# 한 유저의 별점이 바뀌었을 때 해당 유저와 영향을 받는 유저의 유사 유저만 갱신, 추천 결과를 다시 계산할 유저 id 반환
+def update_neighbors(neighbor_index, review_user, user_ids, user_id):
+    row_index = {int(uid): row for row, uid in enumerate(user_ids)}
+
+    # 대상 유저의 유사 유저 목록(카테고리에 리뷰가 남아있지 않으면 삭제)
+    sims = np.full(len(user_ids), -np.inf)
+    if user_id in row_index:
+        user_row = row_index[user_id]
+        sims = user_similarity(review_user, review_user[user_row])
+        sims[user_row] = -np.inf
+        neighbors = top_k(sims, neighbor_index.k)
+        neighbor_index.set(user_id, user_ids[neighbors], sims[neighbors])
+    else:
+        neighbor_index.remove(user_id)
+
+    # 다른 유저들과 대상 유저의 기존, 새 유사도
+    index_rows = np.array([row_index.get(int(uid), -1) for uid in neighbor_index.user_ids], dtype=np.int64)
+    new_scores = np.full(len(index_rows), -np.inf)
+    new_scores[index_rows >= 0] = sims[index_rows[index_rows >= 0]]
+
+    in_list = neighbor_index.neighbor_ids == user_id
+    had_user = in_list.any(axis=1)
+    old_scores = np.where(in_list, neighbor_index.scores, -np.inf).max(axis=1)
+    is_user = neighbor_index.user_ids == user_id
+
+    # 유사도가 낮아진 경우 다른 유저가 목록에 들어올 수 있으므로 해당 유저 행만 다시 계산
+    recompute = had_user & (new_scores < old_scores)
+    # 유사도가 높아졌거나 새로 상위 k명 안에 들어온 경우 목록에서 교체
+    merge = ~recompute & ~is_user & (had_user | (new_scores > neighbor_index.scores[:, -1]))
+
+    for row in np.flatnonzero(recompute):
+        other_id = int(neighbor_index.user_ids[row])
+        if other_id in row_index:
+            other_row = row_index[other_id]
+            neighbors, scores = similar_users(review_user, review_user[other_row], neighbor_index.k, exclude=other_row)
+            neighbor_index.set(other_id, user_ids[neighbors], scores)
+
+    for row in np.flatnonzero(merge):
+        other_id = int(neighbor_index.user_ids[row])
+        neighbor_ids, scores = neighbor_index.get(other_id)
+        keep = neighbor_ids != user_id
+        neighbor_ids = np.append(neighbor_ids[keep], user_id)
+        scores = np.append(scores[keep], new_scores[row])
+        order = np.argsort(-scores, kind="stable")
+        neighbor_index.set(other_id, neighbor_ids[order], scores[order])
+
+    return set(neighbor_index.user_ids[had_user | merge].tolist()) | {user_id}
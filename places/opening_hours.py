@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Place, PlaceOpeningHours
+
+import re
+
+DAY = 24 * 60
+WEEK = 7 * DAY
+WEEKDAYS = "월화수목금토일"
+
+# 크롤링한 place_time은 대부분 수집 시점의 영업 상태 한 줄(예: "21:30에 라스트오더", "17:00에 영업시작")이라
+# 영업 시작, 종료 중 하나만 알 수 있어서 영업시간을 알 수 없는 것으로 처리(영업 중인 맛집을 거를 때 제외하지 않음)
+# 시작, 종료 시간이 모두 있는 범위(예: "10:00~21:30", "매일 18:00 - 새벽 02:00")와 매주 휴무 요일(예: "매주 화요일 휴무")만 저장
+RANGE_PATTERN = re.compile(r"^(?:매일 )?(\d{1,2}):(\d{2}) ?[~-] ?(?:새벽 )?(\d{1,2}):(\d{2})(?:,? 매주 ([월화수목금토일])요일 휴무)?$")
+CLOSED_DAY_PATTERN = re.compile(r"^매주 ([월화수목금토일])요일 휴무$")
+
+
+# place_time을 하루 영업 구간(분, 다음 날 새벽까지면 24시 이후)과 휴무 요일로 변환(알 수 없으면 None)
+# 휴무 요일만 있으면 나머지 요일은 하루 종일 영업 중일 수 있는 것으로 처리
+def parse_daily_hours(place_time):
+    place_time = (place_time or "").strip()
+    match = CLOSED_DAY_PATTERN.match(place_time)
+    if match:
+        return (0, DAY), {WEEKDAYS.index(match.group(1))}
+
+    match = RANGE_PATTERN.match(place_time)
+    if not match:
+        return None
+
+    start_hour, start_minute, end_hour, end_minute, closed_day = match.groups()
+    if not (int(start_hour) < 24 and int(end_hour) <= 24 and int(start_minute) < 60 and int(end_minute) < 60):
+        return None
+    start, end = int(start_hour) * 60 + int(start_minute), int(end_hour) * 60 + int(end_minute)
+    if start == end:
+        return None
+    if end < start:
+        end += DAY
+    return (start, end), {WEEKDAYS.index(closed_day)} if closed_day else set()
+
+
+# place_time을 주간 영업 구간 [start, end) 목록으로 변환(일요일 밤에서 월요일 새벽으로 넘어가는 구간은 둘로 나눔)
+def parse_place_time(place_time):
+    daily = parse_daily_hours(place_time)
+    if daily is None:
+        return []
+
+    (start, end), closed_days = daily
+    intervals = []
+    for day in range(7):
+        if day in closed_days:
+            continue
+        day_start, day_end = day * DAY + start, day * DAY + end
+        if day_end > WEEK:
+            intervals += [(day_start, WEEK), (0, day_end - WEEK)]
+        else:
+            intervals.append((day_start, day_end))
+    return sorted(intervals)
+
+
+# 맛집들의 영업시간 다시 저장
+def update_opening_hours(places):
+    places = list(places)
+    with transaction.atomic():
+        PlaceOpeningHours.objects.filter(place_id__in=[place.id for place in places]).delete()
+        PlaceOpeningHours.objects.bulk_create(
+            [PlaceOpeningHours(place_id=place.id, start=start, end=end) for place in places for start, end in parse_place_time(place.place_time)],
+            batch_size=1000,
+        )
+
+
+def rebuild_opening_hours(batch_size=1000):
+    places = Place.objects.only("id", "place_time").order_by("id")
+    for start in range(0, places.count(), batch_size):
+        update_opening_hours(places[start : start + batch_size])
+
+
+# place_time이 바뀔 수 있는 저장마다 영업시간 갱신(loaddata 포함)
+@receiver(post_save, sender=Place)
+def update_place_opening_hours(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "place_time" in update_fields:
+        update_opening_hours([instance])
+
+
+# open_now 파라미터가 true 또는 1인지
+def get_open_now(params):
+    return params.get("open_now", "").lower() in ("true", "1")
+
+
+# 맛집 id 목록 중 지금(when) 영업 중인 맛집만 순서대로
+def filter_open_places(place_ids, when=None):
+    open_ids = set(Place.objects.filter(id__in=place_ids).open_at(when or timezone.now()).values_list("id", flat=True))
+    return [place_id for place_id in place_ids if place_id in open_ids]
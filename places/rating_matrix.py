@@ -0,0 +1,227 @@
+from django.conf import settings
+from django.db.models import Avg
+
+from reviews.models import Review
+from .models import Place, CHOICE_CATEGORY
+from .artifacts import save_arrays, load_arrays, current_version, get_artifact
+
+from scipy import sparse
+
+import os
+import fcntl
+import threading
+import contextlib
+import numpy as np
+
+
+class RatingMatrix:
+    """
+    유저 x 맛집 별점 희소 행렬(CSR)
+    행은 user_ids, 열은 place_ids 순서이며 값은 해당 유저가 맛집에 준 평균 별점
+    """
+
+    ARRAYS = ["data", "indices", "indptr", "shape", "user_ids", "place_ids"]
+
+    def __init__(self, matrix, user_ids, place_ids):
+        self.matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)
+        self.place_ids = np.asarray(place_ids, dtype=np.int64)
+        self.user_index = {int(user_id): row for row, user_id in enumerate(self.user_ids)}
+        self.place_index = {int(place_id): col for col, place_id in enumerate(self.place_ids)}
+
+    # DB의 리뷰로 행렬 생성(유저, 맛집별 평균 별점)
+    @classmethod
+    def build(cls):
+        reviews = Review.objects.order_by().values_list("author_id", "place_id").annotate(rating=Avg("rating_cnt"))
+        rows = np.array(list(reviews), dtype=np.float64).reshape(-1, 3)
+
+        user_ids, user_rows = np.unique(rows[:, 0].astype(np.int64), return_inverse=True)
+        place_ids, place_cols = np.unique(rows[:, 1].astype(np.int64), return_inverse=True)
+        matrix = sparse.csr_matrix((rows[:, 2], (user_rows, place_cols)), shape=(len(user_ids), len(place_ids)))
+        return cls(matrix, user_ids, place_ids)
+
+    # 주어진 맛집 id에 해당하는 열만 잘라낸 부분 행렬(리뷰가 없는 유저, 맛집은 제외)
+    def partition(self, place_ids):
+        cols = np.array([self.place_index[place_id] for place_id in place_ids if place_id in self.place_index], dtype=np.int64)
+        review_user = self.matrix[:, cols]
+
+        rows = np.flatnonzero(review_user.getnnz(axis=1))
+        review_user = review_user[rows]
+        kept = np.flatnonzero(review_user.getnnz(axis=0))
+        return review_user[:, kept], self.user_ids[rows], self.place_ids[cols[kept]]
+
+    # 유저들의 맛집 별점 일괄 변경(0이면 삭제, 행렬은 한 번만 다시 만듦)
+    def set_ratings(self, user_ids, place_ids, ratings):
+        for user_id in user_ids:
+            if user_id not in self.user_index:
+                self.user_index[user_id] = len(self.user_ids)
+                self.user_ids = np.append(self.user_ids, user_id)
+        for place_id in place_ids:
+            if place_id not in self.place_index:
+                self.place_index[place_id] = len(self.place_ids)
+                self.place_ids = np.append(self.place_ids, place_id)
+
+        shape = (len(self.user_ids), len(self.place_ids))
+        matrix = sparse.csr_matrix((self.matrix.data, self.matrix.indices, np.append(self.matrix.indptr, [self.matrix.nnz] * (shape[0] - self.matrix.shape[0]))), shape=shape)
+        rows = np.array([self.user_index[user_id] for user_id in user_ids], dtype=np.int64)
+        cols = np.array([self.place_index[place_id] for place_id in place_ids], dtype=np.int64)
+        deltas = np.asarray(ratings, dtype=np.float32) - np.asarray(matrix[rows, cols], dtype=np.float32).ravel()
+        self.matrix = matrix + sparse.csr_matrix((deltas, (rows, cols)), shape=shape, dtype=np.float32)
+        self.matrix.eliminate_zeros()
+
+        # 리뷰가 모두 삭제된 유저, 맛집은 행렬에서 제외
+        if not all(ratings):
+            rows = np.flatnonzero(self.matrix.getnnz(axis=1))
+            cols = np.flatnonzero(self.matrix.getnnz(axis=0))
+            self.__init__(self.matrix[rows][:, cols], self.user_ids[rows], self.place_ids[cols])
+
+    def save(self, name):
+        save_arrays(
+            name,
+            {
+                "data": self.matrix.data,
+                "indices": self.matrix.indices,
+                "indptr": self.matrix.indptr,
+                "shape": np.array(self.matrix.shape),
+                "user_ids": self.user_ids,
+                "place_ids": self.place_ids,
+            },
+        )
+
+    # 저장된 배열을 복사 없이 memmap으로 사용(수정할 경우 mmap_mode=None으로 읽음)
+    @classmethod
+    def load(cls, name, version=None, mmap_mode="r"):
+        arrays = load_arrays(name, cls.ARRAYS, version, mmap_mode)
+        matrix = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(arrays["shape"]))
+        return cls(matrix, arrays["user_ids"], arrays["place_ids"])
+
+
+##### 행렬 저장소 #####
+_thread_lock = threading.Lock()
+
+
+# 전체 행렬(cate_id=None) 또는 카테고리별로 미리 잘라둔 행렬 이름
+def get_matrix_name(cate_id=None):
+    return "rating_matrix" if cate_id is None else f"rating_matrix_{cate_id}"
+
+
+# 워커 간 동시 쓰기 방지
+@contextlib.contextmanager
+def store_lock():
+    os.makedirs(settings.RECOMMEND_DIR, exist_ok=True)
+    with _thread_lock, open(os.path.join(settings.RECOMMEND_DIR, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# 전체 행렬과 카테고리별 행렬 생성(요청 시에는 해당 카테고리 행렬만 읽음, DB에서 만들었으므로 변경 기록은 비움)
+def rebuild_rating_matrix():
+    with store_lock():
+        rating_matrix = RatingMatrix.build()
+        rating_matrix.save(get_matrix_name())
+        save_rating_log(get_matrix_name(), [], [], [])
+        for cate_id in range(1, len(CHOICE_CATEGORY) + 1):
+            place_ids = Place.objects.category(cate_id).values_list("id", flat=True)
+            RatingMatrix(*rating_matrix.partition(place_ids)).save(get_matrix_name(cate_id))
+            save_rating_log(get_matrix_name(cate_id), [], [], [])
+
+
+##### 별점 변경 기록 #####
+# 리뷰 작성, 수정, 삭제마다 행렬 전체를 다시 저장하지 않도록 (유저, 맛집)별 최신 별점(0이면 삭제)만 작은 변경 기록에 저장하고
+# 조회할 때 행렬에 합친 뒤 주기적으로(또는 RECOMMEND_RATING_LOG_SIZE개가 넘으면) 행렬에 합쳐서 새 버전으로 저장
+RATING_LOG_ARRAYS = ["user_ids", "place_ids", "ratings"]
+
+
+def get_log_name(name):
+    return f"{name}_log"
+
+
+def load_rating_log(name, version=None):
+    return load_arrays(name, RATING_LOG_ARRAYS, version, mmap_mode=None)
+
+
+def save_rating_log(name, user_ids, place_ids, ratings):
+    save_arrays(
+        get_log_name(name),
+        {
+            "user_ids": np.asarray(user_ids, dtype=np.int64),
+            "place_ids": np.asarray(place_ids, dtype=np.int64),
+            "ratings": np.asarray(ratings, dtype=np.float32),
+        },
+    )
+
+
+# 변경 기록을 {(유저 id, 맛집 id): 별점}으로 조회
+def get_rating_log(name):
+    log = load_rating_log(get_log_name(name))
+    if log is None:
+        return {}
+    return {(user_id, place_id): rating for user_id, place_id, rating in zip(log["user_ids"].tolist(), log["place_ids"].tolist(), log["ratings"].tolist())}
+
+
+# 변경 기록을 행렬에 합쳐서 새 버전으로 저장하고 변경 기록 비우기(store_lock 안에서 호출)
+def compact_rating_log(name):
+    ratings = get_rating_log(name)
+    if not ratings:
+        return 0
+    rating_matrix = RatingMatrix.load(name, mmap_mode=None)
+    rating_matrix.set_ratings([user_id for user_id, _ in ratings], [place_id for _, place_id in ratings], list(ratings.values()))
+    rating_matrix.save(name)
+    save_rating_log(name, [], [], [])
+    return len(ratings)
+
+
+# 전체 행렬과 카테고리별 행렬의 변경 기록을 행렬에 합침
+def compact_rating_matrix():
+    names = [get_matrix_name(cate_id) for cate_id in [None] + list(range(1, len(CHOICE_CATEGORY) + 1))]
+    with store_lock():
+        return sum(compact_rating_log(name) for name in names if current_version(name))
+
+
+_merged = {}
+
+
+# 저장된 행렬에 변경 기록을 합친 행렬 조회(행렬이나 변경 기록의 새 버전이 저장된 경우에만 다시 합침)
+def get_rating_matrix(cate_id=None):
+    name = get_matrix_name(cate_id)
+    if current_version(name) is None:
+        rebuild_rating_matrix()
+
+    # 변경 기록을 먼저 읽어야 그 사이 합치기가 끝나도 변경 사항이 빠지지 않음(이미 합친 별점을 다시 적용해도 결과는 같음)
+    log = get_artifact(get_log_name(name), load_rating_log)
+    rating_matrix = get_artifact(name, RatingMatrix.load)
+    if log is None or not len(log["ratings"]):
+        return rating_matrix
+
+    key = (settings.RECOMMEND_DIR, name)
+    cached = _merged.get(key)
+    if cached is None or cached[0] is not rating_matrix or cached[1] is not log:
+        merged = RatingMatrix(rating_matrix.matrix, rating_matrix.user_ids, rating_matrix.place_ids)
+        merged.set_ratings(log["user_ids"].tolist(), log["place_ids"].tolist(), log["ratings"].tolist())
+        cached = (rating_matrix, log, merged)
+        _merged[key] = cached
+    return cached[2]
+
+
+# 리뷰 작성, 수정, 삭제 후 전체 행렬과 맛집이 속한 카테고리 행렬의 변경 기록에 해당 유저, 맛집 별점만 추가
+def update_rating(user_id, place_id):
+    if current_version(get_matrix_name()) is None:  # 아직 생성 전이면 다음 조회 때 DB에서 생성
+        return
+
+    rating = Review.objects.filter(author_id=user_id, place_id=place_id).aggregate(rating=Avg("rating_cnt"))["rating"] or 0
+    place = Place.objects.filter(id=place_id).first()
+    cate_ids = place.cate_ids if place else []
+
+    with store_lock():
+        for cate_id in [None] + cate_ids:
+            name = get_matrix_name(cate_id)
+            if current_version(name) is None:
+                continue
+            ratings = get_rating_log(name)
+            ratings[user_id, place_id] = rating
+            save_rating_log(name, [user_id for user_id, _ in ratings], [place_id for _, place_id in ratings], list(ratings.values()))
+            if len(ratings) > settings.RECOMMEND_RATING_LOG_SIZE:
+                compact_rating_log(name)
@@ -0,0 +1,47 @@
+from django.db.models import Sum, Count
+
+from reviews.models import Review
+from .models import Place
+from .index import enqueue_place, enqueue_places
+
+from decimal import Decimal, ROUND_HALF_UP
+
+
+# 리뷰 작성(1, 별점), 수정(0, 별점 차이), 삭제(-1, -별점) 후 같은 트랜잭션에서 호출
+# 합계, 개수에 포함되지 않은 리뷰(관리자 페이지, ORM으로 작성 등)를 수정, 삭제해서 0보다 작아지는 경우는 리뷰 집계로 다시 계산
+# UPDATE는 signal이 발생하지 않아서 검색 엔진 outbox에 직접 추가
+def update_place_rating(place_id, rating_delta, count_delta):
+    if not Place.objects.filter(id=place_id, rating_sum__gte=-rating_delta, rating_count__gte=-count_delta).add_rating(rating_delta, count_delta):
+        reconcile_place_ratings(place_ids=[place_id])
+    enqueue_place(place_id, rating_only=True)
+
+
+def get_average_rating(rating_sum, rating_count):
+    return (Decimal(rating_sum) / rating_count).quantize(Decimal("0.01"), ROUND_HALF_UP)
+
+
+# 리뷰 집계 쿼리 한 번으로 모든 맛집(place_ids가 있으면 해당 맛집만)의 별점 합계, 리뷰 수, 평균을 다시 계산해서 다른 맛집만 수정
+# 리뷰가 한 번도 없었던 맛집은 크롤링한 별점을 유지
+def reconcile_place_ratings(batch_size=1000, place_ids=None):
+    reviews, places = Review.objects.all(), Place.objects.all()
+    if place_ids is not None:
+        reviews, places = reviews.filter(place_id__in=place_ids), places.filter(id__in=place_ids)
+    totals = {
+        row["place_id"]: (row["rating_sum"], row["rating_count"])
+        for row in reviews.values("place_id").annotate(rating_sum=Sum("rating_cnt"), rating_count=Count("id"))
+    }
+
+    changed = []
+    for place in places.only("id", "rating", "rating_sum", "rating_count").iterator(chunk_size=batch_size):
+        rating_sum, rating_count = totals.get(place.id, (0, 0))
+        if rating_count:
+            rating = get_average_rating(rating_sum, rating_count)
+        else:
+            rating = 0 if place.rating_count else place.rating
+        if (place.rating_sum, place.rating_count, place.rating) != (rating_sum, rating_count, rating):
+            place.rating_sum, place.rating_count, place.rating = rating_sum, rating_count, rating
+            changed.append(place)
+
+    Place.objects.bulk_update(changed, ["rating_sum", "rating_count", "rating"], batch_size=batch_size)
+    enqueue_places([place.id for place in changed], rating_only=True)
+    return len(changed)
@@ -1,7 +1,9 @@
-import pandas as pd
+from django.conf import settings
+
 import numpy as np
 
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+from scipy.sparse.linalg import norm
 
 import sys
 import os
@@ -13,43 +15,141 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "gaggamagga.settings")
 django.setup()
 
 
-# 유사한 유저 정보 조회 및 추천(기존 사용이력이 없는 사용자)
-def rcm_place_new_user(review_user, place_id):
+# 대상 유저 벡터와 전체 유저의 코사인 유사도(대상 유저 한 행과 전체 행렬의 곱 한 번으로 계산)
+def user_similarity(review_user, user_vector):
+    norms = norm(review_user, axis=1) * norm(user_vector)
+    dots = np.asarray((review_user @ user_vector.T).todense()).ravel()
+    return np.divide(dots, norms, out=np.zeros_like(dots, dtype=np.float64), where=norms > 0)
+
+
+# 유사도 상위 k개의 위치만 부분 정렬(유사도 내림차순, 제외된 -inf는 선택하지 않음)
+def top_k(scores, k):
+    k = min(k, np.count_nonzero(np.isfinite(scores)))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    neighbors = np.argpartition(-scores, k - 1)[:k]
+    return neighbors[np.argsort(-scores[neighbors], kind="stable")]
+
+
+# 대상 유저 벡터와 유사한 상위 k명의 유저(유사도 내림차순)
+def similar_users(review_user, user_vector, k, exclude=None):
+    scores = user_similarity(review_user, user_vector)
+
+    # 자기 자신 제외
+    if exclude is not None:
+        scores[exclude] = -np.inf
 
-    # 유저 데이터 데이터 프레임 생성
-    new_idx = int(review_user.iloc[len(review_user) - 1].name) + 1
-    review_user.loc[new_idx] = np.nan
-    review_user.loc[new_idx, place_id] = 5
-    review_user = review_user.fillna(0)
+    neighbors = top_k(scores, k)
+    return neighbors, scores[neighbors]
 
-    # 코사인 유사도 분석
-    user_sim_np = cosine_similarity(review_user, review_user)
-    user_sim_df = pd.DataFrame(user_sim_np, index=review_user.index, columns=review_user.index)
 
-    # 유사한 유저 선택
-    picked_user = user_sim_df.sort_values(by=new_idx, ascending=False).index[1]
-    result = review_user.query(f"author_id == {picked_user}").sort_values(ascending=False, by=picked_user, axis=1)
+# 유사한 유저들의 별점을 유사도로 가중합하여 맛집 정렬
+def rank_places(review_user, place_ids, neighbors, weights):
+    place_scores = review_user[neighbors].T @ weights
+    return place_ids[np.argsort(-place_scores, kind="stable")].tolist()
 
-    # 가장 유사한 유저 추천
-    result_list = []
-    for column in result:
-        result_list.append(column)
-    return result_list
+
+# 유사한 유저 정보 조회 및 추천(기존 사용이력이 없는 사용자)
+def rcm_place_new_user(review_user, place_ids, place_id, k=None):
+    k = k or settings.RECOMMEND_NEIGHBORS
+
+    # 선택한 맛집에 별점 5점을 준 임시 유저 생성
+    cols = np.flatnonzero(place_ids == place_id)
+    user_vector = sparse.csr_matrix((np.full(len(cols), 5), (np.zeros(len(cols)), cols)), shape=(1, len(place_ids)))
+
+    neighbors, weights = similar_users(review_user, user_vector, k)
+    place_list = rank_places(review_user, place_ids, neighbors, weights)
+
+    # 선택한 맛집이 행렬에 없으면 마지막에 추가
+    if not len(cols):
+        place_list.append(place_id)
+    return place_list
 
 
 # 유사한 유저 정보 조회 및 추천(기존 유저)
-def rcm_place_user(review_user, user_id):
+def rcm_place_user(review_user, user_ids, place_ids, user_id, k=None):
+    k = k or settings.RECOMMEND_NEIGHBORS
+    user_row = int(np.flatnonzero(user_ids == user_id)[0])
+
+    neighbors, weights = similar_users(review_user, review_user[user_row], k, exclude=user_row)
+
+    # 비교할 다른 유저가 없을 경우
+    if not len(neighbors):
+        return place_ids.tolist()
+    return rank_places(review_user, place_ids, neighbors, weights)
+
+
+# 유사한 유저 정보 조회 및 추천(전체 유저 일괄 계산, chunk_size명씩 행렬 곱으로 처리)
+def rcm_place_all_users(review_user, place_ids, user_rows, k=None, chunk_size=1000):
+    k = min(k or settings.RECOMMEND_NEIGHBORS, review_user.shape[0] - 1)
+
+    # 행 단위 정규화 후 행렬 곱 = 코사인 유사도
+    norms = norm(review_user, axis=1)
+    normalized = sparse.diags(np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)) @ review_user
+
+    for start in range(0, len(user_rows), chunk_size):
+        chunk = user_rows[start : start + chunk_size]
+
+        # 비교할 다른 유저가 없을 경우
+        if k <= 0:
+            for user_row in chunk:
+                yield user_row, np.array([], dtype=np.int64), np.array([]), place_ids.tolist()
+            continue
+
+        # 자기 자신 제외 후 유저별 상위 k명 부분 정렬
+        scores = (normalized[chunk] @ normalized.T).toarray()
+        scores[np.arange(len(chunk)), chunk] = -np.inf
+        neighbors = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        weights = np.take_along_axis(scores, neighbors, axis=1)
+
+        # 유사한 유저들의 별점을 유사도로 가중합하여 맛집 정렬
+        neighbor_weights = sparse.csr_matrix(
+            (weights.ravel(), neighbors.ravel(), np.arange(0, len(chunk) * k + 1, k)),
+            shape=(len(chunk), review_user.shape[0]),
+        )
+        place_scores = (neighbor_weights @ review_user).toarray()
+        ranked = place_ids[np.argsort(-place_scores, axis=1, kind="stable")]
+        for user_row, user_neighbors, user_weights, place_list in zip(chunk, neighbors, weights, ranked):
+            order = np.argsort(-user_weights, kind="stable")
+            yield user_row, user_neighbors[order], user_weights[order], place_list.tolist()
+
+
+##### 행렬 분해(implicit ALS) #####
+# 한 쪽 factor를 고정하고 다른 쪽 factor를 행 단위로 계산(Hu, Koren, Volinsky 2008)
+def als_step(confidence, fixed, regularization):
+    gram = fixed.T @ fixed + regularization * np.eye(fixed.shape[1])
+    solved = np.zeros((confidence.shape[0], fixed.shape[1]), dtype=np.float64)
+
+    for row in range(confidence.shape[0]):
+        start, end = confidence.indptr[row], confidence.indptr[row + 1]
+        if start == end:
+            continue
+        cols, conf = confidence.indices[start:end], confidence.data[start:end]
+        factors = fixed[cols]
+
+        # (YᵀY + Yᵀ(Cu - I)Y + λI)x = YᵀCu p(u), 관측된 항목만 더해서 계산
+        a = gram + (factors.T * conf) @ factors
+        b = factors.T @ (1 + conf)
+        solved[row] = np.linalg.solve(a, b)
+    return solved
+
+
+# 신뢰도 행렬(관측값 x alpha)로 유저, 맛집 factor 학습
+def train_als(confidence, factors, regularization, iterations, seed=0):
+    confidence = sparse.csr_matrix(confidence, dtype=np.float64)
+    confidence_t = confidence.T.tocsr()
+
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(scale=0.01, size=(confidence.shape[0], factors))
+    item_factors = rng.normal(scale=0.01, size=(confidence.shape[1], factors))
 
-    # 코사인 유사도 분석
-    user_sim_np = cosine_similarity(review_user, review_user)
-    user_sim_df = pd.DataFrame(user_sim_np, index=review_user.index, columns=review_user.index)
+    for _ in range(iterations):
+        user_factors = als_step(confidence, item_factors, regularization)
+        item_factors = als_step(confidence_t, user_factors, regularization)
+    return user_factors.astype(np.float32), item_factors.astype(np.float32)
 
-    # 유사한 유저 선택
-    picked_user = user_sim_df.sort_values(by=user_id, ascending=False).index[1]
-    result = review_user.query(f"author_id == {picked_user}").sort_values(ascending=False, by=picked_user, axis=1)
 
-    # 가장 유사한 유저 추천
-    result_list = []
-    for column in result:
-        result_list.append(column)
-    return result_list
\ No newline at end of file
+# 유저 factor와 카테고리 맛집 factor의 내적 한 번으로 맛집 정렬
+def rcm_place_factor(item_factors, place_ids, user_vector):
+    place_scores = item_factors @ user_vector
+    return place_ids[np.argsort(-place_scores, kind="stable")].tolist()
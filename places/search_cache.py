@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.cache import cache
+
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+import collections
+
+SEARCH_CACHE_KEY = "place_search:{digest}"
+SEARCH_VERSION_KEY = "place_search:version"   # 검색 색인이 바뀔 때마다 갱신해서 이전 결과 무효화
+
+# 워커별 최근 검색 결과(LRU)
+_local_results = collections.OrderedDict()
+_local_lock = threading.Lock()
+
+
+# 대소문자, 유니코드 표기, 공백만 다른 검색어는 같은 검색어로 취급
+def normalize_query(query):
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+def get_search_key(query, params):
+    digest = hashlib.sha1(json.dumps([normalize_query(query), params], sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+    return SEARCH_CACHE_KEY.format(digest=digest)
+
+
+# 맛집 저장, 삭제가 검색 색인에 반영된 뒤 호출
+def invalidate_search_cache():
+    cache.set(SEARCH_VERSION_KEY, time.time_ns(), None)
+    with _local_lock:
+        _local_results.clear()
+
+
+# 워커 메모리 -> 공유 캐시(Redis) -> 검색 엔진 순으로 조회
+# 색인 버전만 먼저 확인해서 워커 메모리에 있으면 공유 캐시의 검색 결과는 가져오지 않음
+def cached_search(query, params, search):
+    key = get_search_key(query, params)
+    version = cache.get(SEARCH_VERSION_KEY)
+
+    with _local_lock:
+        entry = _local_results.get(key)
+        if entry and entry[0] == version and entry[1] > time.monotonic():
+            _local_results.move_to_end(key)
+            return dict(entry[2], query=query)
+
+    entry = cache.get(key)
+    if entry and entry[0] == version:
+        results = entry[1]
+    else:
+        results = search(query, params)
+        cache.set(key, (version, results), settings.SEARCH_CACHE_TIMEOUT)
+
+    with _local_lock:
+        _local_results[key] = (version, time.monotonic() + settings.SEARCH_CACHE_LOCAL_TIMEOUT, results)
+        _local_results.move_to_end(key)
+        while len(_local_results) > settings.SEARCH_CACHE_SIZE:
+            _local_results.popitem(last=False)
+    return dict(results, query=query)
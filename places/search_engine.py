@@ -0,0 +1,280 @@
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Place, PlaceIndexOutbox
+from .artifacts import save_arrays, load_arrays, get_artifact, current_version
+from .search_cache import invalidate_search_cache
+
+import re
+import math
+import time
+import unicodedata
+import collections
+import numpy as np
+from urllib.parse import urlencode
+
+SEARCH_INDEX_NAME = "search_index"
+
+# 검색 필드별 가중치(맛집 이름에서 일치할수록 높은 점수)
+FIELD_WEIGHTS = {"place_name": 3.0, "category": 2.0, "place_address": 1.0, "place_number": 1.0, "menu": 0.5}
+
+# 검색 결과로 돌려줄 필드(places.index.PlaceIndex.fields와 같음)
+RECORD_FIELDS = ["place_name", "category", "rating", "place_address", "place_number", "place_img"]
+
+# facetFilters로 거를 수 있는 필드(Algolia와 같이 값 전체가 같은 맛집, "필드:-값" 또는 "-필드:값"은 제외)
+FACET_FIELDS = ["place_name", "category", "place_address", "place_number"]
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_MATCH = 0.75     # 검색어 n-gram 중 맛집에 있어야 하는 비율(오타 허용)
+RATING_BOOST = 0.2   # 별점 5점일 때 점수 20% 가산
+HIT_BOOST = 0.2      # 조회수가 가장 많은 맛집 점수 20% 가산
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def get_words(text):
+    return re.findall(r"\w+", normalize(text))
+
+
+# 별점, 조회수 가산점(조회수는 가장 많은 조회수 max_hit 대비 로그 비율)
+def get_boosts(ratings, hits, max_hit):
+    return 1 + RATING_BOOST * np.asarray(ratings, dtype=np.float64) / 5 + HIT_BOOST * np.log1p(hits) / np.log1p(max(max_hit, 1))
+
+
+# 단어의 2글자, 3글자 n-gram(한 글자 단어는 그대로 사용)
+# 색인할 때는 끝 글자 + 공백도 추가해서 한 글자 검색어가 단어의 모든 글자를 n-gram 앞부분으로 찾을 수 있게 함
+def get_grams(word, index=False):
+    if len(word) < 2:
+        return [word]
+    grams = [word[start : start + n] for n in (2, 3) for start in range(len(word) - n + 1)]
+    return grams + [word[-1] + " "] if index else grams
+
+
+class SearchIndex:
+    """
+    맛집 검색용 n-gram 역색인(Algolia 없이 검색)
+    grams(정렬된 n-gram)와 indptr로 n-gram별 맛집 위치(docs)와 BM25 점수(scores)를 CSR 형태로 저장
+    facet 값은 정렬된 "필드:값" 목록(facet_values)과 FACET_FIELDS별 맛집의 값 위치(facet_codes)로 저장
+    """
+
+    ARRAYS = ["grams", "indptr", "docs", "scores", "place_ids", "boosts", "facet_codes", "facet_values"]
+
+    def __init__(self, grams, indptr, docs, scores, place_ids, boosts, facet_codes, facet_values):
+        self.grams = grams
+        self.indptr = indptr
+        self.docs = docs
+        self.scores = scores
+        self.place_ids = place_ids
+        self.boosts = boosts
+        self.facet_codes = facet_codes
+        self.facet_values = facet_values
+
+    # 맛집 목록(dict)으로 색인 생성
+    @classmethod
+    def build(cls, rows):
+        gram_ids = {}
+        terms, docs, tfs, lengths = [], [], [], []
+        place_ids, ratings, hits, facets = [], [], [], []
+
+        for doc, row in enumerate(rows):
+            tf = collections.defaultdict(float)
+            for field, weight in FIELD_WEIGHTS.items():
+                for word in get_words(row[field]):
+                    for gram in get_grams(word, index=True):
+                        tf[gram] += weight
+            for gram, value in tf.items():
+                terms.append(gram_ids.setdefault(gram, len(gram_ids)))
+                docs.append(doc)
+                tfs.append(value)
+            lengths.append(sum(tf.values()))
+            place_ids.append(row["id"])
+            ratings.append(float(row["rating"]))
+            hits.append(row["hit"])
+            facets.append([f"{field}:{row[field] or ''}" for field in FACET_FIELDS])
+
+        # n-gram을 사전 순으로 정렬해서 id를 다시 매기고 (n-gram, 맛집) 순으로 정렬
+        grams = np.array(list(gram_ids), dtype="<U3")
+        rank = np.empty(len(grams), dtype=np.int64)
+        rank[np.argsort(grams, kind="stable")] = np.arange(len(grams))
+        terms = rank[np.array(terms, dtype=np.int64)]
+        docs = np.array(docs, dtype=np.int32)
+        tfs = np.array(tfs, dtype=np.float64)
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+
+        # BM25 점수를 미리 계산해서 검색할 때는 더하기만 함
+        df = np.bincount(terms, minlength=len(grams))
+        idf = np.log(1 + (len(place_ids) - df + 0.5) / (df + 0.5))
+        lengths = np.array(lengths, dtype=np.float64)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (lengths.mean() if len(lengths) and lengths.mean() else 1))
+        scores = idf[terms] * tfs * (BM25_K1 + 1) / (tfs + norm[docs])
+
+        hits = np.array(hits, dtype=np.float64)
+        boosts = get_boosts(ratings, hits, hits.max(initial=0))
+        facet_values, facet_codes = np.unique(np.array(facets, dtype=str).reshape(-1, len(FACET_FIELDS)), return_inverse=True)
+
+        return cls(
+            np.sort(grams),
+            np.concatenate([[0], np.cumsum(df)]).astype(np.int64),
+            docs,
+            scores.astype(np.float32),
+            np.array(place_ids, dtype=np.int64),
+            boosts.astype(np.float32),
+            facet_codes.reshape(-1, len(FACET_FIELDS)).T.astype(np.int32),
+            facet_values,
+        )
+
+    def save(self, name):
+        return save_arrays(name, {array_name: getattr(self, array_name) for array_name in self.ARRAYS})
+
+    # 별점, 조회수가 바뀐 맛집(dict 목록)의 가산점만 다시 계산한 색인(색인에 없는 맛집은 무시)
+    def with_boosts(self, rows, max_hit):
+        boosts = np.array(self.boosts, dtype=np.float32)
+        for row in rows:
+            position = np.searchsorted(self.place_ids, row["id"])
+            if position < len(self.place_ids) and self.place_ids[position] == row["id"]:
+                boosts[position] = get_boosts(float(row["rating"]), row["hit"], max_hit)
+        arrays = {array_name: getattr(self, array_name) for array_name in self.ARRAYS}
+        return type(self)(**{**arrays, "boosts": boosts})
+
+    @classmethod
+    def load(cls, name, version=None, mmap_mode="r"):
+        arrays = load_arrays(name, cls.ARRAYS, version, mmap_mode)
+        return cls(**arrays)
+
+    # 검색어 n-gram별 (맛집 위치, 점수) 목록(한 글자 단어는 그 글자로 시작하는 n-gram 모두)
+    def query_terms(self, query):
+        terms = []
+        for word in dict.fromkeys(get_words(query)):
+            for gram in dict.fromkeys(get_grams(word)):
+                start = np.searchsorted(self.grams, gram)
+                end = np.searchsorted(self.grams, gram + "\U0010ffff" if len(gram) == 1 else gram, side="right")
+                docs = self.docs[self.indptr[start] : self.indptr[end]]
+                scores = self.scores[self.indptr[start] : self.indptr[end]]
+                if end - start > 1:
+                    docs, inverse = np.unique(docs, return_inverse=True)
+                    scores = np.bincount(inverse, weights=scores)
+                terms.append((docs, scores))
+        return terms
+
+    # "필드:값"과 같은 값을 가진 맛집 위치 표시
+    def facet_match(self, field, value):
+        facet = f"{field}:{value}"
+        code = np.searchsorted(self.facet_values, facet)
+        if code < len(self.facet_values) and self.facet_values[code] == facet:
+            return self.facet_codes[FACET_FIELDS.index(field)] == code
+        return np.zeros(len(self.place_ids), dtype=bool)
+
+    # facetFilters("필드:값" 목록은 AND, 안쪽 목록은 OR) 조건에 맞는 맛집 위치 표시(조건이 없으면 None)
+    # FACET_FIELDS가 아닌 필드는 ValueError("-"로 시작하는 값 자체는 "필드:\-값"으로 찾음)
+    def facet_mask(self, facet_filters):
+        mask = None
+        for facet_filter in facet_filters or []:
+            condition = np.zeros(len(self.place_ids), dtype=bool)
+            for value in [facet_filter] if isinstance(facet_filter, str) else facet_filter:
+                field, _, value = value.partition(":")
+                negated = field.startswith("-") or value.startswith("-")
+                field, value = field.removeprefix("-"), value.removeprefix("-").removeprefix("\\")
+                if field not in FACET_FIELDS:
+                    raise ValueError(f"facet으로 사용할 수 없는 필드입니다: {field}")
+                match = self.facet_match(field, value)
+                condition |= ~match if negated else match
+            mask = condition if mask is None else mask & condition
+        return mask
+
+    # Algolia index.search와 같은 형태로 검색 결과 반환
+    def search(self, query, params=None):
+        started = time.perf_counter()
+        params = params or {}
+        hits_per_page = params.get("hitsPerPage", 20)
+        page = params.get("page", 0)
+
+        terms = self.query_terms(query)
+        candidates = np.array([], dtype=np.int64)
+        if terms:
+            docs = np.concatenate([docs for docs, _ in terms])
+            counts = np.bincount(docs, minlength=len(self.place_ids))
+            totals = np.bincount(docs, weights=np.concatenate([scores for _, scores in terms]), minlength=len(self.place_ids))
+            matched = counts >= max(1, math.ceil(MIN_MATCH * len(terms)))
+            mask = self.facet_mask(params.get("facetFilters"))
+            if mask is not None:
+                matched &= mask
+            candidates = np.flatnonzero(matched)
+
+        # 필요한 페이지까지만 골라서 정렬(점수가 같으면 id 순)
+        limit = (page + 1) * hits_per_page
+        if len(candidates):
+            totals = totals[candidates] * self.boosts[candidates]
+            if len(candidates) > limit:
+                top = np.argpartition(-totals, limit - 1)[:limit]
+                candidates, totals = candidates[top], totals[top]
+            candidates = candidates[np.lexsort((self.place_ids[candidates], -totals))]
+        place_ids = [int(place_id) for place_id in self.place_ids[candidates[page * hits_per_page : limit]]]
+
+        records = {record["objectID"]: record for record in get_records(place_ids)}
+        nb_hits = int(np.count_nonzero(matched)) if terms else 0
+        return {
+            "hits": [records[str(place_id)] for place_id in place_ids if str(place_id) in records],
+            "nbHits": nb_hits,
+            "page": page,
+            "nbPages": math.ceil(nb_hits / hits_per_page),
+            "hitsPerPage": hits_per_page,
+            "exhaustiveNbHits": True,
+            "query": query,
+            "params": urlencode({"query": query, **params}),
+            "processingTimeMS": int((time.perf_counter() - started) * 1000),
+        }
+
+
+# 검색 결과 레코드(Algolia 레코드와 같은 필드, 모델 객체를 만들지 않도록 values로 조회)
+def get_records(place_ids):
+    records = []
+    for record in Place.objects.filter(id__in=place_ids).values("id", *RECORD_FIELDS):
+        record["objectID"] = str(record.pop("id"))
+        record["rating"] = float(record["rating"])
+        records.append(record)
+    return records
+
+
+##### 검색 색인 저장소 #####
+def build_search_index(invalidate=True):
+    rows = Place.objects.values("id", "rating", "hit", *FIELD_WEIGHTS).order_by("id").iterator(chunk_size=2000)
+    index = SearchIndex.build(rows)
+    index.save(SEARCH_INDEX_NAME)
+    if invalidate:
+        invalidate_search_cache()
+    return index
+
+
+def get_search_index():
+    if current_version(SEARCH_INDEX_NAME) is None:
+        build_search_index()
+    return get_artifact(SEARCH_INDEX_NAME, SearchIndex.load)
+
+
+# 별점만 바뀐 맛집의 가산점만 갱신해서 새 버전으로 저장(n-gram 색인 배열은 이전 버전 파일을 그대로 공유)
+def update_search_boosts(place_ids, batch_size=1000):
+    version = current_version(SEARCH_INDEX_NAME)
+    index = SearchIndex.load(SEARCH_INDEX_NAME, version)
+    place_ids = list(place_ids)
+    rows = [row for start in range(0, len(place_ids), batch_size) for row in Place.objects.filter(id__in=place_ids[start : start + batch_size]).values("id", "rating", "hit")]
+    index = index.with_boosts(rows, Place.objects.aggregate(max_hit=Max("hit"))["max_hit"] or 0)
+    save_arrays(SEARCH_INDEX_NAME, {"boosts": index.boosts}, base_version=version)
+    return index
+
+
+# outbox에 변경된 맛집이 있으면 색인에 반영하고 반영된 변경 사항 삭제
+# 검색 필드가 바뀌었거나 추가, 삭제된 맛집이 있으면 색인을 새로 만들고, 별점만 바뀐 경우는 가산점만 갱신(검색 결과 캐시 유지)
+def sync_search_index():
+    started_at = timezone.now()
+    outbox = PlaceIndexOutbox.objects.filter(updated_at__lte=started_at)
+    if not outbox.exists():
+        return 0
+    if current_version(SEARCH_INDEX_NAME) is None or outbox.filter(rating_only=False).exists():
+        build_search_index()
+    else:
+        update_search_boosts(outbox.values_list("place_id", flat=True))
+    return outbox.delete()[0]
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Place, CHOICE_CATEGORY
+
+import random
+
+
+def get_pool_key(category, city=None):
+    return f"place_select_pool:{city}:{category}" if city else f"place_select_pool:{category}"
+
+
+# 음식 카테고리별, 장소(제주시, 서귀포시)의 음식 카테고리별 후보 맛집 id 목록 생성 후 캐시에 저장(쿼리 한 번)
+def refresh_select_pools():
+    pools = {}
+    for category in CHOICE_CATEGORY[:12]:
+        pools[get_pool_key(category)] = []
+        for city in CHOICE_CATEGORY[12:]:
+            pools[get_pool_key(category, city)] = []
+
+    for place_id, category, place_address in Place.objects.filter(category__in=CHOICE_CATEGORY[:12]).values_list("id", "category", "place_address"):
+        pools[get_pool_key(category)].append(place_id)
+        for city in CHOICE_CATEGORY[12:]:
+            if city in place_address:
+                pools[get_pool_key(category, city)].append(place_id)
+
+    cache.set_many(pools, settings.PLACE_SELECT_POOL_TIMEOUT)
+    return pools
+
+
+# 캐시된 후보 목록 조회(하나라도 없으면 전체 다시 생성)
+def get_select_pools(keys):
+    pools = cache.get_many(keys)
+    if len(pools) < len(keys):
+        pools = refresh_select_pools()
+    return [pools[key] for key in keys]
+
+
+# 취향 선택 번호별 후보 맛집 id 무작위 추출(DB 조회 없이 후보 목록에서 필요한 개수만 추출)
+def sample_select_places(choice_no):
+
+    # Case1: 장소(제주시, 서귀포시)를 선택했을 경우 해당 장소의 음식 종류별 맛집 하나씩
+    if choice_no > 12:
+        city = CHOICE_CATEGORY[choice_no - 1]
+        pools = get_select_pools([get_pool_key(category, city) for category in CHOICE_CATEGORY[:12]])
+        return [random.choice(pool) for pool in pools if pool]
+
+    # Case2: 한식, 패스트푸드, 아시아 선택햇을 경우 각 카테고리에 해당하는 맛집 3개씩
+    if (choice_no == 3) | (choice_no == 6) | (choice_no == 12):
+        pools = get_select_pools([get_pool_key(CHOICE_CATEGORY[choice_no - n]) for n in (1, 2, 3)])
+        return [place_id for pool in pools for place_id in random.sample(pool, min(3, len(pool)))]
+
+    # 한식, 패스트푸드, 아시아 외의 카테고리를 선택했을 경우 맛집 9개
+    pool = get_select_pools([get_pool_key(CHOICE_CATEGORY[choice_no - 1])])[0]
+    return random.sample(pool, min(9, len(pool)))
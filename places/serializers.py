@@ -3,8 +3,10 @@ from rest_framework import serializers
 from .models import Place
 
 
-# 맛집 serializer
+# 맛집 serializer(북마크 유저 목록 대신 북마크 수와 with_bookmarks로 조회한 북마크 여부)
 class PlaceSerializer(serializers.ModelSerializer):
+    is_bookmarked = serializers.BooleanField(read_only=True)
+
     class Meta:
         model = Place
         fields = (
@@ -21,5 +23,43 @@ class PlaceSerializer(serializers.ModelSerializer):
             "latitude",
             "longitude",
             "hit",
-            "place_bookmark",
-        )
\ No newline at end of file
+            "bookmark_count",
+            "is_bookmarked",
+        )
+
+
+# 맛집 리스트 serializer(리뷰, 프로필, 추천 리스트에 들어가는 맛집, 메뉴와 소개글 제외)
+class PlaceListSerializer(serializers.ModelSerializer):
+    is_bookmarked = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Place
+        fields = (
+            "id",
+            "place_name",
+            "category",
+            "rating",
+            "place_address",
+            "place_number",
+            "place_time",
+            "place_img",
+            "latitude",
+            "longitude",
+            "hit",
+            "bookmark_count",
+            "is_bookmarked",
+        )
+
+
+# 맛집 북마크 유저 serializer
+class PlaceBookmarkUserSerializer(serializers.ModelSerializer):
+    nickname = serializers.CharField(source="user.user_profile.nickname")
+    profile_image = serializers.ImageField(source="user.user_profile.profile_image")
+
+    class Meta:
+        model = Place.place_bookmark.through
+        fields = (
+            "user_id",
+            "nickname",
+            "profile_image",
+        )
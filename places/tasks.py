@@ -0,0 +1,143 @@
+from __future__ import absolute_import, unicode_literals
+
+from celery import shared_task
+
+from django.conf import settings
+from django.utils import timezone
+
+from users.models import User
+from .models import Place, PlaceRecommendation, CHOICE_CATEGORY
+from .rating_matrix import get_rating_matrix, update_rating, compact_rating_matrix, store_lock
+from .rcm_places import rcm_place_all_users, rank_places
+from .neighbors import NeighborIndex, get_neighbor_path, update_neighbors
+from .factors import train_factor_model
+from .select_pool import refresh_select_pools
+from .hit_counter import flush_hits
+from .visitors import rollup_visitors
+from .trending import update_trending
+from .index import sync_place_index
+from .search_engine import sync_search_index
+
+import os
+import numpy as np
+
+
+# 유저별 추천 결과 일괄 저장
+def save_place_recommendation(cate_id, place_lists):
+    recommendations = [
+        PlaceRecommendation(user_id=user_id, cate_id=cate_id, place_list=place_list[: settings.RECOMMEND_LIST_SIZE])
+        for user_id, place_list in place_lists.items()
+    ]
+    PlaceRecommendation.objects.bulk_create(
+        recommendations,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["user_id", "cate_id"],
+        update_fields=["place_list", "updated_at"],
+    )
+
+
+# 전체 활성 유저, 카테고리별 맛집 추천 결과 갱신
+@shared_task
+def update_place_recommendation():
+    active_user_ids = list(User.objects.filter(is_active=True, withdraw=False).values_list("id", flat=True))
+
+    for cate_id in range(1, len(CHOICE_CATEGORY) + 1):
+        started_at = timezone.now()
+        rating_matrix = get_rating_matrix(cate_id)
+        review_user, user_ids, place_ids = rating_matrix.matrix, rating_matrix.user_ids, rating_matrix.place_ids
+        user_rows = np.flatnonzero(np.isin(user_ids, active_user_ids))
+
+        place_lists = {}
+        neighbor_index = NeighborIndex.empty(settings.RECOMMEND_NEIGHBORS)
+        for user_row, neighbors, weights, place_list in rcm_place_all_users(review_user, place_ids, user_rows):
+            user_id = int(user_ids[user_row])
+            place_lists[user_id] = place_list
+            neighbor_index.set(user_id, user_ids[neighbors], weights)
+
+        save_place_recommendation(cate_id, place_lists)
+        with store_lock():
+            neighbor_index.save(get_neighbor_path(cate_id))
+
+        # 이번 갱신에 포함되지 않은(리뷰를 삭제했거나 비활성화된) 유저의 추천 결과 삭제
+        PlaceRecommendation.objects.filter(cate_id=cate_id, updated_at__lt=started_at).delete()
+
+
+# 리뷰 작성, 수정, 삭제 후 해당 유저와 영향을 받는 유저의 추천 결과만 갱신
+@shared_task
+def update_user_recommendation(user_id, place_id):
+    update_rating(user_id, place_id)
+    place = Place.objects.filter(id=place_id).first()
+
+    # 맛집이 속한 카테고리만 갱신
+    for cate_id in place.cate_ids if place else []:
+        path = get_neighbor_path(cate_id)
+        if not os.path.exists(path):
+            continue
+
+        rating_matrix = get_rating_matrix(cate_id)
+        review_user, user_ids, place_ids = rating_matrix.matrix, rating_matrix.user_ids, rating_matrix.place_ids
+        with store_lock():
+            neighbor_index = NeighborIndex.load(path)
+            affected_user_ids = update_neighbors(neighbor_index, review_user, user_ids, user_id)
+            neighbor_index.save(path)
+
+        # 유사 유저 목록을 이용해 영향을 받는 유저의 추천 결과만 다시 계산
+        row_index = {int(uid): row for row, uid in enumerate(user_ids)}
+        place_lists = {}
+        for affected_user_id in affected_user_ids:
+            if affected_user_id not in neighbor_index.user_index:
+                continue
+            neighbor_ids, weights = neighbor_index.get(affected_user_id)
+            known = np.isin(neighbor_ids, user_ids)
+            neighbors = np.array([row_index[neighbor_id] for neighbor_id in neighbor_ids[known].tolist()], dtype=np.int64)
+            place_lists[affected_user_id] = rank_places(review_user, place_ids, neighbors, weights[known])
+
+        save_place_recommendation(cate_id, place_lists)
+        if user_id not in neighbor_index.user_index:
+            PlaceRecommendation.objects.filter(user_id=user_id, cate_id=cate_id).delete()
+
+
+# 리뷰 변경 기록을 별점 행렬에 합쳐서 새 버전으로 저장
+@shared_task
+def compact_place_rating_matrix():
+    compact_rating_matrix()
+
+
+# 행렬 분해 추천 모델 학습(RECOMMEND_ENGINE = "als"일 때 사용)
+@shared_task
+def train_place_factor_model():
+    train_factor_model()
+
+
+# 취향 선택 후보 맛집 id 목록 갱신
+@shared_task
+def refresh_place_select_pools():
+    refresh_select_pools()
+
+
+# 버퍼에 쌓인 맛집 조회수 DB 반영
+@shared_task
+def flush_place_hits():
+    flush_hits()
+
+
+# 어제 맛집별 고유 방문자 수 집계
+@shared_task
+def rollup_place_visitors():
+    rollup_visitors()
+
+
+# 인기 급상승 맛집 점수 계산, 순위 저장
+@shared_task
+def update_place_trending():
+    update_trending()
+
+
+# 맛집 변경 사항 검색 엔진(Algolia 또는 로컬 색인)에 일괄 반영
+@shared_task
+def sync_place_search_index():
+    if settings.SEARCH_BACKEND == "local":
+        sync_search_index()
+    else:
+        sync_place_index()
@@ -1,13 +1,52 @@
 from rest_framework.test import APITestCase
 
+from django.conf import settings
 from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 
 from users.models import User, Profile
 from reviews.models import Review
-from .models import Place
+from .models import Place, PlaceRecommendation, PlaceVisitor, PlaceIndexOutbox, PlaceOpeningHours, PlaceTrend
 from .views import CHOICE_CATEGORY
+from .rating_matrix import RatingMatrix, get_matrix_name, get_rating_matrix, get_rating_log, update_rating, compact_rating_matrix
+from .rcm_places import similar_users, rcm_place_user, rcm_place_new_user, train_als
+from .tasks import update_place_recommendation, update_user_recommendation
+from .neighbors import NeighborIndex, get_neighbor_path
+from .factors import train_factor_model, get_factor_model
+from .artifacts import save_arrays, load_arrays, get_artifact, get_artifact_dir, current_version
+from .benchmark import generate_reviews, measure, summarize
+from .select_pool import refresh_select_pools, sample_select_places
+from .hit_counter import record_hit, flush_hits
+from .visitors import HyperLogLog, record_visit, count_visitors, rollup_visitors
+from .index import build_index_records
+from .search_engine import SEARCH_INDEX_NAME, SearchIndex, get_grams, get_search_index
+from .tasks import sync_place_search_index
+from .search_cache import SEARCH_VERSION_KEY, normalize_query, get_search_key, cached_search, invalidate_search_cache
+from .autocomplete import CHANGE_KEY, CHANGE_SEQ_KEY, Autocomplete, PrefixIndex, get_autocomplete, build_autocomplete, refresh_autocomplete
+from . import autocomplete as autocomplete_module
+from .nearby import get_geo_cell, haversine, nearest_places, places_within, rerank_by_distance
+from .opening_hours import parse_place_time, filter_open_places, rebuild_opening_hours
+from .ratings import update_place_rating, reconcile_place_ratings
+from .bookmarks import toggle_bookmark, sync_bookmarks
+from .trending import decay, update_trend_scores, update_trending, get_trending
+from .crawler import crawl_places, parse_place, get_place_key
 
+from scipy import sparse
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import os
+import json
+import time
 import random
+import threading
+import collections
+import datetime
+import tempfile
+import numpy as np
 
 
 #### 장소 ####
@@ -36,6 +75,10 @@ class PlaceSelectAPIViewTestCase(APITestCase):
                 place_id=random.randint(1, 24),
             )
 
+    # 다른 테스트에서 캐시된 후보 목록 삭제
+    def setUp(self):
+        cache.clear()
+
     # 1. [비로그인] 카테고리 선택(place_preference.html, 음식 선택)
     def test_place_select_1(self):
         category_no1 = random.randint(1, 12)
@@ -52,8 +95,36 @@ class PlaceSelectAPIViewTestCase(APITestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    # 3. 장소 선택 시 음식 종류별 맛집 하나씩(카테고리 순서), 후보 목록 캐시 후에는 맛집 조회 쿼리만 실행(북마크 수, 북마크 여부 포함)
+    def test_place_select_3(self):
+        refresh_select_pools()
+        with self.assertNumQueries(1):
+            response = self.client.get(path=reverse("place_select_view", kwargs={"choice_no": 13}))
+        categories = [place["category"] for place in response.data]
+        expected = [category for category in CHOICE_CATEGORY[:12] if Place.objects.filter(place_address__contains="제주시", category=category).exists()]
+        self.assertEqual(categories, expected)
+        self.assertTrue(all("제주시" in place["place_address"] for place in response.data))
+
+    # 4. 음식 선택 시 해당 카테고리 맛집 최대 9개(중복 없음)
+    def test_place_select_4(self):
+        response = self.client.get(path=reverse("place_select_view", kwargs={"choice_no": 2}))
+        place_ids = [place["id"] for place in response.data]
+        self.assertEqual(len(place_ids), len(set(place_ids)))
+        self.assertEqual(set(place_ids), set(Place.objects.filter(category=CHOICE_CATEGORY[1]).values_list("id", flat=True)))
+
+    # 5. 후보 목록 캐시가 없으면 다시 생성, 삭제된 맛집은 제외
+    def test_place_select_5(self):
+        refresh_select_pools()
+        Place.objects.filter(category=CHOICE_CATEGORY[0]).delete()
+        response = self.client.get(path=reverse("place_select_view", kwargs={"choice_no": 1}))
+        self.assertEqual(response.data, [])
+
+        cache.clear()
+        self.assertEqual(sample_select_places(1), [])
+
 
 # 3/4. [비로그인] 장소 리스트 불러오기(place_list.html, index에서 음식/장소 선택 > 선호도 선택)
+@override_settings(RECOMMEND_DIR=tempfile.mkdtemp())
 class PlaceListNewUserAPIViewTestCase(APITestCase):
     @classmethod
     def setUpTestData(cls):
@@ -235,8 +306,19 @@ class PlaceListNewUserAPIViewTestCase(APITestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    # 없는 카테고리
+    def test_place_list_invalid_category(self):
+        response = self.client.get(
+            path=reverse(
+                "new_user_place_list_view",
+                kwargs={"place_id": 1, "category": "없는카테고리"},
+            )
+        )
+        self.assertEqual(response.status_code, 400)
+
 
 # 5/6. [로그인] 장소 리스트 불러오기(place_list.html, index에서 음식/장소 선택)
+@override_settings(RECOMMEND_DIR=tempfile.mkdtemp())
 class PlaceListUserAPIViewTestCase(APITestCase):
     @classmethod
     def setUpTestData(cls):
@@ -344,6 +426,1134 @@ class PlaceListUserAPIViewTestCase(APITestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    # 없는 카테고리 번호(0, 15~)
+    def test_place_list_invalid_cate_id(self):
+        for cate_id in (0, len(CHOICE_CATEGORY) + 1):
+            response = self.client.get(
+                path=reverse("user_place_list_view", kwargs={"cate_id": cate_id}),
+                HTTP_AUTHORIZATION=f"Bearer {self.access_token}",
+            )
+            self.assertEqual(response.status_code, 400)
+
+
+# 유저 x 맛집 별점 행렬
+@override_settings(RECOMMEND_DIR=tempfile.mkdtemp())
+class RatingMatrixTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f"user{i+1}", f"user{i+1}@test.com", "01000000000", "Test1234!") for i in range(3)]
+        cls.places = [
+            Place.objects.create(place_name=f"장소{i}", category="한식", place_address="제주시", place_time="영업시간")
+            for i in range(3)
+        ]
+        Review.objects.create(content="some content", rating_cnt=4, author=cls.users[0], place=cls.places[0])
+        Review.objects.create(content="some content", rating_cnt=2, author=cls.users[0], place=cls.places[0])
+        Review.objects.create(content="some content", rating_cnt=5, author=cls.users[1], place=cls.places[1])
+
+    def test_build(self):
+        rating_matrix = RatingMatrix.build()
+        self.assertEqual(rating_matrix.matrix.shape, (2, 2))
+        row, col = rating_matrix.user_index[self.users[0].id], rating_matrix.place_index[self.places[0].id]
+        self.assertEqual(rating_matrix.matrix[row, col], 3)
+
+    def test_partition(self):
+        review_user, user_ids, place_ids = RatingMatrix.build().partition([self.places[1].id, self.places[2].id])
+        self.assertEqual(review_user.shape, (1, 1))
+        self.assertEqual(user_ids.tolist(), [self.users[1].id])
+        self.assertEqual(place_ids.tolist(), [self.places[1].id])
+
+    def test_cate_ids(self):
+        self.assertEqual(self.places[0].cate_ids, [2, 3, 13])
+
+    def test_category_matrix(self):
+        rating_matrix = get_rating_matrix(2)
+        self.assertEqual(rating_matrix.matrix.shape, (2, 2))
+        self.assertEqual(get_rating_matrix(1).matrix.shape, (0, 0))
+        self.assertEqual(get_rating_matrix(14).place_ids.tolist(), [])
+
+    # 리뷰 변경은 행렬 대신 변경 기록에 저장하고 조회할 때 합침
+    def test_update_rating(self):
+        get_rating_matrix()
+        version = current_version(get_matrix_name())
+        review = Review.objects.create(content="some content", rating_cnt=1, author=self.users[2], place=self.places[2])
+        update_rating(self.users[2].id, self.places[2].id)
+        for cate_id in [None, 2, 3, 13]:
+            rating_matrix = get_rating_matrix(cate_id)
+            self.assertEqual(rating_matrix.matrix[rating_matrix.user_index[self.users[2].id], rating_matrix.place_index[self.places[2].id]], 1)
+        self.assertNotIn(self.users[2].id, get_rating_matrix(14).user_index)
+        self.assertEqual(current_version(get_matrix_name()), version)
+        self.assertEqual(get_rating_log(get_matrix_name()), {(self.users[2].id, self.places[2].id): 1})
+
+        review.delete()
+        update_rating(self.users[2].id, self.places[2].id)
+        self.assertEqual(get_rating_matrix().matrix.nnz, 2)
+        self.assertEqual(get_rating_matrix(2).matrix.shape, (2, 2))
+
+        # 변경 기록을 행렬에 합친 뒤에도 결과는 같음
+        self.assertEqual(compact_rating_matrix(), 4)
+        self.assertEqual(get_rating_log(get_matrix_name()), {})
+        self.assertNotEqual(current_version(get_matrix_name()), version)
+        self.assertEqual(get_rating_matrix().matrix.nnz, 2)
+        self.assertEqual(get_rating_matrix(2).matrix.shape, (2, 2))
+
+    # 변경 기록이 RECOMMEND_RATING_LOG_SIZE개를 넘으면 바로 행렬에 합침
+    @override_settings(RECOMMEND_RATING_LOG_SIZE=1)
+    def test_update_rating_compact(self):
+        get_rating_matrix()
+        for user, place in [(self.users[2], self.places[2]), (self.users[1], self.places[2])]:
+            Review.objects.create(content="some content", rating_cnt=4, author=user, place=place)
+            update_rating(user.id, place.id)
+        self.assertEqual(get_rating_log(get_matrix_name()), {})
+        self.assertEqual(get_rating_matrix().matrix.nnz, 4)
+
+
+# 추천 데이터 버전 저장소
+@override_settings(RECOMMEND_DIR=tempfile.mkdtemp())
+class ArtifactsTestCase(TestCase):
+    def test_hot_swap(self):
+        load = lambda name, version: load_arrays(name, ["ids"], version)["ids"]
+        self.assertIsNone(get_artifact("test", load))
+
+        save_arrays("test", {"ids": np.array([1, 2])})
+        ids = get_artifact("test", load)
+        self.assertIsInstance(ids, np.memmap)
+        self.assertIs(get_artifact("test", load), ids)
+
+        # 새 버전 저장 후 다음 조회부터 새 버전 사용, 교체된 버전은 RECOMMEND_ARTIFACT_RETENTION초 동안 유지
+        for i in range(5):
+            save_arrays("test", {"ids": np.array([i])})
+        self.assertEqual(get_artifact("test", load).tolist(), [4])
+        self.assertEqual(ids.tolist(), [1, 2])
+        self.assertEqual(len([entry for entry in os.listdir(get_artifact_dir("test")) if entry != "current"]), 6)
+
+        with override_settings(RECOMMEND_ARTIFACT_RETENTION=0):
+            save_arrays("test", {"ids": np.array([5])})
+        self.assertEqual(sorted(os.listdir(get_artifact_dir("test"))), sorted(["current", current_version("test")]))
+
+
+# 추천 성능 측정 도구
+class BenchmarkTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            User.objects.create_user(f"user{i+1}", f"user{i+1}@test.com", "01000000000", "Test1234!")
+            Place.objects.create(place_name=f"장소{i}", category="한식", place_address="제주시", place_time="영업시간")
+
+    def test_generate_reviews(self):
+        generate_reviews(25, batch_size=10)
+        self.assertEqual(Review.objects.count(), 25)
+        self.assertTrue(all(1 <= rating <= 5 for rating in Review.objects.values_list("rating_cnt", flat=True)))
+
+    def test_summarize(self):
+        result = summarize(measure(lambda x: x, [(i,) for i in range(10)]))
+        self.assertEqual(result["count"], 10)
+        self.assertTrue(result["p50"] <= result["p99"] <= result["max"])
+
+
+# 유사 유저 기반 추천
+class RcmPlacesTestCase(TestCase):
+    def setUp(self):
+        self.review_user = sparse.csr_matrix(
+            np.array(
+                [
+                    [5, 0, 1, 0],
+                    [5, 0, 2, 4],
+                    [0, 5, 0, 3],
+                    [4, 0, 0, 5],
+                ],
+                dtype=np.float32,
+            )
+        )
+        self.user_ids = np.array([11, 12, 13, 14])
+        self.place_ids = np.array([101, 102, 103, 104])
+
+    def test_similar_users_top_k(self):
+        neighbors, scores = similar_users(self.review_user, self.review_user[0], k=2, exclude=0)
+        self.assertEqual(neighbors.tolist(), [1, 3])
+        self.assertTrue(scores[0] >= scores[1])
+
+    def test_rcm_place_user(self):
+        place_list = rcm_place_user(self.review_user, self.user_ids, self.place_ids, user_id=11, k=1)
+        self.assertEqual(place_list, [101, 104, 103, 102])
+
+    def test_rcm_place_new_user(self):
+        place_list = rcm_place_new_user(self.review_user, self.place_ids, place_id=102, k=1)
+        self.assertEqual(place_list, [102, 104, 101, 103])
+
+        place_list = rcm_place_new_user(self.review_user, self.place_ids, place_id=105, k=2)
+        self.assertEqual(place_list[-1], 105)
+
+    def test_train_als(self):
+        user_factors, item_factors = train_als(self.review_user * 10, factors=3, regularization=0.01, iterations=20)
+        self.assertEqual(user_factors.shape, (4, 3))
+        self.assertEqual(item_factors.shape, (4, 3))
+
+        # 별점을 준 맛집의 점수가 별점을 주지 않은 맛집보다 높음
+        scores = item_factors @ user_factors[2]
+        self.assertTrue(scores[1] > scores[0] and scores[3] > scores[2])
+
+
+# 행렬 분해 추천 모델
+@override_settings(RECOMMEND_DIR=tempfile.mkdtemp(), RECOMMEND_FACTORS=4, RECOMMEND_ALS_ITERATIONS=10)
+class FactorModelTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f"user{i+1}", f"user{i+1}@test.com", "01000000000", "Test1234!") for i in range(4)]
+        cls.places = [
+            Place.objects.create(place_name=f"장소{i}", category="한식", place_address="제주시", place_time="영업시간", hit=i * 10)
+            for i in range(3)
+        ]
+        cls.places.append(Place.objects.create(place_name="장소3", category="양식", place_address="서귀포시", place_time="영업시간"))
+
+        review = Review.objects.create(content="some content", rating_cnt=5, author=cls.users[0], place=cls.places[0])
+        Review.objects.create(content="some content", rating_cnt=5, author=cls.users[1], place=cls.places[1])
+        Review.objects.create(content="some content", rating_cnt=4, author=cls.users[1], place=cls.places[3])
+        review.review_like.add(cls.users[2])
+        cls.places[3].place_bookmark.add(cls.users[2])
+
+    def test_train_factor_model(self):
+        train_factor_model()
+        factor_model = get_factor_model()
+        self.assertEqual(factor_model.user_ids.tolist(), [user.id for user in self.users[:3]])
+        self.assertEqual(factor_model.place_ids[factor_model.category_cols(2)].tolist(), [place.id for place in self.places[:3]])
+        self.assertEqual(factor_model.place_ids[factor_model.category_cols(14)].tolist(), [self.places[3].id])
+
+        place_list = factor_model.rcm_place_user(self.users[0].id, 2)
+        self.assertEqual(place_list[0], self.places[0].id)
+        self.assertEqual(set(place_list), {place.id for place in self.places[:3]})
+
+        # 리뷰 좋아요, 북마크만 한 유저
+        self.assertEqual(factor_model.rcm_place_user(self.users[2].id, 2)[0], self.places[0].id)
+        self.assertIsNone(factor_model.rcm_place_user(self.users[3].id, 2))
+
+    @override_settings(RECOMMEND_ENGINE="als")
+    def test_new_user_place_list(self):
+        train_factor_model()
+        response = self.client.get(
+            path=reverse("new_user_place_list_view", kwargs={"place_id": self.places[1].id, "category": CHOICE_CATEGORY[1]})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["id"], self.places[1].id)
+
+
+# 유저별 맛집 추천 결과 배치 갱신
+@override_settings(RECOMMEND_DIR=tempfile.mkdtemp())
+class PlaceRecommendationTaskTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(24):
+            j = round(i / 2)
+            Place.objects.create(
+                place_name=f"장소{i}",
+                category=CHOICE_CATEGORY[j],
+                rating=random.randint(1, 5),
+                place_address=random.choice(["제주시", "서귀포시"]),
+                place_time="영업시간",
+                place_img="img_url",
+            )
+
+        cls.users = [User.objects.create_user(f"user{i+1}", f"user{i+1}@test.com", "01000000000", "Test1234!") for i in range(10)]
+        for i in range(100):
+            Review.objects.create(
+                content="some content",
+                rating_cnt=random.randint(1, 5),
+                author=random.choice(cls.users),
+                place_id=random.randint(1, 24),
+            )
+        cls.inactive_user = cls.users[0]
+        cls.inactive_user.withdraw = True
+        cls.inactive_user.save()
+
+    def test_update_place_recommendation(self):
+        PlaceRecommendation.objects.create(user=self.inactive_user, cate_id=13, place_list=[1])
+        update_place_recommendation()
+
+        recommendation = PlaceRecommendation.objects.filter(cate_id=13).first()
+        rated_place_ids = set(Review.objects.filter(place__place_address__contains="제주시").values_list("place_id", flat=True))
+        self.assertEqual(set(recommendation.place_list), rated_place_ids)
+        self.assertFalse(PlaceRecommendation.objects.filter(user=self.inactive_user).exists())
+
+    # 리뷰 작성, 삭제 후 증분 갱신한 유사 유저 목록이 전체 재계산 결과와 같은지 확인
+    @override_settings(RECOMMEND_NEIGHBORS=3)
+    def test_update_user_recommendation(self):
+        update_place_recommendation()
+        user = self.users[1]
+
+        for place_id in (3, 14, 23):
+            review = Review.objects.create(content="some content", rating_cnt=5, author=user, place_id=place_id)
+            update_user_recommendation(user.id, place_id)
+            incremental = {cate_id: NeighborIndex.load(get_neighbor_path(cate_id)) for cate_id in (3, 13, 14)}
+
+            update_place_recommendation()
+            for cate_id, neighbor_index in incremental.items():
+                rebuilt = NeighborIndex.load(get_neighbor_path(cate_id))
+                self.assertEqual(set(neighbor_index.user_ids.tolist()), set(rebuilt.user_ids.tolist()))
+                for user_id in rebuilt.user_ids.tolist():
+                    self.assertTrue(np.allclose(neighbor_index.get(user_id)[1], rebuilt.get(user_id)[1]))
+
+            review.delete()
+            update_user_recommendation(user.id, place_id)
+
+
+# 맛집 조회수(Redis가 없는 로컬 환경은 바로 DB에 반영)
+class HitCounterTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.places = [
+            Place.objects.create(place_name=f"장소{i}", category="한식", place_address="제주시", place_time="영업시간", hit=10)
+            for i in range(3)
+        ]
+
+    def test_record_hit(self):
+        for place, count in zip(self.places, [3, 1, 0]):
+            for _ in range(count):
+                with self.assertNumQueries(1):
+                    self.assertEqual(record_hit(place.id), 1)
+
+        self.assertEqual([place.hit for place in Place.objects.order_by("id")], [13, 11, 10])
+        self.assertEqual(flush_hits(), 0)
+
+    def test_place_detail_hit(self):
+        for hit in (11, 12):
+            response = self.client.get(reverse("place_detail_view", kwargs={"place_id": self.places[0].id}))
+            self.assertEqual(response.data["hit"], hit)
+        self.assertEqual(Place.objects.get(id=self.places[0].id).hit, 12)
+
+
+# 맛집별 고유 방문자 수
+class PlaceVisitorTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.place = Place.objects.create(place_name="장소", category="한식", place_address="제주시", place_time="영업시간")
+
+    # 다른 테스트에서 쌓인 방문 기록 삭제
+    def setUp(self):
+        rollup_visitors(datetime.date.today() + datetime.timedelta(days=1))
+
+    def test_hyperloglog(self):
+        sketch, other = HyperLogLog(), HyperLogLog()
+        for i in range(20000):
+            sketch.add(f"user:{i}")
+            sketch.add(f"user:{i}")
+            other.add(f"user:{i + 10000}")
+        self.assertAlmostEqual(sketch.count(), 20000, delta=20000 * 0.03)
+        self.assertEqual(HyperLogLog().count(), 0)
+
+        sketch.merge(other)
+        self.assertAlmostEqual(sketch.count(), 30000, delta=30000 * 0.03)
+
+    def test_rollup_visitors(self):
+        today = datetime.date.today()
+        for _ in range(3):
+            self.client.get(reverse("place_detail_view", kwargs={"place_id": self.place.id}))
+        record_visit(self.place.id, "ip:1.1.1.1")
+        self.assertEqual(count_visitors(today), {self.place.id: 2})
+
+        self.assertEqual(rollup_visitors(today), 1)
+        self.assertEqual(PlaceVisitor.objects.get(place=self.place, date=today).visitors, 2)
+        self.assertEqual(count_visitors(today), {})
+
+
+# 검색 엔진 동기화 outbox
+class PlaceIndexOutboxTestCase(TestCase):
+    def setUp(self):
+        self.place = Place.objects.create(place_name="장소", category="한식", place_address="제주시", place_time="영업시간")
+        self.deleted_place = Place.objects.create(place_name="삭제", category="한식", place_address="제주시", place_time="영업시간")
+
+    def test_enqueue(self):
+        self.assertEqual(PlaceIndexOutbox.objects.count(), 2)
+        PlaceIndexOutbox.objects.all().delete()
+
+        # 검색 필드가 아닌 조회수만 바뀐 경우 제외
+        place = Place.objects.get(id=self.place.id)
+        place.hit += 1
+        place.save()
+        self.assertFalse(PlaceIndexOutbox.objects.exists())
+
+        # 별점만 바뀐 경우는 검색 결과 캐시를 무효화하지 않고, 이미 있던 다른 변경 사항은 유지
+        place.rating = 4
+        place.save()
+        place.save()
+        self.assertTrue(PlaceIndexOutbox.objects.get(place_id=place.id).rating_only)
+        place.place_name = "새 장소"
+        place.save()
+        place.rating = 5
+        place.save()
+        self.assertFalse(PlaceIndexOutbox.objects.get(place_id=place.id).rating_only)
+
+        deleted_place_id = self.deleted_place.id
+        self.deleted_place.delete()
+        self.assertEqual(list(PlaceIndexOutbox.objects.order_by("place_id").values_list("place_id", "deleted")), [(self.place.id, False), (deleted_place_id, True)])
+
+    def test_build_index_records(self):
+        deleted_place_id = self.deleted_place.id
+        self.deleted_place.delete()
+        records, deleted_ids = build_index_records(list(PlaceIndexOutbox.objects.all()))
+        self.assertEqual([record["objectID"] for record in records], [self.place.id])
+        self.assertEqual(records[0]["place_name"], "장소")
+        self.assertEqual(deleted_ids, [deleted_place_id])
+
+
+# 로컬 검색 색인
+@override_settings(RECOMMEND_DIR=tempfile.mkdtemp(), SEARCH_BACKEND="local")
+class SearchEngineTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.places = [
+            Place.objects.create(place_name="제주흑돼지", category="한식", place_address="제주시 연동", place_number="064-111-2222", place_time="영업시간", rating=3),
+            Place.objects.create(place_name="흑돼지명가", category="한식", place_address="서귀포시 중문", place_time="영업시간", rating=5, hit=100),
+            Place.objects.create(place_name="바다횟집", category="일식", place_address="제주시 애월", menu="모둠회, 고등어회", place_time="영업시간"),
+            Place.objects.create(place_name="카페", category="카페", place_address="서귀포시", place_time="영업시간"),
+        ]
+
+    # 다른 테스트에서 캐시된 검색 결과 삭제
+    def setUp(self):
+        invalidate_search_cache()
+
+    def search(self, query, **params):
+        index = SearchIndex.build(Place.objects.values().order_by("id"))
+        return index.search(query, {"hitsPerPage": 100, **params})
+
+    def test_get_grams(self):
+        self.assertEqual(get_grams("흑돼지"), ["흑돼", "돼지", "흑돼지"])
+        self.assertEqual(get_grams("흑돼지", index=True), ["흑돼", "돼지", "흑돼지", "지 "])
+        self.assertEqual(get_grams("회"), ["회"])
+
+    def test_search(self):
+        results = self.search("흑돼지")
+        self.assertEqual(results["nbHits"], 2)
+        self.assertEqual(results["hitsPerPage"], 100)
+        self.assertEqual(results["query"], "흑돼지")
+        self.assertEqual({hit["objectID"] for hit in results["hits"]}, {str(self.places[0].id), str(self.places[1].id)})
+        self.assertEqual(set(results["hits"][0]), {"objectID", "place_name", "category", "rating", "place_address", "place_number", "place_img"})
+
+        # 전화번호, 메뉴, 한 글자 검색어
+        self.assertEqual([hit["place_name"] for hit in self.search("2222")["hits"]], ["제주흑돼지"])
+        self.assertEqual([hit["place_name"] for hit in self.search("고등어회")["hits"]], ["바다횟집"])
+        self.assertEqual([hit["place_name"] for hit in self.search("회")["hits"]], ["바다횟집"])
+        self.assertEqual(self.search("파스타")["nbHits"], 0)
+        self.assertEqual(self.search("")["nbHits"], 0)
+
+    # 이름에서 일치하는 맛집이 주소에서 일치하는 맛집보다 먼저
+    def test_search_ranking(self):
+        self.assertEqual(self.search("제주")["hits"][0]["place_name"], "제주흑돼지")
+
+    def test_search_page(self):
+        results = self.search("시", hitsPerPage=1, page=1)
+        self.assertEqual((results["nbHits"], results["nbPages"], results["page"]), (4, 4, 1))
+        self.assertEqual(len(results["hits"]), 1)
+
+    def test_search_facet_filters(self):
+        self.assertEqual([hit["place_name"] for hit in self.search("제주시", facetFilters=["category:일식"])["hits"]], ["바다횟집"])
+        self.assertEqual(self.search("시", facetFilters=[["category:일식", "category:카페"]])["nbHits"], 2)
+        self.assertEqual(self.search("시", facetFilters=["category:양식"])["nbHits"], 0)
+
+        # 다른 facet 필드, 제외 조건
+        self.assertEqual([hit["place_name"] for hit in self.search("흑돼지", facetFilters=["place_address:제주시 연동"])["hits"]], ["제주흑돼지"])
+        self.assertEqual([hit["place_name"] for hit in self.search("시", facetFilters=["place_address:서귀포시", "category:카페"])["hits"]], ["카페"])
+        self.assertEqual({hit["place_name"] for hit in self.search("시", facetFilters=["category:-한식"])["hits"]}, {"바다횟집", "카페"})
+        self.assertEqual({hit["place_name"] for hit in self.search("시", facetFilters=["-category:한식", "-category:카페"])["hits"]}, {"바다횟집"})
+        self.assertEqual(self.search("시", facetFilters=["category:\\-한식"])["nbHits"], 0)
+        with self.assertRaises(ValueError):
+            self.search("시", facetFilters=["menu:모둠회"])
+
+    # outbox에 변경 사항이 있을 때만 색인 다시 생성
+    def test_sync_search_index(self):
+        get_search_index()
+        Place.objects.create(place_name="새로운흑돼지", category="한식", place_address="제주시", place_time="영업시간")
+        self.assertEqual(get_search_index().search("흑돼지")["nbHits"], 2)
+
+        sync_place_search_index()
+        self.assertEqual(get_search_index().search("흑돼지")["nbHits"], 3)
+        self.assertFalse(PlaceIndexOutbox.objects.exists())
+
+        # 별점만 바뀐 경우 가산점만 새 버전으로 저장(n-gram 색인 파일은 공유)하고 검색 결과 캐시는 유지
+        version = cache.get(SEARCH_VERSION_KEY)
+        index = get_search_index()
+        place = Place.objects.get(place_name="새로운흑돼지")
+        update_place_rating(place.id, 5, 1)
+        sync_place_search_index()
+        self.assertEqual(cache.get(SEARCH_VERSION_KEY), version)
+        self.assertFalse(PlaceIndexOutbox.objects.exists())
+
+        updated = get_search_index()
+        position = list(updated.place_ids).index(place.id)
+        self.assertGreater(updated.boosts[position], index.boosts[position])
+        self.assertEqual(np.delete(updated.boosts, position).tolist(), np.delete(index.boosts, position).tolist())
+        base = get_artifact_dir(SEARCH_INDEX_NAME)
+        self.assertTrue(os.path.samefile(os.path.join(base, current_version(SEARCH_INDEX_NAME), "docs.npy"), index.docs.filename))
+
+    def test_search_view(self):
+        response = self.client.get(reverse("search"), {"keyword": "흑돼지"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["nbHits"], 2)
+
+
+# 검색 결과 캐시
+class SearchCacheTestCase(TestCase):
+    def setUp(self):
+        invalidate_search_cache()
+        self.calls = []
+
+    def search(self, query, params):
+        self.calls.append(query)
+        return {"hits": [], "nbHits": len(self.calls), "query": query}
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  제주시   회 "), "제주시 회")
+        self.assertEqual(normalize_query("ＢＢＱ Chicken"), "bbq chicken")
+        self.assertEqual(get_search_key("흑돼지 ", {"hitsPerPage": 100}), get_search_key("흑돼지", {"hitsPerPage": 100}))
+        self.assertNotEqual(get_search_key("흑돼지", {"hitsPerPage": 100}), get_search_key("흑돼지", {"hitsPerPage": 20}))
+
+    def test_cached_search(self):
+        params = {"hitsPerPage": 100}
+        self.assertEqual(cached_search("흑돼지", params, self.search)["nbHits"], 1)
+        results = cached_search(" 흑돼지", params, self.search)
+        self.assertEqual((results["nbHits"], results["query"]), (1, " 흑돼지"))
+        self.assertEqual(self.calls, ["흑돼지"])
+
+        # 워커 메모리 캐시가 없어도 공유 캐시에서 조회
+        with override_settings(SEARCH_CACHE_SIZE=0):
+            cached_search("제주시 회", params, self.search)
+        cached_search("제주시 회", params, self.search)
+        self.assertEqual(self.calls, ["흑돼지", "제주시 회"])
+
+    # 검색 색인이 바뀌면 다시 검색
+    def test_invalidate_search_cache(self):
+        params = {"hitsPerPage": 100}
+        cached_search("흑돼지", params, self.search)
+        invalidate_search_cache()
+        self.assertEqual(cached_search("흑돼지", params, self.search)["nbHits"], 2)
+
+
+# 검색어 자동완성
+class AutocompleteTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.places = [
+            Place.objects.create(place_name="제주 흑돼지", category="한식", place_address="제주특별자치도 제주시 연동 123", place_time="영업시간", hit=10, rating=3),
+            Place.objects.create(place_name="흑돼지명가", category="한식", place_address="제주특별자치도 서귀포시 중문동", place_time="영업시간", hit=10, rating=5),
+            Place.objects.create(place_name="흑소", category="일식", place_address="제주특별자치도 제주시 애월읍", place_time="영업시간", hit=50),
+        ]
+
+    def test_prefix_index(self):
+        index = PrefixIndex([("가", 1, 1), ("가나", 2, 3), ("나", 3, 5)])
+        index.add("가나다", 4, 2)
+        self.assertEqual(index.search("가", 10), [2, 4, 1])
+        self.assertEqual(index.search("가", 1), [2])
+        index.remove("가나", 2)
+        index.set_score("가", 1, 10)
+        self.assertEqual(index.search("가", 10), [1, 4])
+        self.assertEqual(index.search("다", 10), [])
+
+    def test_suggest(self):
+        autocomplete = build_autocomplete()
+        results = autocomplete.suggest("흑")
+        self.assertEqual([place["place_name"] for place in results["places"]], ["흑소", "흑돼지명가", "제주 흑돼지"])
+
+        # 입력 중인 자모, 대소문자, 카테고리, 주소 단어(숫자 제외)
+        self.assertEqual([place["place_name"] for place in autocomplete.suggest("흑ㄷ")["places"]], ["흑돼지명가", "제주 흑돼지"])
+        self.assertEqual(autocomplete.suggest("한")["categories"], ["한식"])
+        self.assertEqual(autocomplete.suggest("제주")["addresses"], ["제주특별자치도", "제주시"])
+        self.assertEqual(autocomplete.suggest("12")["addresses"], [])
+        self.assertEqual(autocomplete.suggest("흑", size=1)["places"][0]["id"], self.places[2].id)
+
+    def test_add_remove_place(self):
+        autocomplete = Autocomplete({})
+        autocomplete.add_place(1, {"place_name": "흑돼지", "category": "한식", "place_address": "제주시", "hit": 1, "rating": 0})
+        autocomplete.add_place(2, {"place_name": "흑소", "category": "한식", "place_address": "서귀포시", "hit": 5, "rating": 0})
+        self.assertEqual([place["id"] for place in autocomplete.suggest("흑")["places"]], [2, 1])
+
+        autocomplete.add_place(1, {"place_name": "돼지", "category": "양식", "place_address": "제주시", "hit": 1, "rating": 0})
+        autocomplete.remove_place(2)
+        self.assertEqual(autocomplete.suggest("흑")["places"], [])
+        self.assertEqual(autocomplete.suggest("한")["categories"], [])
+        self.assertEqual(autocomplete.suggest("양")["categories"], ["양식"])
+
+    # 맛집 저장, 삭제 후 워커의 자동완성 목록에 반영
+    def test_get_autocomplete(self):
+        cache.clear()
+        refresh_autocomplete()
+        self.assertEqual(len(get_autocomplete().suggest("흑")["places"]), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            place = Place.objects.create(place_name="흑우", category="한식", place_address="제주시", place_time="영업시간")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.places[2].delete()
+        with self.assertNumQueries(0):
+            names = [place["place_name"] for place in get_autocomplete().suggest("흑")["places"]]
+        self.assertEqual(names, ["흑돼지명가", "제주 흑돼지", "흑우"])
+
+        # 밀린 변경 사항이 만료되면 새 목록을 만드는 동안(이미 만드는 중) 이전 목록을 DB 조회 없이 사용
+        autocomplete = get_autocomplete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Place.objects.create(place_name="흑염소", category="한식", place_address="제주시", place_time="영업시간")
+        cache.delete(CHANGE_KEY.format(seq=cache.get(CHANGE_SEQ_KEY)))
+        autocomplete_module._building = True
+        try:
+            with self.assertNumQueries(0):
+                self.assertIs(get_autocomplete(), autocomplete)
+        finally:
+            autocomplete_module._building = False
+        self.assertEqual(len(autocomplete.suggest("흑")["places"]), 3)
+
+        refresh_autocomplete()
+        self.assertEqual(len(get_autocomplete().suggest("흑")["places"]), 4)
+
+    def test_autocomplete_view(self):
+        cache.clear()
+        refresh_autocomplete()
+        response = self.client.get(reverse("place_autocomplete_view"), {"keyword": "흑돼"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["places"]), 2)
+
+        response = self.client.get(reverse("place_autocomplete_view"), {"keyword": " "})
+        self.assertEqual(response.status_code, 400)
+
+
+# 주변 맛집
+class PlaceNearbyTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # 제주시청 기준 약 0m, 350m, 1.5km, 10km, 35km 떨어진 맛집
+        cls.places = [
+            Place.objects.create(place_name="시청", category="한식", place_address="제주시", place_time="영업시간", latitude=33.4996, longitude=126.5312),
+            Place.objects.create(place_name="근처", category="일식", place_address="제주시", place_time="영업시간", latitude=33.4996, longitude=126.5350),
+            Place.objects.create(place_name="공항", category="한식", place_address="제주시", place_time="영업시간", latitude=33.5066, longitude=126.4930),
+            Place.objects.create(place_name="애월", category="한식", place_address="제주시 애월읍", place_time="영업시간", latitude=33.4629, longitude=126.3294),
+            Place.objects.create(place_name="서귀포", category="한식", place_address="서귀포시", place_time="영업시간", latitude=33.2541, longitude=126.5600),
+            Place.objects.create(place_name="좌표 없음", category="한식", place_address="제주시", place_time="영업시간"),
+        ]
+
+    def test_geo_cell(self):
+        self.assertEqual(Place.objects.get(id=self.places[0].id).geo_cell, get_geo_cell(33.4996, 126.5312))
+        self.assertIsNone(Place.objects.get(id=self.places[5].id).geo_cell)
+        self.assertEqual(get_geo_cell("33.4996", "126.5312"), get_geo_cell(33.4996, 126.5312))
+
+    def test_haversine(self):
+        distances = haversine(33.4996, 126.5312, [33.4996, 33.2541], [126.5312, 126.5600])
+        self.assertAlmostEqual(distances[0], 0)
+        self.assertAlmostEqual(distances[1], 27400, delta=300)
+
+    def test_nearest_places(self):
+        places = nearest_places(33.4996, 126.5312, 3)
+        self.assertEqual([place["place_name"] for place in places], ["시청", "근처", "공항"])
+        self.assertAlmostEqual(places[1]["distance"], 350, delta=10)
+        self.assertEqual([place["place_name"] for place in nearest_places(33.4996, 126.5312, 2, category="한식")], ["시청", "공항"])
+        self.assertEqual(len(nearest_places(33.4996, 126.5312, 10, max_radius=20000)), 4)
+
+    def test_places_within(self):
+        self.assertEqual([place["place_name"] for place in places_within(33.4996, 126.5312, 1000, 10)], ["시청", "근처"])
+        self.assertEqual(places_within(33.4996, 126.5312, 1000, 10, category="양식"), [])
+
+    def test_nearby_view(self):
+        response = self.client.get(reverse("place_nearby_view"), {"lat": 33.4996, "lng": 126.5312, "k": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([place["id"] for place in response.data], [self.places[0].id, self.places[1].id])
+
+        response = self.client.get(reverse("place_nearby_view"), {"lat": 33.4996, "lng": 126.5312, "radius": 20000, "category": "한식"})
+        self.assertEqual([place["place_name"] for place in response.data], ["시청", "공항", "애월"])
+
+        for params in [{}, {"lat": 33.4996}, {"lat": "x", "lng": 126.5}, {"lat": 91, "lng": 126.5}, {"lat": 33.4, "lng": 126.5, "radius": 0}, {"lat": 33.4, "lng": 126.5, "radius": 30000}]:
+            self.assertEqual(self.client.get(reverse("place_nearby_view"), params).status_code, 400)
+
+    # 추천 순위가 낮아도 가까운 맛집이 앞으로(좌표가 없는 맛집은 거리 None)
+    def test_rerank_by_distance(self):
+        place_ids = [place.id for place in self.places]
+        with override_settings(RECOMMEND_DISTANCE_WEIGHT=0):
+            self.assertEqual(rerank_by_distance(place_ids, 33.2541, 126.5600)[0], place_ids)
+
+        ranked, distances = rerank_by_distance(place_ids, 33.2541, 126.5600)
+        self.assertEqual(ranked[0], self.places[4].id)
+        self.assertEqual(distances[self.places[4].id], 0)
+        self.assertNotIn(self.places[5].id, distances)
+        self.assertEqual(rerank_by_distance([], 33.2541, 126.5600), ([], {}))
+
+    def test_user_place_list_location(self):
+        user = User.objects.create_user("user1", "user1@test.com", "01000000000", "Test1234!")
+        PlaceRecommendation.objects.create(user=user, cate_id=1, place_list=[place.id for place in self.places])
+        self.client.force_authenticate(user)
+
+        response = self.client.get(reverse("user_place_list_view", kwargs={"cate_id": 1}), {"lat": 33.2541, "lng": 126.5600})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["place_name"], "서귀포")
+        self.assertEqual(response.data["results"][0]["distance"], 0)
+
+        response = self.client.get(reverse("user_place_list_view", kwargs={"cate_id": 1}))
+        self.assertEqual(response.data["results"][0]["place_name"], "시청")
+        self.assertNotIn("distance", response.data["results"][0])
+        self.assertEqual(self.client.get(reverse("user_place_list_view", kwargs={"cate_id": 1}), {"lat": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("user_place_list_view", kwargs={"cate_id": len(CHOICE_CATEGORY) + 1})).status_code, 400)
+
+
+# 맛집 영업시간
+class PlaceOpeningHoursTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.places = [
+            Place.objects.create(place_name="저녁", category="한식", place_address="제주시", place_time="10:00~21:30", latitude=33.4996, longitude=126.5312),
+            Place.objects.create(place_name="새벽", category="한식", place_address="제주시", place_time="18:00~새벽 02:00", latitude=33.4996, longitude=126.5320),
+            Place.objects.create(place_name="화요일 휴무", category="일식", place_address="서귀포시", place_time="10:00~21:00 매주 화요일 휴무", latitude=33.4996, longitude=126.5330),
+            Place.objects.create(place_name="문의", category="한식", place_address="서귀포시", place_time="영업점에 문의바랍니다.", latitude=33.4996, longitude=126.5340),
+        ]
+
+    def test_parse_place_time(self):
+        self.assertEqual(parse_place_time("10:00~21:30")[:2], [(600, 1290), (2040, 2730)])
+        self.assertEqual(parse_place_time("매일 11:00 - 21:00")[0], (660, 1260))
+        self.assertEqual(len(parse_place_time("00:00~24:00")), 7)
+
+        # 시작, 종료 중 하나만 있는 영업 상태, 요일을 알 수 없는 휴무는 영업시간을 알 수 없음
+        for place_time in ["21:30에 라스트오더", "15:00에 브레이크타임", "17:00에 영업시작", "새벽 02:00에 영업종료", "12/20 휴무", "격주 화요일 휴무", "영업점에 문의바랍니다.", "", "25:00~26:00", "10:00~10:00"]:
+            self.assertEqual(parse_place_time(place_time), [])
+
+        # 휴무 요일만 있으면 나머지 요일은 하루 종일 영업 중일 수 있음
+        self.assertEqual(parse_place_time("매주 화요일 휴무")[:2], [(0, 1440), (2880, 4320)])
+
+        # 일요일 밤에서 월요일 새벽으로 넘어가는 구간, 휴무 요일
+        self.assertEqual(parse_place_time("18:00~새벽 02:00")[:2], [(0, 120), (1080, 1560)])
+        self.assertEqual([start // (24 * 60) for start, _ in parse_place_time("10:00~21:00, 매주 화요일 휴무")], [0, 2, 3, 4, 5, 6])
+
+    def test_open_at(self):
+        monday_noon, tuesday_noon, tuesday_dawn = datetime.datetime(2026, 10, 19, 12), datetime.datetime(2026, 10, 20, 12), datetime.datetime(2026, 10, 20, 1)
+        # 영업시간을 알 수 없는 맛집(문의)은 거르지 않음
+        self.assertEqual(list(Place.objects.open_at(monday_noon).order_by("id").values_list("place_name", flat=True)), ["저녁", "화요일 휴무", "문의"])
+        self.assertEqual(list(Place.objects.open_at(tuesday_noon).order_by("id").values_list("place_name", flat=True)), ["저녁", "문의"])
+        self.assertEqual(list(Place.objects.open_at(tuesday_dawn).order_by("id").values_list("place_name", flat=True)), ["새벽", "문의"])
+        self.assertEqual(Place.objects.category(2).open_at(tuesday_dawn).count(), 2)
+        self.assertEqual(filter_open_places([self.places[2].id, self.places[0].id, self.places[1].id], monday_noon), [self.places[2].id, self.places[0].id])
+
+    # 크롤링한 실제 place_time 값(data_json/01_place.json)은 휴무 요일이 있는 맛집만 그 요일에 거름
+    def test_open_at_fixture(self):
+        with open(os.path.join(settings.BASE_DIR, "data_json", "01_place.json"), encoding="utf-8") as fixture:
+            place_times = sorted({row["fields"]["place_time"] for row in json.load(fixture) if row["model"] == "places.place"})
+        places = Place.objects.bulk_create([Place(place_name=f"실제{n}", category="한식", place_address="제주시", place_time=place_time) for n, place_time in enumerate(place_times)])
+        rebuild_opening_hours()
+
+        place_ids = {place.id for place in places}
+        closed_ids = {place.id for place in places if place.place_time == "매주 화요일 휴무"}
+        self.assertTrue(closed_ids)
+        monday_night, tuesday_noon = datetime.datetime(2026, 10, 19, 23), datetime.datetime(2026, 10, 20, 12)
+        self.assertEqual(set(filter_open_places(place_ids, monday_night)), place_ids)
+        self.assertEqual(set(filter_open_places(place_ids, tuesday_noon)), place_ids - closed_ids)
+
+    # place_time이 바뀌면 영업시간 갱신
+    def test_update_opening_hours(self):
+        place = Place.objects.get(id=self.places[3].id)
+        place.place_time = "10:00~21:00 매주 월요일 휴무"
+        place.save()
+        self.assertEqual(PlaceOpeningHours.objects.filter(place=place).count(), 6)
+        place.place_time = "매주 월요일 휴무"
+        place.save()
+        self.assertEqual(PlaceOpeningHours.objects.filter(place=place).count(), 6)
+        place.place_time = "21:30에 라스트오더"
+        place.save()
+        self.assertFalse(PlaceOpeningHours.objects.filter(place=place).exists())
+
+        PlaceOpeningHours.objects.all().delete()
+        rebuild_opening_hours(batch_size=2)
+        self.assertEqual(PlaceOpeningHours.objects.filter(place=self.places[0]).count(), 7)
+
+    def test_open_now_nearby(self):
+        response = self.client.get(reverse("place_nearby_view"), {"lat": 33.4996, "lng": 126.5312, "k": 10, "open_now": "true"})
+        open_ids = set(Place.objects.open_at(datetime.datetime.now()).values_list("id", flat=True))
+        self.assertEqual({place["id"] for place in response.data}, open_ids)
+        self.assertIn(self.places[3].id, open_ids)
+
+    @override_settings(RECOMMEND_DIR=tempfile.mkdtemp(), SEARCH_BACKEND="local")
+    def test_open_now_search(self):
+        invalidate_search_cache()
+        response = self.client.get(reverse("search"), {"keyword": "제주시", "open_now": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({int(hit["objectID"]) for hit in response.data["hits"]}, set(Place.objects.filter(place_address="제주시").open_at(datetime.datetime.now()).values_list("id", flat=True)))
+
+
+# 맛집 별점 합계, 리뷰 수
+class PlaceRatingTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("user1", "user1@test.com", "01000000000", "Test1234!")
+        Profile.objects.create(user=cls.user)
+        cls.place = Place.objects.create(place_name="장소", category="한식", place_address="제주시", place_time="영업시간", rating="3.27")
+
+    def test_update_place_rating(self):
+        update_place_rating(self.place.id, 5, 1)
+        update_place_rating(self.place.id, 4, 1)
+        update_place_rating(self.place.id, 2, 1)
+        place = Place.objects.get(id=self.place.id)
+        self.assertEqual((place.rating_sum, place.rating_count, str(place.rating)), (11, 3, "3.67"))
+        self.assertTrue(PlaceIndexOutbox.objects.filter(place_id=self.place.id).exists())
+
+        update_place_rating(self.place.id, -3, 0)
+        update_place_rating(self.place.id, -5, -1)
+        self.assertEqual(str(Place.objects.get(id=self.place.id).rating), "1.50")
+        update_place_rating(self.place.id, -1, -1)
+        update_place_rating(self.place.id, -2, -1)
+        place = Place.objects.get(id=self.place.id)
+        self.assertEqual((place.rating_sum, place.rating_count, place.rating), (0, 0, 0))
+
+    # 합계, 개수에 포함되지 않은 리뷰(ORM으로 작성)를 삭제하면 리뷰 집계로 다시 계산
+    def test_update_place_rating_untracked(self):
+        reviews = [Review.objects.create(content="some content", rating_cnt=rating, author=self.user, place=self.place) for rating in (5, 2)]
+        Profile.objects.filter(user=self.user).update(review_cnt=2)
+        reviews[0].delete()
+        update_place_rating(self.place.id, -5, -1)
+        place = Place.objects.get(id=self.place.id)
+        self.assertEqual((place.rating_sum, place.rating_count, str(place.rating)), (2, 1, "2.00"))
+
+        self.client.force_authenticate(self.user)
+        response = self.client.put(reverse("review_detail_view", kwargs={"place_id": self.place.id, "review_id": reviews[1].id}), {"content": "edit content", "rating_cnt": "1"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.delete(reverse("review_detail_view", kwargs={"place_id": self.place.id, "review_id": reviews[1].id}))
+        self.assertEqual(response.status_code, 200)
+        place = Place.objects.get(id=self.place.id)
+        self.assertEqual((place.rating_sum, place.rating_count, place.rating), (0, 0, 0))
+
+    def test_review_rating(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse("review_list_view", kwargs={"place_id": self.place.id}), {"content": "some content", "rating_cnt": "4"})
+        self.assertEqual(response.status_code, 201)
+        self.client.post(reverse("review_list_view", kwargs={"place_id": self.place.id}), {"content": "some content", "rating_cnt": "5"})
+        self.assertEqual(str(Place.objects.get(id=self.place.id).rating), "4.50")
+
+        review = Review.objects.filter(place=self.place).order_by("id").first()
+        self.client.put(reverse("review_detail_view", kwargs={"place_id": self.place.id, "review_id": review.id}), {"content": "edit content", "rating_cnt": "1"})
+        self.assertEqual(str(Place.objects.get(id=self.place.id).rating), "3.00")
+
+        self.client.delete(reverse("review_detail_view", kwargs={"place_id": self.place.id, "review_id": review.id}))
+        place = Place.objects.get(id=self.place.id)
+        self.assertEqual((place.rating_sum, place.rating_count, str(place.rating)), (5, 1, "5.00"))
+
+    # 리뷰 집계로 다시 계산(리뷰가 없었던 맛집은 크롤링한 별점 유지)
+    def test_reconcile_place_ratings(self):
+        other = Place.objects.create(place_name="리뷰 없음", category="한식", place_address="제주시", place_time="영업시간", rating="4.10")
+        deleted = Place.objects.create(place_name="리뷰 삭제", category="한식", place_address="제주시", place_time="영업시간", rating="4.00", rating_sum=4, rating_count=1)
+        for rating in (5, 4, 4):
+            Review.objects.create(content="some content", rating_cnt=rating, author=self.user, place=self.place)
+
+        self.assertEqual(reconcile_place_ratings(), 2)
+        self.assertEqual(reconcile_place_ratings(), 0)
+        place = Place.objects.get(id=self.place.id)
+        self.assertEqual((place.rating_sum, place.rating_count, str(place.rating)), (13, 3, "4.33"))
+        self.assertEqual(str(Place.objects.get(id=other.id).rating), "4.10")
+        self.assertEqual(Place.objects.get(id=deleted.id).rating, 0)
+
+        Place.objects.filter(id=self.place.id).update(rating_count=10)
+        call_command("reconcile_place_ratings", stdout=open(os.devnull, "w"))
+        self.assertEqual(Place.objects.get(id=self.place.id).rating_count, 3)
+
+
+# 맛집 북마크 수, 북마크 여부
+class PlaceBookmarkCountTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f"user{n}", f"user{n}@test.com", f"0100000000{n}", "Test1234!") for n in range(3)]
+        for n, user in enumerate(cls.users):
+            Profile.objects.create(user=user, nickname=f"test{n}")
+        cls.places = [Place.objects.create(place_name=f"장소{n}", category="한식", place_address="제주시", place_time="영업시간") for n in range(2)]
+        cls.places[0].place_bookmark.add(*cls.users)
+        cls.places[1].place_bookmark.add(cls.users[1])
+        Review.objects.create(content="some content", rating_cnt=5, author=cls.users[0], place=cls.places[0])
+
+    def test_with_bookmarks(self):
+        places = Place.objects.with_bookmarks(self.users[0]).order_by("id")
+        self.assertEqual([(place.bookmark_count, place.is_bookmarked) for place in places], [(3, True), (1, False)])
+        places = Place.objects.with_bookmarks().order_by("id")
+        self.assertEqual([(place.bookmark_count, place.is_bookmarked) for place in places], [(3, False), (1, False)])
+
+    # 리뷰 리스트의 맛집은 북마크 유저 목록 없이 한 번에 조회
+    def test_review_list_place(self):
+        self.client.force_authenticate(self.users[2])
+        Review.objects.create(content="some content", rating_cnt=4, author=self.users[1], place=self.places[1])
+        response = self.client.get(reverse("reveiw_rank_view"))
+        places = {review["place"]["id"]: review["place"] for review in response.data["recent_review"]["results"]}
+        self.assertNotIn("place_bookmark", places[self.places[0].id])
+        self.assertEqual((places[self.places[0].id]["bookmark_count"], places[self.places[0].id]["is_bookmarked"]), (3, True))
+        self.assertEqual((places[self.places[1].id]["bookmark_count"], places[self.places[1].id]["is_bookmarked"]), (1, False))
+
+    def test_public_profile_bookmark_place(self):
+        self.client.force_authenticate(self.users[0])
+        response = self.client.get(reverse("public_profile_view", kwargs={"nickname": "test1"}))
+        self.assertEqual(response.status_code, 200)
+        bookmarks = sorted((place["id"], place["bookmark_count"], place["is_bookmarked"]) for place in response.data["bookmark_place"])
+        self.assertEqual(bookmarks, [(self.places[0].id, 3, True), (self.places[1].id, 1, False)])
+
+    # 북마크 유저 리스트(최근 북마크 순, 페이지네이션)
+    def test_bookmark_user_list(self):
+        self.client.force_authenticate(self.users[0])
+        response = self.client.get(reverse("place_bookmark_view", kwargs={"place_id": self.places[0].id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual([user["nickname"] for user in response.data["results"]], ["test2", "test1", "test0"])
+        response = self.client.get(reverse("place_bookmark_view", kwargs={"place_id": 0}))
+        self.assertEqual(response.status_code, 404)
+
+
+# 북마크 토글, 북마크 목록 동기화(북마크 수 같이 변경)
+class PlaceBookmarkToggleTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f"user{n}", f"user{n}@test.com", f"0100000000{n}", "Test1234!") for n in range(2)]
+        cls.places = [Place.objects.create(place_name=f"장소{n}", category="한식", place_address="제주시", place_time="영업시간") for n in range(4)]
+
+    def get_bookmark_counts(self):
+        return list(Place.objects.order_by("id").values_list("bookmark_count", flat=True))
+
+    def test_toggle_bookmark(self):
+        place_id = self.places[0].id
+        self.assertTrue(toggle_bookmark(place_id, self.users[0].id))
+        self.assertTrue(toggle_bookmark(place_id, self.users[1].id))
+        self.assertEqual(self.get_bookmark_counts(), [2, 0, 0, 0])
+        with self.assertNumQueries(1 if connection.vendor == "postgresql" else 4):
+            self.assertFalse(toggle_bookmark(place_id, self.users[0].id))
+        self.assertEqual(self.get_bookmark_counts(), [1, 0, 0, 0])
+        self.assertEqual(list(self.places[0].place_bookmark.values_list("id", flat=True)), [self.users[1].id])
+        with self.assertRaises(Place.DoesNotExist):
+            toggle_bookmark(0, self.users[0].id)
+
+    def test_bookmark_view(self):
+        self.client.force_authenticate(self.users[0])
+        url = reverse("place_bookmark_view", kwargs={"place_id": self.places[1].id})
+        self.assertEqual(self.client.post(url).data["message"], "북마크를 했습니다.")
+        self.assertEqual(self.client.post(url).data["message"], "북마크를 취소했습니다.")
+        self.assertEqual(self.get_bookmark_counts(), [0, 0, 0, 0])
+        response = self.client.post(reverse("place_bookmark_view", kwargs={"place_id": 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_sync_bookmarks(self):
+        place_ids = [place.id for place in self.places]
+        toggle_bookmark(place_ids[0], self.users[0].id)
+        toggle_bookmark(place_ids[1], self.users[0].id)
+        toggle_bookmark(place_ids[1], self.users[1].id)
+
+        self.assertEqual(sync_bookmarks(self.users[0].id, [place_ids[1], place_ids[2], place_ids[2], 0]), [place_ids[1], place_ids[2]])
+        self.assertEqual(self.get_bookmark_counts(), [0, 2, 1, 0])
+        self.assertEqual(sync_bookmarks(self.users[0].id, []), [])
+        self.assertEqual(self.get_bookmark_counts(), [0, 1, 0, 0])
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.put(reverse("place_bookmark_sync_view"), {"place_ids": place_ids[2:]}, format="json")
+        self.assertEqual(response.data["place_ids"], place_ids[2:])
+        self.assertEqual(self.get_bookmark_counts(), [0, 0, 1, 1])
+        response = self.client.put(reverse("place_bookmark_sync_view"), {"place_ids": "1,2"}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    # place_bookmark.add(), remove(), clear()도 북마크 수 반영
+    def test_bookmark_signal(self):
+        self.places[0].place_bookmark.add(*self.users)
+        self.users[0].bookmark_place.add(self.places[1], self.places[2])
+        self.assertEqual(self.get_bookmark_counts(), [2, 1, 1, 0])
+        self.places[0].place_bookmark.remove(self.users[1])
+        self.users[0].bookmark_place.clear()
+        self.assertEqual(self.get_bookmark_counts(), [0, 0, 0, 0])
+
+
+# 인기 급상승 맛집
+@override_settings(PLACE_TRENDING_HALF_LIFE=2, PLACE_TRENDING_WINDOW=14, PLACE_TRENDING_SIZE=2)
+class PlaceTrendingTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f"user{n}", f"user{n}@test.com", f"0100000000{n}", "Test1234!") for n in range(3)]
+        cls.places = [
+            Place.objects.create(place_name="장소0", category="한식", place_address="제주특별자치도 제주시 연동", place_time="영업시간"),
+            Place.objects.create(place_name="장소1", category="한식", place_address="제주특별자치도 서귀포시 중문동", place_time="영업시간"),
+            Place.objects.create(place_name="장소2", category="분식", place_address="제주특별자치도 제주시 노형동", place_time="영업시간"),
+            Place.objects.create(place_name="장소3", category="분식", place_address="제주특별자치도 제주시 이도동", place_time="영업시간"),
+        ]
+        cls.now = datetime.datetime(2022, 12, 20, 12, 0)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_decay(self):
+        self.assertTrue(np.allclose(decay(np.array([0, 2, 4, -1])), [1, 0.5, 0.25, 1]))
+
+    def test_update_trend_scores(self):
+        today = self.now.date()
+        PlaceVisitor.objects.create(place=self.places[0], date=today - datetime.timedelta(days=1), visitors=10)
+        PlaceVisitor.objects.create(place=self.places[1], date=today - datetime.timedelta(days=5), visitors=10)
+        PlaceVisitor.objects.create(place=self.places[1], date=today - datetime.timedelta(days=30), visitors=1000)
+        review = Review.objects.create(content="some content", rating_cnt=5, author=self.users[0], place=self.places[2])
+        Review.objects.filter(id=review.id).update(created_at=self.now - datetime.timedelta(days=2))
+        review.review_like.add(self.users[1])
+        self.places[3].place_bookmark.add(self.users[0])
+
+        # 처음 계산할 때는 북마크 증가분 없음
+        place_ids, scores = update_trend_scores(self.now)
+        self.assertTrue(np.allclose(scores, [10 * 0.5 ** 0.5, 10 * 0.5 ** 2.5, (10 + 2) * 0.5, 0]))
+
+        # 다음 계산 때는 증가분만 반영하고 이전 증가분은 감쇠
+        self.places[3].place_bookmark.add(self.users[1], self.users[2])
+        update_trend_scores(self.now + datetime.timedelta(days=2))
+        self.places[3].place_bookmark.remove(self.users[2])
+        place_ids, scores = update_trend_scores(self.now + datetime.timedelta(days=4))
+        self.assertAlmostEqual(scores[3], 5 * 2 * 0.5)
+        self.assertEqual(PlaceTrend.objects.get(place=self.places[3]).bookmark_count, 2)
+
+    def test_trending(self):
+        for place, visitors in zip(self.places, [30, 20, 10, 0]):
+            PlaceVisitor.objects.create(place=place, date=self.now.date(), visitors=visitors)
+        update_trending(self.now)
+
+        self.assertEqual([place["id"] for place in get_trending()], [self.places[0].id, self.places[1].id])
+        self.assertEqual([place["id"] for place in get_trending("분식")], [self.places[2].id])
+        self.assertEqual([place["id"] for place in get_trending("한식", "서귀포시")], [self.places[1].id])
+        self.assertEqual([place["id"] for place in get_trending(city="제주시")], [self.places[0].id, self.places[2].id])
+
+        # 캐시가 만료되면 저장된 점수로 조회
+        cache.clear()
+        self.assertEqual([place["id"] for place in get_trending(city="제주시")], [self.places[0].id, self.places[2].id])
+        with self.assertNumQueries(0):
+            get_trending(city="제주시")
+
+        response = self.client.get(reverse("place_trending_view"), {"category": "분식"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["place_name"], "장소2")
+        response = self.client.get(reverse("place_trending_view"), {"city": "서울시"})
+        self.assertEqual(response.status_code, 400)
+
+
+# 맛집 여러 개 조회(요청 순서대로, 조회수에 포함하지 않음)
+class PlaceBatchTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("user1", "user1@test.com", "01000000000", "Test1234!")
+        cls.places = [Place.objects.create(place_name=f"장소{n}", category="한식", place_address="제주시", place_time="영업시간") for n in range(3)]
+        cls.places[1].place_bookmark.add(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_place_batch(self):
+        self.client.force_authenticate(self.user)
+        place_ids = [self.places[2].id, 0, self.places[1].id, self.places[2].id, self.places[0].id]
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("place_batch_view"), {"ids": ",".join(map(str, place_ids))})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([place["id"] for place in response.data], [self.places[2].id, self.places[1].id, self.places[0].id])
+        self.assertEqual([place["is_bookmarked"] for place in response.data], [False, True, False])
+        self.assertEqual(list(Place.objects.order_by("id").values_list("hit", flat=True)), [0, 0, 0])
+
+    def test_place_batch_fail(self):
+        self.assertEqual(self.client.get(reverse("place_batch_view"), {"ids": "1,a"}).status_code, 400)
+        self.assertEqual(self.client.get(reverse("place_batch_view")).status_code, 400)
+        with override_settings(PLACE_BATCH_MAX_SIZE=2):
+            self.assertEqual(self.client.get(reverse("place_batch_view"), {"ids": "1,2,3"}).status_code, 400)
+
+
+# 검색 API 대신 기록해둔 응답을 돌려주는 로컬 서버(요청 수, 동시 요청 수 기록)
+class RecordedSearchHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        key = (params["query"], int(params["page"]))
+        with server.lock:
+            server.requests[key] += 1
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        time.sleep(0.01)
+
+        status, body = 200, {"result": {"place": {"list": server.responses.get(key, [])}}}
+        if server.requests[key] <= server.failures.get(key, 0):
+            status, body = 503, {}
+        elif key in server.missing:
+            status, body = 404, {}
+        with server.lock:
+            server.active -= 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(body, ensure_ascii=False).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def get_search_item(name, address, status="21:30에 라스트오더", y="33.4996", x="126.5312"):
+    return {
+        "name": name, "roadAddress": address, "tel": "064-000-0000", "thumUrl": "img_url", "menuInfo": "메뉴 10,000",
+        "microReview": ["맛있는 곳"], "businessStatus": {"status": {"detailInfo": status}}, "y": y, "x": x,
+    }
+
+
+# 맛집 크롤링(로컬 서버의 기록된 응답 사용)
+@override_settings(PLACE_CRAWLER_BACKOFF=0, PLACE_CRAWLER_RETRIES=2)
+class PlaceCrawlerTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RecordedSearchHandler)
+        cls.server.lock = threading.Lock()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/search"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests = collections.Counter()
+        self.server.active = self.server.max_active = 0
+        self.server.failures, self.server.missing = {}, set()
+        self.server.responses = {
+            ("제주시 한식", 1): [get_search_item("제주 식당", "제주시 연동 1"), get_search_item("돈사돈", "제주시 노형동 2")],
+            ("제주시 한식", 2): [get_search_item("바다 식당", "제주시 이도동 3", status="10:00~21:00 매주 월요일 휴무")],
+            ("제주시 흑돼지", 1): [get_search_item("돈사돈 ", "제주시  노형동 2"), get_search_item("", "제주시")],
+            ("제주시 분식", 1): [get_search_item("분식집", "제주시 삼도동 4", y=[], x=[])],
+        }
+        self.keywords = [("제주시 한식", "한식"), ("제주시 흑돼지", "한식"), ("제주시 분식", "분식")]
+
+    def crawl(self, **kwargs):
+        return crawl_places(self.keywords, pages=2, batch_size=2, url=self.url, **kwargs)
+
+    def test_parse_place(self):
+        values = parse_place(get_search_item("제주 식당" * 20, [], y=[]), "한식")
+        self.assertEqual((len(values["place_name"]), values["place_address"], values["latitude"], values["longitude"]), (50, "", None, 126.5312))
+        self.assertEqual(get_place_key(" 돈사돈", "제주시  노형동 2"), get_place_key("돈사돈", "제주시 노형동 2"))
+
+    def test_crawl_places(self):
+        self.server.failures = {("제주시 한식", 1): 2}
+        self.server.missing = {("제주시 분식", 2)}
+        stats = self.crawl(concurrency=2)
+        self.assertEqual((stats["created"], stats["duplicated"], stats["skipped"], stats["failed"]), (4, 1, 1, 1))
+        self.assertEqual(self.server.requests["제주시 한식", 1], 3)
+        self.assertEqual(self.server.requests["제주시 분식", 2], 1)
+        self.assertLessEqual(self.server.max_active, 2)
+
+        # signal 대신 직접 반영한 위치 격자 번호, 영업시간, 검색 엔진 outbox
+        place = Place.objects.get(place_name="바다 식당")
+        self.assertEqual(place.geo_cell, get_geo_cell(33.4996, 126.5312))
+        self.assertEqual(PlaceOpeningHours.objects.filter(place=place).count(), 6)
+        self.assertEqual(PlaceIndexOutbox.objects.filter(place_id__in=Place.objects.values("id")).count(), 4)
+        self.assertIsNone(Place.objects.get(place_name="분식집").latitude)
+
+    # 다시 크롤링하면 바뀐 맛집만 수정(표기만 다른 중복 맛집은 받은 순서와 상관없이 변경 없음)
+    def test_crawl_places_update(self):
+        self.crawl()
+        self.assertEqual(Place.objects.get(place_name="돈사돈").place_address, "제주시 노형동 2")
+        for concurrency in (1, 8, 8):
+            self.assertEqual(self.crawl(concurrency=concurrency)["unchanged"], 4)
+        PlaceIndexOutbox.objects.all().delete()
+
+        self.server.responses["제주시 한식", 2] = [get_search_item("바다 식당", "제주시 이도동 3", status="10:00~22:00", y="33.6")]
+        stats = self.crawl()
+        self.assertEqual((stats["created"], stats["updated"], stats["unchanged"]), (0, 1, 3))
+        place = Place.objects.get(place_name="바다 식당")
+        self.assertEqual((place.place_time, place.geo_cell), ("10:00~22:00", get_geo_cell(33.6, 126.5312)))
+        self.assertEqual(PlaceOpeningHours.objects.filter(place=place).count(), 7)
+        self.assertEqual(Place.objects.count(), 4)
+
+        # 검색 필드가 바뀌지 않았으면 검색 엔진 outbox에 추가하지 않음
+        self.assertFalse(PlaceIndexOutbox.objects.exists())
+
+    # 전부 실패해도 저장된 맛집은 그대로
+    def test_crawl_places_fail(self):
+        self.server.failures = {(query, page): 10 for query, _ in self.keywords for page in (1, 2)}
+        stats = self.crawl()
+        self.assertEqual((stats["created"], stats["failed"]), (0, 6))
+        self.assertEqual(self.server.requests["제주시 한식", 1], 3)
+
 
 class PlaceDetailAPIViewTestCase(APITestCase):
     @classmethod
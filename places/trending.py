@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from reviews.models import Review
+from .models import Place, PlaceVisitor, PlaceTrend, CHOICE_CATEGORY
+from .visitors import count_visitors
+
+import datetime
+import numpy as np
+
+# 유저 행동별 가중치(방문자 1명 기준)
+VISITOR_WEIGHT = 1
+BOOKMARK_WEIGHT = 5
+REVIEW_WEIGHT = 10
+REVIEW_LIKE_WEIGHT = 2
+TRENDING_FIELDS = ["id", "place_name", "category", "rating", "place_address", "place_img", "hit", "bookmark_count"]
+CATEGORIES = CHOICE_CATEGORY[:12]
+CITIES = CHOICE_CATEGORY[12:]
+
+
+def get_trending_key(category=None, city=None):
+    return f"place_trending:{city or ''}:{category or ''}"
+
+
+# 지난 시간(일)에 따른 가중치(PLACE_TRENDING_HALF_LIFE일마다 절반)
+def decay(age):
+    return np.exp2(-np.maximum(age, 0) / settings.PLACE_TRENDING_HALF_LIFE)
+
+
+# 지금까지 지난 시간(일)
+def get_age(now, times):
+    return (np.datetime64(now, "s") - np.asarray(times, dtype="datetime64[s]")) / np.timedelta64(1, "D")
+
+
+# 정렬된 맛집 id 배열 위치별 가중치 합(삭제된 맛집 제외)
+def sum_by_place(place_ids, target_ids, weights):
+    target_ids = np.asarray(target_ids, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(place_ids, target_ids), max(len(place_ids) - 1, 0))
+    known = place_ids[positions] == target_ids if len(place_ids) else np.zeros(len(target_ids), dtype=bool)
+    return np.bincount(positions[known], weights=np.asarray(weights, dtype=np.float64)[known], minlength=len(place_ids))
+
+
+# 최근 방문자, 리뷰, 리뷰 좋아요, 북마크 증가분을 시간에 따라 감쇠해서 더한 맛집별 점수 계산 후 저장
+# 북마크, 리뷰 좋아요는 시간 기록이 없어서 북마크는 지난 계산 이후 증가분을 감쇠 누적하고 좋아요는 리뷰 작성 시간 기준
+def update_trend_scores(now=None):
+    now = now or timezone.now()
+    start = now - datetime.timedelta(days=settings.PLACE_TRENDING_WINDOW)
+    places = np.array(list(Place.objects.order_by("id").values_list("id", "bookmark_count")), dtype=np.int64).reshape(-1, 2)
+    place_ids, bookmark_counts = places[:, 0], places[:, 1]
+
+    # 일별 고유 방문자(어제까지는 집계 테이블, 오늘은 실시간 추정값, 하루의 가운데 시간 기준)
+    visits = list(PlaceVisitor.objects.filter(date__gte=start.date()).values_list("place_id", "date", "visitors"))
+    visits += [(place_id, now.date(), visitors) for place_id, visitors in count_visitors(now.date()).items()]
+    visit_ids, visit_dates, visitors = zip(*visits) if visits else ([], [], [])
+    visit_times = np.asarray(visit_dates, dtype="datetime64[D]") + np.timedelta64(12, "h")
+    scores = VISITOR_WEIGHT * sum_by_place(place_ids, visit_ids, np.asarray(visitors) * decay(get_age(now, visit_times)))
+
+    # 최근 리뷰와 그 리뷰의 좋아요
+    reviews = list(Review.objects.filter(created_at__gte=start).annotate(likes=Count("review_like")).values_list("place_id", "created_at", "likes"))
+    review_ids, created_at, likes = zip(*reviews) if reviews else ([], [], [])
+    review_weights = (REVIEW_WEIGHT + REVIEW_LIKE_WEIGHT * np.asarray(likes, dtype=np.float64)) * decay(get_age(now, created_at))
+    scores += sum_by_place(place_ids, review_ids, review_weights)
+
+    # 지난 계산 이후 북마크 증가분(처음 계산할 때는 증가분 없음, 지난 계산 이후 추가된 맛집은 0에서 증가)
+    trends = list(PlaceTrend.objects.values_list("place_id", "bookmark_count", "bookmark_score", "updated_at"))
+    previous_counts = np.zeros(len(place_ids)) if trends else bookmark_counts.astype(np.float64)
+    bookmark_scores = np.zeros(len(place_ids))
+    if trends:
+        trend_ids, counts, trend_scores, updated_at = zip(*trends)
+        previous_counts += sum_by_place(place_ids, trend_ids, counts)
+        bookmark_scores += sum_by_place(place_ids, trend_ids, np.asarray(trend_scores) * decay(get_age(now, updated_at)))
+    bookmark_scores += np.maximum(bookmark_counts - previous_counts, 0)
+    scores += BOOKMARK_WEIGHT * bookmark_scores
+
+    PlaceTrend.objects.bulk_create(
+        [
+            PlaceTrend(place_id=place_id, score=score, bookmark_count=bookmark_count, bookmark_score=bookmark_score, updated_at=now)
+            for place_id, score, bookmark_count, bookmark_score in zip(place_ids.tolist(), scores.tolist(), bookmark_counts.tolist(), bookmark_scores.tolist())
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["place_id"],
+        update_fields=["score", "bookmark_count", "bookmark_score", "updated_at"],
+    )
+    return place_ids, scores
+
+
+# 전체, 음식 카테고리별, 장소(제주시, 서귀포시)별, 장소의 음식 카테고리별 점수 상위 맛집을 캐시에 저장(맛집 조회 한 번)
+def update_trending(now=None):
+    place_ids, scores = update_trend_scores(now)
+    places = {place_id: (category, place_address) for place_id, category, place_address in Place.objects.values_list("id", "category", "place_address")}
+    places = [places.get(place_id, ("", "")) for place_id in place_ids.tolist()]
+    categories = np.array([category for category, _ in places], dtype=object)
+    city_masks = {city: np.array([city in place_address for _, place_address in places], dtype=bool) for city in CITIES}
+
+    rankings = {}
+    for category in [None] + CATEGORIES:
+        category_mask = categories == category if category else np.ones(len(place_ids), dtype=bool)
+        for city in [None] + CITIES:
+            mask = category_mask & city_masks[city] if city else category_mask
+            candidates = np.flatnonzero(mask & (scores > 0))
+            order = candidates[np.lexsort((place_ids[candidates], -scores[candidates]))][: settings.PLACE_TRENDING_SIZE]
+            rankings[get_trending_key(category, city)] = [(int(place_ids[index]), round(float(scores[index]), 2)) for index in order]
+
+    values = {place["id"]: place for place in Place.objects.filter(id__in={place_id for ranking in rankings.values() for place_id, _ in ranking}).values(*TRENDING_FIELDS)}
+    cache.set_many(
+        {key: [dict(values[place_id], score=score) for place_id, score in ranking if place_id in values] for key, ranking in rankings.items()},
+        settings.PLACE_TRENDING_TIMEOUT,
+    )
+    return rankings
+
+
+# 인기 급상승 맛집(캐시 조회 한 번, 캐시가 만료됐으면 저장된 점수로 조회)
+def get_trending(category=None, city=None):
+    key = get_trending_key(category, city)
+    ranking = cache.get(key)
+    if ranking is None:
+        queryset = Place.objects.filter(place_trend__score__gt=0)
+        if category:
+            queryset = queryset.filter(category=category)
+        if city:
+            queryset = queryset.filter(place_address__contains=city)
+        places = queryset.order_by("-place_trend__score", "id").values(*TRENDING_FIELDS, "place_trend__score")[: settings.PLACE_TRENDING_SIZE]
+        ranking = [{**{field: place[field] for field in TRENDING_FIELDS}, "score": round(place["place_trend__score"], 2)} for place in places]
+        cache.set(key, ranking, settings.PLACE_TRENDING_TIMEOUT)
+    return ranking
@@ -6,6 +6,10 @@ urlpatterns = [
     # Place
     path("<int:place_id>/", views.PlaceDetailView.as_view(), name="place_detail_view"),
     path("<int:place_id>/bookmarks/", views.PlaceBookmarkView.as_view(), name="place_bookmark_view"),
+    path("bookmarks/", views.PlaceBookmarkSyncView.as_view(), name="place_bookmark_sync_view"),
+    path("batch/", views.PlaceBatchView.as_view(), name="place_batch_view"),
+    path("nearby/", views.PlaceNearbyView.as_view(), name="place_nearby_view"),
+    path("trending/", views.PlaceTrendingView.as_view(), name="place_trending_view"),
     
     # Recommendation
     path("selection/<int:choice_no>/", views.PlaceSelectView.as_view(), name="place_select_view"),
@@ -14,4 +18,5 @@ urlpatterns = [
     
     # Search
     path("search/", views.SearchListView.as_view(), name="search"),
+    path("autocomplete/", views.PlaceAutocompleteView.as_view(), name="place_autocomplete_view"),
 ]
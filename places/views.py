@@ -6,43 +6,38 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
 
 from django.db.models import Case, When
+from django.conf import settings
+from django.utils import timezone
 
 from drf_yasg.utils import swagger_auto_schema
 
 from gaggamagga.permissions import IsAdminOrOntherReadOnly
 from gaggamagga.pagination import PaginationHandlerMixin
 from . import client
-from .models import Place
-from reviews.models import Review
-from .serializers import PlaceSerializer
+from .models import Place, PlaceRecommendation, CHOICE_CATEGORY
+from .serializers import PlaceSerializer, PlaceListSerializer, PlaceBookmarkUserSerializer
 from .rcm_places import rcm_place_user, rcm_place_new_user
+from .rating_matrix import get_rating_matrix
+from .factors import get_factor_model
+from .select_pool import sample_select_places
+from .hit_counter import record_hit
+from .visitors import record_visit, get_visitor
+from .autocomplete import get_autocomplete
+from .nearby import nearest_places, places_within, get_location, rerank_by_distance
+from .opening_hours import get_open_now, filter_open_places
+from .bookmarks import toggle_bookmark, sync_bookmarks
+from .trending import get_trending, CATEGORIES, CITIES
 
 import random
-import pandas as pd
-import numpy as np
-
-CHOICE_CATEGORY = [
-    "분식",
-    "한식",
-    "돼지고기구이",
-    "치킨,닭강정",
-    "햄버거",
-    "피자",
-    "중식",
-    "일식",
-    "양식",
-    "태국음식",
-    "인도음식",
-    "베트남음식",
-    "제주시",
-    "서귀포시",
-]
-
 
 
 class PlaceListPagination(PageNumberPagination):
     page_size = 10
 
+
+class PlaceBookmarkPagination(PageNumberPagination):
+    page_size = 20
+
 ##### 맛집 #####
 class PlaceDetailView(APIView):
     permission_classes = [IsAdminOrOntherReadOnly]
@@ -53,8 +48,14 @@ class PlaceDetailView(APIView):
         responses={200: "성공", 404: "찾을 수 없음", 500: "서버 에러"},
     )
     def get(self, request, place_id):
-        place = get_object_or_404(Place, id=place_id)
-        place.hit_count
+        place = get_object_or_404(Place.objects.with_bookmarks(request.user), id=place_id)
+
+        # 조회수는 Redis 버퍼에 기록 후 주기적으로 DB에 반영(Redis가 없으면 바로 반영), 조회한 맛집에 아직 반영되지 않은 조회수를 더해서 응답
+        place.hit += record_hit(place.id)
+
+        # 일일 고유 방문자 집계(새로고침, 반복 조회는 한 번만 집계)
+        record_visit(place.id, get_visitor(request))
+
         serializer = PlaceSerializer(place)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -68,8 +69,42 @@ class PlaceDetailView(APIView):
         place.delete()
         return Response({"message": "맛집 삭제 완료"}, status=status.HTTP_200_OK)
 
-class PlaceBookmarkView(APIView):
+class PlaceBatchView(APIView):
+    permission_classes = [AllowAny]
+
+    # 여러 맛집 한 번에 조회(ids=1,2,3 순서대로, 없는 맛집 제외, 조회수에 포함하지 않음)
+    @swagger_auto_schema(
+        operation_summary="맛집 여러 개 조회", responses={200: "성공", 400: "쿼리 에러", 500: "서버 에러"}
+    )
+    def get(self, request):
+        try:
+            place_ids = list(dict.fromkeys(int(place_id) for place_id in request.GET.get("ids", "").split(",")))
+        except ValueError:
+            return Response({"message": "쿼리 에러"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(place_ids) > settings.PLACE_BATCH_MAX_SIZE:
+            return Response({"message": "쿼리 에러"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # id__in 쿼리 한 번으로 조회 후 요청 순서대로 정렬
+        places = {place.id: place for place in Place.objects.with_bookmarks(request.user).filter(id__in=place_ids)}
+        serializer = PlaceListSerializer([places[place_id] for place_id in place_ids if place_id in places], many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class PlaceBookmarkView(PaginationHandlerMixin, APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = PlaceBookmarkPagination
+
+    # 맛집 북마크 유저 리스트(최근 북마크 순)
+    @swagger_auto_schema(
+        operation_summary="맛집 북마크 유저 리스트",
+        responses={200: "성공", 401: "인증 에러", 404: "찾을 수 없음", 500: "서버 에러"},
+    )
+    def get(self, request, place_id):
+        get_object_or_404(Place, id=place_id)
+        bookmarks = Place.place_bookmark.through.objects.filter(place_id=place_id).select_related("user__user_profile").order_by("-id")
+        page = self.paginate_queryset(bookmarks)
+        serializer = self.get_paginated_response(PlaceBookmarkUserSerializer(page, many=True).data)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
     # 맛집 북마크
     @swagger_auto_schema(
@@ -77,70 +112,86 @@ class PlaceBookmarkView(APIView):
         responses={200: "성공", 401: "인증 에러", 404: "찾을 수 없음", 500: "서버 에러"},
     )
     def post(self, request, place_id):
-        place = get_object_or_404(Place, id=place_id)
-        if request.user in place.place_bookmark.all():
-            place.place_bookmark.remove(request.user)
-            return Response({"message": "북마크를 취소했습니다."}, status=status.HTTP_200_OK)
-        else:
-            place.place_bookmark.add(request.user)
+        try:
+            bookmarked = toggle_bookmark(place_id, request.user.id)
+        except Place.DoesNotExist:
+            return Response({"message": "찾을 수 없음"}, status=status.HTTP_404_NOT_FOUND)
+        if bookmarked:
             return Response({"message": "북마크를 했습니다."}, status=status.HTTP_200_OK)
+        return Response({"message": "북마크를 취소했습니다."}, status=status.HTTP_200_OK)
 
-##### 취향 선택 #####
-class PlaceSelectView(APIView):
-    permission_classes = [AllowAny]
 
-    # 맛집 취향 선택(리뷰가 없거나, 비로그인 계정일 경우)
+class PlaceBookmarkSyncView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    # 북마크 목록 동기화(앱에 저장된 맛집 id 목록(place_ids)과 같게 맞춤)
     @swagger_auto_schema(
-        operation_summary="맛집 취향 선택", responses={200: "성공", 500: "서버 에러"}
+        operation_summary="맛집 북마크 목록 동기화",
+        responses={200: "성공", 400: "인풋값 에러", 401: "인증 에러", 500: "서버 에러"},
     )
-    def get(self, request, choice_no):
-        place_list = []
-        load_no = random.randint(1, 6) 
-
-        # Case1: 장소(제주시, 서귀포시)를 선택했을 경우
-        if choice_no > 12:
-            place_list = []
-
-            # 해당 장소의 음식 종류별 맛집 하나씩 호출하고 place_list에 담는다.
-            for i in range(0, 12):
-                pick = Place.objects.filter(place_address__contains=CHOICE_CATEGORY[choice_no - 1],category=CHOICE_CATEGORY[i]).first()
-
-                if pick != None:    # pick이 선택되었을 경우
-                    place_list.append(pick.id)
-                else:               # pick이 선택되지 않았을 경우
-                    pass
-
-            # for문에서 생성된 리스트에 해당하는 데이터 생성 후 json 전달
-            preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(place_list)])
-            place = Place.objects.filter(id__in=place_list).order_by(preserved)
-            serializer = PlaceSerializer(place, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+    def put(self, request):
+        place_ids = request.data.get("place_ids")
+        if not isinstance(place_ids, list) or len(place_ids) > settings.PLACE_BOOKMARK_SYNC_MAX_SIZE or not all(type(place_id) is int for place_id in place_ids):
+            return Response({"message": "인풋값 에러"}, status=status.HTTP_400_BAD_REQUEST)
+        place_ids = sync_bookmarks(request.user.id, place_ids)
+        return Response({"place_ids": place_ids}, status=status.HTTP_200_OK)
+
+##### 주변 맛집 #####
+class PlaceNearbyView(APIView):
+    permission_classes = [AllowAny]
 
-        # Case2: 음식(한식, 분식, 양식 등)을 선택했을 경우
+    # 위치(lat, lng)에서 가까운 맛집 k개 또는 반경(radius, m) 안의 맛집(category, open_now로 필터링 가능)
+    @swagger_auto_schema(
+        operation_summary="주변 맛집", responses={200: "성공", 400: "쿼리 에러", 500: "서버 에러"}
+    )
+    def get(self, request):
+        try:
+            location = get_location(request.GET)
+            k = min(int(request.GET.get("k", 10)), settings.PLACE_NEARBY_MAX_SIZE)
+            radius = float(request.GET["radius"]) if request.GET.get("radius") else None
+        except (TypeError, ValueError):
+            return Response({"message": "쿼리 에러"}, status=status.HTTP_400_BAD_REQUEST)
+        if location is None or k < 1 or (radius is not None and not 0 < radius <= settings.PLACE_NEARBY_MAX_RADIUS):
+            return Response({"message": "쿼리 에러"}, status=status.HTTP_400_BAD_REQUEST)
+
+        category = request.GET.get("category")
+        open_at = timezone.now() if get_open_now(request.GET) else None
+        if radius is None:
+            places = nearest_places(*location, k, category, open_at=open_at)
         else:
+            places = places_within(*location, radius, k, category, open_at)
+        return Response(places, status=status.HTTP_200_OK)
 
-            # 한식, 패스트푸드, 아시아 선택햇을 경우
-            if (choice_no == 3) | (choice_no == 6) | (choice_no == 12):
-                place_list = []
+##### 인기 급상승 맛집 #####
+class PlaceTrendingView(APIView):
+    permission_classes = [AllowAny]
 
-                # 각 카테고리에 해당하는 맛집 3개씩 호출
-                pick1 = Place.objects.filter(category=CHOICE_CATEGORY[choice_no - 1])[load_no - 1 : load_no + 2]
-                pick2 = Place.objects.filter(category=CHOICE_CATEGORY[choice_no - 2])[load_no - 1 : load_no + 2]
-                pick3 = Place.objects.filter(category=CHOICE_CATEGORY[choice_no - 3])[load_no - 1 : load_no + 2]
+    # 최근 방문자, 리뷰, 좋아요, 북마크로 계산한 인기 급상승 맛집(category, city로 구분 가능)
+    @swagger_auto_schema(
+        operation_summary="인기 급상승 맛집", responses={200: "성공", 400: "쿼리 에러", 500: "서버 에러"}
+    )
+    def get(self, request):
+        category, city = request.GET.get("category"), request.GET.get("city")
+        if (category and category not in CATEGORIES) or (city and city not in CITIES):
+            return Response({"message": "쿼리 에러"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(get_trending(category, city), status=status.HTTP_200_OK)
 
-                # 호출한 맛집 리스트 병합 후 json 전달
-                pick = pick1 | pick2 | pick3
-                serializer = PlaceSerializer(pick, many=True)
-                return Response(serializer.data, status=status.HTTP_200_OK)
+##### 취향 선택 #####
+class PlaceSelectView(APIView):
+    permission_classes = [AllowAny]
 
-            # 한식, 패스트푸드, 아시아 외의 카테고리를 선택했을 경우
-            else:
-                place_list = []
+    # 맛집 취향 선택(리뷰가 없거나, 비로그인 계정일 경우)
+    @swagger_auto_schema(
+        operation_summary="맛집 취향 선택", responses={200: "성공", 500: "서버 에러"}
+    )
+    def get(self, request, choice_no):
 
-                # 카테고리에 해당하는 맛집 9개 호출 후 json 전달
-                pick = Place.objects.filter(category=CHOICE_CATEGORY[choice_no - 1])[0:9]
-                serializer = PlaceSerializer(pick, many=True)
-                return Response(serializer.data, status=status.HTTP_200_OK)
+        # 캐시된 후보 목록에서 무작위로 추출한 맛집만 조회(삭제된 맛집 제외, 추출 순서 유지)
+        place_ids = sample_select_places(choice_no)
+        places = Place.objects.with_bookmarks(request.user).in_bulk(place_ids)
+        pick = [places[place_id] for place_id in place_ids if place_id in places]
+        serializer = PlaceListSerializer(pick, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 ##### 맛집(리뷰가 없거나, 비로그인 계정일 경우) #####
@@ -150,61 +201,49 @@ class NewUserPlaceListView(PaginationHandlerMixin, APIView):
 
     # 맛집 리스트 추천
     @swagger_auto_schema(
-        operation_summary="맛집 리스트 추천(비유저)", responses={200: "성공", 500: "서버 에러"}
+        operation_summary="맛집 리스트 추천(비유저)", responses={200: "성공", 400: "카테고리 에러", 500: "서버 에러"}
     )
     def get(self, request, place_id, category):
-        places = pd.DataFrame(list(Place.objects.values()))     # DB에서 가져온 맛집 정보 데이터프레임 생성
+        if category not in CHOICE_CATEGORY:
+            return Response({"message": "카테고리 에러"}, status=status.HTTP_400_BAD_REQUEST)
         cate_id = CHOICE_CATEGORY.index(category) + 1           # 전달받은 카테고리의 인덱스 저장
+        try:
+            location = get_location(request.GET)
+        except (TypeError, ValueError):
+            return Response({"message": "위치 에러"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if cate_id <= 12:  # Case1: 음식(한식, 분식, 양식 등)을 선택했을 경우
-
-            # 한식, 패스트푸드, 아시아 선택햇을 경우
-            if (cate_id == 3) | (cate_id == 6) | (cate_id == 12):
-
-                # 인덱스를 통해 각 카테고리 이름 저장
-                category1 = CHOICE_CATEGORY[cate_id - 1]
-                category2 = CHOICE_CATEGORY[cate_id - 2]
-                category3 = CHOICE_CATEGORY[cate_id - 3]
+        # 행렬 분해 추천 엔진을 사용하는 경우
+        factor_model = get_factor_model() if settings.RECOMMEND_ENGINE == "als" else None
+        place_list = factor_model.rcm_place_new_user(place_id, cate_id) if factor_model else None
 
-                # 각 카테고리에 해당하는 맛집 정보를 Dataframe에서 가져와서 저장
-                place1 = places[places["category"].str.contains(category1)]
-                place2 = places[places["category"].str.contains(category2)]
-                place3 = places[places["category"].str.contains(category3)]
+        # 학습된 모델이 없거나 학습 이후 추가된 맛집일 경우 카테고리별로 미리 잘라둔 별점 행렬 사용
+        if place_list is None:
+            rating_matrix = get_rating_matrix(cate_id)
 
-                # 각 카테고리별 리스트를 만든 후, 저장된 데이터프레임 병합
-                place_list = [place1, place2, place3]
-                places = pd.concat(place_list, ignore_index=True)
+            # 추천 머신러닝 실행
+            place_list = rcm_place_new_user(review_user=rating_matrix.matrix, place_ids=rating_matrix.place_ids, place_id=place_id)
 
-            # 한식, 패스트푸드, 아시아 외의 카테고리를 선택했을 경우
-            else:
-                cate = CHOICE_CATEGORY[cate_id - 1]
-                places = places[places["category"].str.contains(cate)]
+        # 지금 영업 중인 맛집만(open_now)
+        if get_open_now(request.GET):
+            place_list = filter_open_places(place_list[: settings.RECOMMEND_RERANK_SIZE])
 
-        else:  # Case2: 장소(제주시, 서귀포시)를 선택했을 경우
-            cate = CHOICE_CATEGORY[cate_id - 1]
-            places = places[places["place_address"].str.contains(cate)]
-
-
-        # 리뷰 데이터프레임 호출
-        reviews = pd.DataFrame(list(Review.objects.values()))
-
-        # 맛집(place) 데이터프레임과 리뷰 데이터프레임 병합
-        places.rename(columns={"id": "place_id"}, inplace=True)
-        place_ratings = pd.merge(places, reviews, on="place_id")
-
-        # 병합된 데이터프레임에서 장소, 리뷰유저를 기준, 별점을 값으로 피봇테이블 생성
-        review_user = place_ratings.pivot_table("rating_cnt", index="author_id", columns="place_id")
-
-        # 추천 머신러닝 실행
-        place_list = rcm_place_new_user(review_user=review_user, place_id=place_id)
+        # 위치(lat, lng)가 주어진 경우 추천 순위와 거리를 섞어서 다시 정렬
+        distances = {}
+        if location:
+            place_list, distances = rerank_by_distance(place_list[: settings.RECOMMEND_RERANK_SIZE], *location)
+        place_list = place_list[: settings.RECOMMEND_LIST_SIZE]
 
         # 머신러닝 결과 순서 리스트에 저장 후 순서대로 쿼리셋 호출
         preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(place_list)])
-        place = Place.objects.filter(id__in=place_list).order_by(preserved)
+        place = Place.objects.with_bookmarks(request.user).filter(id__in=place_list).order_by(preserved)
 
-        # 페이지네이션으로 구분하여 json 전달
+        # 페이지네이션으로 구분하여 json 전달(위치가 주어진 경우 거리(m) 추가)
         page = self.paginate_queryset(place)
-        serializer = self.get_paginated_response(PlaceSerializer(page, many=True).data)
+        data = PlaceListSerializer(page, many=True).data
+        if location:
+            for item in data:
+                item["distance"] = distances.get(item["id"])
+        serializer = self.get_paginated_response(data)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -216,67 +255,62 @@ class UserPlaceListView(PaginationHandlerMixin, APIView):
     # 맛집 리스트 추천
     @swagger_auto_schema(
         operation_summary="맛집 리스트 추천(유저)",
-        responses={200: "성공", 401: "인증 에러", 500: "서버 에러"},
+        responses={200: "성공", 400: "카테고리 에러", 401: "인증 에러", 500: "서버 에러"},
     )
     def get(self, request, cate_id):
-        places = pd.DataFrame(list(Place.objects.values()))     # DB에서 가져온 맛집 정보 데이터프레임 생성
-
-        if cate_id <= 12:  # Case1: 음식(한식, 분식, 양식 등)을 선택했을 경우
-            
-            # 한식, 패스트푸드, 아시아 선택햇을 경우
-            if (cate_id == 3) | (cate_id == 6) | (cate_id == 12):
-
-                # 인덱스를 통해 각 카테고리 이름 저장
-                category1 = CHOICE_CATEGORY[cate_id - 1]
-                category2 = CHOICE_CATEGORY[cate_id - 2]
-                category3 = CHOICE_CATEGORY[cate_id - 3]
-
-                # 각 카테고리에 해당하는 맛집 정보를 Dataframe에서 가져와서 저장
-                place1 = places[places["category"].str.contains(category1)]
-                place2 = places[places["category"].str.contains(category2)]
-                place3 = places[places["category"].str.contains(category3)]
-
-                # 각 카테고리별 리스트를 만든 후, 저장된 데이터프레임 병합
-                place_list = [place1, place2, place3]
-                places = pd.concat(place_list, ignore_index=True)
-
-            # 한식, 패스트푸드, 아시아 외의 카테고리를 선택했을 경우
-            else:
-                category = CHOICE_CATEGORY[cate_id - 1]
-                places = places[places["category"].str.contains(category)]
+        if not 1 <= cate_id <= len(CHOICE_CATEGORY):
+            return Response({"message": "카테고리 에러"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            location = get_location(request.GET)
+        except (TypeError, ValueError):
+            return Response({"message": "위치 에러"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 행렬 분해 추천 엔진을 사용하는 경우(학습 이후 가입한 유저는 None)
+        factor_model = get_factor_model() if settings.RECOMMEND_ENGINE == "als" else None
+        place_list = factor_model.rcm_place_user(request.user.id, cate_id) if factor_model else None
+
+        # 배치 작업으로 미리 계산된 추천 결과가 있을 경우 사용, 없는 유저일 경우 직접 계산
+        if place_list is None:
+            recommendation = PlaceRecommendation.objects.filter(user=request.user, cate_id=cate_id).first()
+            place_list = recommendation.place_list if recommendation else self.rcm_place_list(request.user.id, cate_id)
+
+        # 지금 영업 중인 맛집만(open_now)
+        if get_open_now(request.GET):
+            place_list = filter_open_places(place_list[: settings.RECOMMEND_RERANK_SIZE])
+
+        # 위치(lat, lng)가 주어진 경우 추천 순위와 거리를 섞어서 다시 정렬
+        distances = {}
+        if location:
+            place_list, distances = rerank_by_distance(place_list[: settings.RECOMMEND_RERANK_SIZE], *location)
+        place_list = place_list[: settings.RECOMMEND_LIST_SIZE]
 
-        else:  # Case2: 장소(제주시, 서귀포시)를 선택했을 경우
-            category = CHOICE_CATEGORY[cate_id - 1]
-            places = places[places["place_address"].str.contains(category)]
-
-        # 리뷰 데이터프레임 호출
-        reviews = pd.DataFrame(list(Review.objects.values()))
+        # 머신러닝 결과 순서 리스트에 저장 후 순서대로 쿼리셋 호출
+        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(place_list)])
+        place = Place.objects.with_bookmarks(request.user).filter(id__in=place_list).order_by(preserved)
 
-        # 맛집(place) 데이터프레임과 리뷰 데이터프레임 병합
-        places.rename(columns={"id": "place_id"}, inplace=True)
-        place_ratings = pd.merge(places, reviews, on="place_id")
+        # 페이지네이션으로 구분하여 json 전달(위치가 주어진 경우 거리(m) 추가)
+        page = self.paginate_queryset(place)
+        data = PlaceListSerializer(page, many=True).data
+        if location:
+            for item in data:
+                item["distance"] = distances.get(item["id"])
+        serializer = self.get_paginated_response(data)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-        # 병합된 데이터프레임에서 장소, 리뷰유저를 기준, 별점을 값으로 피봇테이블 생성
-        review_user = place_ratings.pivot_table("rating_cnt", index="author_id", columns="place_id")
+    def rcm_place_list(self, user_id, cate_id):
 
-        # 선택한 카테고리에 해당하는 리뷰를 작성하지 않은 유저일 경우 선택된 카테고리를 기반으로 임시 경험데이터 생성
-        if request.user.id not in review_user.index:
-            col = random.choice(review_user.columns.to_list())
-            review_user.loc[request.user.id] = np.nan
-            review_user.loc[request.user.id, col] = 5
-        review_user = review_user.fillna(0)
+        # 카테고리별로 미리 잘라둔 별점 행렬 사용
+        rating_matrix = get_rating_matrix(cate_id)
+        review_user, user_ids, place_ids = rating_matrix.matrix, rating_matrix.user_ids, rating_matrix.place_ids
 
         # 추천 머신러닝 실행
-        place_list = rcm_place_user(review_user=review_user, user_id=request.user.id)
+        if user_id in rating_matrix.user_index:
+            return rcm_place_user(review_user=review_user, user_ids=user_ids, place_ids=place_ids, user_id=user_id)
 
-        # 머신러닝 결과 순서 리스트에 저장 후 순서대로 쿼리셋 호출
-        preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(place_list)])
-        place = Place.objects.filter(id__in=place_list).order_by(preserved)
-
-        # 페이지네이션으로 구분하여 json 전달
-        page = self.paginate_queryset(place)
-        serializer = self.get_paginated_response(PlaceSerializer(page, many=True).data)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # 선택한 카테고리에 해당하는 리뷰를 작성하지 않은 유저일 경우 선택된 카테고리를 기반으로 임시 경험데이터 생성
+        if len(place_ids):
+            return rcm_place_new_user(review_user=review_user, place_ids=place_ids, place_id=random.choice(place_ids.tolist()))
+        return []
 
 ##### 검색 #####
 class SearchListView(APIView):
@@ -292,4 +326,25 @@ class SearchListView(APIView):
         if not query:
             return Response({"message": "쿼리 아님"}, status=status.HTTP_400_BAD_REQUEST)
         results = client.perform_search(query)
-        return Response(results, status=status.HTTP_200_OK)
\ No newline at end of file
+
+        # 지금 영업 중인 맛집만(open_now)
+        if get_open_now(request.GET):
+            open_ids = set(filter_open_places([int(hit["objectID"]) for hit in results["hits"]]))
+            hits = [hit for hit in results["hits"] if int(hit["objectID"]) in open_ids]
+            results = dict(results, hits=hits, nbHits=len(hits))
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class PlaceAutocompleteView(APIView):
+    permission_classes = [AllowAny]
+
+    # 검색어 자동완성(워커 메모리의 자동완성 목록에서 조회, DB 조회 없음)
+    @swagger_auto_schema(
+        operation_summary="검색어 자동완성", responses={200: "성공", 400: "쿼리 에러", 500: "서버 에러"}
+    )
+    def get(self, request):
+        query = request.GET.get("keyword", "")
+        if not query.strip():
+            return Response({"message": "쿼리 아님"}, status=status.HTTP_400_BAD_REQUEST)
+        results = get_autocomplete().suggest(query, settings.PLACE_AUTOCOMPLETE_SIZE)
+        return Response(results, status=status.HTTP_200_OK)
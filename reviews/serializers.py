@@ -1,8 +1,7 @@
 from rest_framework import serializers
 
 from .models import Review, Comment, Recomment, Report
-from places.models import Place
-from places.serializers import PlaceSerializer
+from places.serializers import PlaceListSerializer
 
 
 # 리뷰 전체 serializer
@@ -11,7 +10,7 @@ class ReviewListSerializer(serializers.ModelSerializer):
     profile_image = serializers.SerializerMethodField()
     place_name = serializers.SerializerMethodField()
     review_like_count = serializers.SerializerMethodField()
-    place = PlaceSerializer()
+    place = PlaceListSerializer()
 
     def get_nickname(self, obj):
         return obj.author.user_profile.nickname
@@ -72,28 +71,6 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
             },
         }
 
-    def validate(self, data):
-        http_method = self.context.get("request").method
-        new_review_rating = data.get("rating_cnt")
-        place = Place.objects.get(id=self.context.get("place_id"))
-        review_cnt = place.place_review.count()
-
-        # 리뷰 생성시(별점 계산)
-        if http_method == "POST":
-            place.rating = (place.rating * review_cnt + new_review_rating) / (review_cnt + 1)
-
-            place.save()
-
-        # 리뷰 수정시(별점 계산)
-        if http_method == "PUT":
-            current_review_rating = Review.objects.get(id=self.context.get("review_id")).rating_cnt  # 기존 별점
-
-            place.rating = (place.rating * review_cnt - current_review_rating + new_review_rating) / review_cnt
-
-            place.save()
-
-        return data
-
 
 # 대댓글 serializer
 class RecommentSerializer(serializers.ModelSerializer):
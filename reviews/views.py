@@ -5,13 +5,16 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.pagination import PageNumberPagination
 
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, Prefetch
 
 from drf_yasg.utils import swagger_auto_schema
 
 from gaggamagga.pagination import PaginationHandlerMixin
 from .models import Review, Comment, Recomment, Report
+from places.tasks import update_user_recommendation
 from places.models import Place
+from places.ratings import update_place_rating
 from users.models import Profile
 from .serializers import (
     ReviewListSerializer,
@@ -29,6 +32,11 @@ class ReviewListPagination(PageNumberPagination):
     page_size = 10
 
 
+# 리뷰의 맛집을 북마크 수, 북마크 여부와 함께 한 번에 조회
+def get_place_prefetch(user):
+    return Prefetch("place", queryset=Place.objects.with_bookmarks(user))
+
+
 ##### 리뷰 #####
 class ReviewRankView(PaginationHandlerMixin, APIView):
     permission_classes = [AllowAny]
@@ -42,10 +50,10 @@ class ReviewRankView(PaginationHandlerMixin, APIView):
     def get(self, request):
 
         # 최신순
-        recent_review = Review.objects.all().order_by("-created_at")
+        recent_review = Review.objects.prefetch_related(get_place_prefetch(request.user)).order_by("-created_at")
 
         # 좋아요순
-        like_count_review = Review.objects.annotate(num_likes=Count("review_like")).order_by("-num_likes", "-created_at")
+        like_count_review = Review.objects.prefetch_related(get_place_prefetch(request.user)).annotate(num_likes=Count("review_like")).order_by("-num_likes", "-created_at")
 
         page_recent = self.paginate_queryset(recent_review)
         page_like = self.paginate_queryset(like_count_review)
@@ -76,10 +84,10 @@ class ReviewListView(APIView):
     def get(self, request, place_id):
 
         # 최신순
-        recent_review = Review.objects.filter(place_id=place_id).order_by("-created_at")
+        recent_review = Review.objects.filter(place_id=place_id).prefetch_related(get_place_prefetch(request.user)).order_by("-created_at")
 
         # 좋아요순
-        like_count_review = Review.objects.filter(place_id=place_id).annotate(num_likes=Count("review_like")).order_by("-num_likes", "-created_at")
+        like_count_review = Review.objects.filter(place_id=place_id).prefetch_related(get_place_prefetch(request.user)).annotate(num_likes=Count("review_like")).order_by("-num_likes", "-created_at")
 
         recent_review_serializer = ReviewListSerializer(recent_review, many=True).data
         like_count_review_serializer = ReviewListSerializer(like_count_review, many=True).data
@@ -101,7 +109,12 @@ class ReviewListView(APIView):
         serializer = ReviewCreateSerializer(data=request.data, context={"place_id": place_id, "request": request})
         if serializer.is_valid():
             profile.review_count_add
-            serializer.save(author=request.user, place_id=place_id)
+
+            # 리뷰 저장과 맛집 별점 합계, 리뷰 수 변경을 한 트랜잭션으로
+            with transaction.atomic():
+                review = serializer.save(author=request.user, place_id=place_id)
+                update_place_rating(place_id, review.rating_cnt, 1)
+            transaction.on_commit(lambda: update_user_recommendation.delay(request.user.id, place_id))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -123,14 +136,21 @@ class ReviewDetailView(APIView):
     @swagger_auto_schema(
         request_body=ReviewCreateSerializer,
         operation_summary="리뷰 작성",
-        responses={200: "성공", 401: "인증 에러", 400: "인풋값 에러", 500: "서버 에러"},
+        responses={200: "성공", 401: "인증 에러", 400: "인풋값 에러", 404: "찾을 수 없음", 500: "서버 에러"},
     )
     def put(self, request, place_id, review_id):
         review = get_object_or_404(Review, id=review_id)
         if request.user == review.author:
             serializer = ReviewCreateSerializer(review, data=request.data, partial=True, context={"place_id": place_id, "review_id": review_id, "request": request})
             if serializer.is_valid():
-                serializer.save(author=request.user, review_id=review_id)
+                try:
+                    with transaction.atomic():
+                        current_rating = Review.objects.select_for_update().values_list("rating_cnt", flat=True).get(id=review_id)  # 기존 별점
+                        review = serializer.save(author=request.user, review_id=review_id)
+                        update_place_rating(review.place_id, review.rating_cnt - current_rating, 0)
+                except Review.DoesNotExist:  # 동시에 들어온 요청이 먼저 삭제한 경우
+                    return Response({"message": "찾을 수 없음"}, status=status.HTTP_404_NOT_FOUND)
+                transaction.on_commit(lambda: update_user_recommendation.delay(request.user.id, review.place_id))
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         return Response({"message": "접근 권한 없음"}, status=status.HTTP_403_FORBIDDEN)
@@ -142,17 +162,17 @@ class ReviewDetailView(APIView):
     )
     def delete(self, request, place_id, review_id):
         review = get_object_or_404(Review, id=review_id)
-        place = get_object_or_404(Place, id=place_id)
         profile = get_object_or_404(Profile, user=request.user)
         if request.user == review.author:
-            profile.review_count_remove
-            review_cnt = place.place_review.count()
-            if review_cnt == 1:
-                place.rating = 0
-            else:
-                place.rating = (place.rating * review_cnt - review.rating_cnt) / (review_cnt - 1)
-            place.save()
-            review.delete()
+            try:
+                with transaction.atomic():
+                    current_rating = Review.objects.select_for_update().values_list("rating_cnt", flat=True).get(id=review_id)
+                    review.delete()
+                    update_place_rating(review.place_id, -current_rating, -1)
+                    profile.review_count_remove
+            except Review.DoesNotExist:  # 동시에 들어온 요청이 먼저 삭제한 경우
+                return Response({"message": "찾을 수 없음"}, status=status.HTTP_404_NOT_FOUND)
+            transaction.on_commit(lambda: update_user_recommendation.delay(request.user.id, review.place_id))
             return Response({"message": "리뷰 삭제"}, status=status.HTTP_200_OK)
         return Response({"message": "접근 권한 없음"}, status=status.HTTP_403_FORBIDDEN)
 
@@ -16,7 +16,7 @@ from .validators import (
 )
 
 from reviews.serializers import ReviewListSerializer
-from places.serializers import PlaceSerializer
+from places.serializers import PlaceListSerializer
 
 
 # 회원가입 serializer
@@ -219,7 +219,7 @@ class PublicProfileSerializer(serializers.ModelSerializer):
     followings = PrivateProfileSerializer(many=True)
     followers = PrivateProfileSerializer(many=True)
     review_set = ReviewListSerializer(many=True, source="user.review_set")
-    bookmark_place = PlaceSerializer(many=True, source="user.bookmark_place")
+    bookmark_place = PlaceListSerializer(many=True, source="user.bookmark_place")
     user_id = serializers.SerializerMethodField()
 
     def get_user_id(self, obj):
@@ -15,6 +15,7 @@ from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import DjangoUnicodeDecodeError, force_str
 from django.utils import timezone
 from django.shortcuts import get_list_or_404
+from django.db.models import Prefetch, prefetch_related_objects
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -24,6 +25,9 @@ import requests
 
 from gaggamagga.settings import get_secret
 from .jwt_claim_serializer import CustomTokenObtainPairSerializer
+from reviews.models import Review
+from reviews.views import get_place_prefetch
+from places.models import Place
 from .serializers import (
     SignupSerializer,
     UserUpdateSerializer,
@@ -299,6 +303,13 @@ class PublicProfileView(APIView):
     )
     def get(self, request, nickname):
         profile = get_object_or_404(Profile, nickname=nickname)
+
+        # 리뷰와 북마크한 맛집은 북마크 수, 북마크 여부와 함께 한 번에 조회
+        prefetch_related_objects(
+            [profile],
+            Prefetch("user__review_set", queryset=Review.objects.prefetch_related(get_place_prefetch(request.user))),
+            Prefetch("user__bookmark_place", queryset=Place.objects.with_bookmarks(request.user)),
+        )
         serializer = PublicProfileSerializer(profile)
         return Response(serializer.data, status=status.HTTP_200_OK)
 